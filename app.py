@@ -9,6 +9,19 @@ from datetime import datetime
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_file
 from werkzeug.utils import secure_filename
 
+import io
+import mimetypes
+
+import artifact_store
+import progress
+import retention
+import visual_diff
+import dom_diff
+import warehouse
+import quarantine
+import sharding
+from rerun import load_reruns
+
 app = Flask(__name__)
 app.secret_key = 'html_test_automation_secret_key'  # Used for flashing messages
 
@@ -28,12 +41,29 @@ app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs('screenshots', exist_ok=True)
 
+# Screenshots shown per page of the gallery
+SCREENSHOTS_PER_PAGE = 48
+
 # Store test processes and their status
 test_processes = {}
 
 # Store scheduled tests
 scheduled_tests = []
 
+# Scheduled runs going at once (SCHEDULED_RUN_LIMIT in the environment, 0
+# for no limit); due tests beyond this wait their turn
+DEFAULT_SCHEDULED_RUN_LIMIT = 2
+try:
+    SCHEDULED_RUN_LIMIT = int(os.environ.get("SCHEDULED_RUN_LIMIT", DEFAULT_SCHEDULED_RUN_LIMIT))
+except ValueError:
+    print(f"SCHEDULED_RUN_LIMIT must be a whole number - using {DEFAULT_SCHEDULED_RUN_LIMIT}")
+    SCHEDULED_RUN_LIMIT = DEFAULT_SCHEDULED_RUN_LIMIT
+# Each second a due test has waited takes this many seconds off its predicted
+# run when picking the next one, so long tests don't wait behind short ones forever
+SCHEDULE_AGING = 1.0
+# Predicted run of a test set without recorded durations, for the order only
+UNKNOWN_RUN_SECONDS = 3600
+
 # Persistent storage for test durations (survives app restarts)
 DURATIONS_FILE = 'test_durations.json'
 
@@ -46,6 +76,13 @@ try:
 except Exception as e:
     print(f"Error loading test durations: {str(e)}")
 
+# Watchdog settings (seconds)
+WATCHDOG_POLL_INTERVAL = 15
+OUTPUT_SILENCE_TIMEOUT = 120    # scripts without structured progress
+EVENT_SILENCE_TIMEOUT = 120     # no events at all, not even heartbeats
+DEFAULT_CASE_TIMEOUT = 300      # used when the script doesn't report its own deadline
+CASE_TIMEOUT_GRACE = 60         # time the script gets to recover a stuck case itself
+
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -156,7 +193,12 @@ def all_results():
                 df = pd.read_csv(file)
                 total = len(df)
                 passed = sum(1 for r in df['Result'] if str(r).startswith('P'))
-                failed = total - passed
+                # Failures of flaky cases in the quarantine lane are reported apart
+                quarantined_failed = 0
+                if 'Quarantined' in df.columns:
+                    held = df['Quarantined'].astype(str) == quarantine.QUARANTINED
+                    quarantined_failed = sum(1 for r in df.loc[held, 'Result'] if not str(r).startswith('P'))
+                failed = total - passed - quarantined_failed
                 if total > 0:
                     pass_rate = round(passed / total * 100, 1)
                 else:
@@ -165,6 +207,7 @@ def all_results():
                 total = 0
                 passed = 0
                 failed = 0
+                quarantined_failed = 0
                 pass_rate = 0
             
             # Try to find associated duration - first check in-memory processes
@@ -185,6 +228,7 @@ def all_results():
                 'total': total,
                 'passed': passed,
                 'failed': failed,
+                'quarantined_failed': quarantined_failed,
                 'pass_rate': pass_rate,
                 'duration': duration
             })
@@ -307,24 +351,16 @@ def run_test():
             file.save(filepath)
             test_file = filepath
     
-    # Build command - use the specific script for each platform type
-    if platform_type == "app":
-        cmd = ["python3", "app4app.py", "--test-set", test_file]
-    elif platform_type == "web":
-        cmd = ["python3", "app4web.py", "--test-set", test_file]
-    elif platform_type == "pro":
-        cmd = ["python3", "app4pro.py", "--test-set", test_file]
-    elif platform_type == "custom":
-        # Custom tester requires URL
-        if not url:
-            flash("URL is required for custom testing")
-            return redirect(url_for('index'))
-        cmd = ["python3", "app4custom.py", "--test-set", test_file, "--url", url]
-    else:
-        cmd = ["python3", "auto_test.py", "--platform", platform_type, "--test-set", test_file]
+    # Custom tester requires URL
+    if platform_type == "custom" and not url:
+        flash("URL is required for custom testing")
+        return redirect(url_for('index'))
+
+    # Build command - every platform type runs through the same engine
+    cmd = ["python3", "auto_test.py", "--platform", platform_type, "--test-set", test_file]
     
-    # Add options (only for non-custom platform types)
-    if url and platform_type != "custom":
+    # Add options
+    if url:
         cmd.extend(["--url", url])
     if username:
         cmd.extend(["--username", username])
@@ -355,19 +391,13 @@ def run_test_process(run_id, cmd):
         'start_time': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         'end_time': None,
         'results_file': None,
-        'duration': None
+        'duration': None,
+        'progress': progress.new_progress_state()
     }
     
     try:
         # Start the process and capture output
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1,
-            universal_newlines=True
-        )
+        process = start_test_subprocess(run_id, cmd)
         
         # Create a watchdog thread to detect if the process stops responding
         threading.Thread(target=process_watchdog, args=(run_id, process), daemon=True).start()
@@ -376,16 +406,12 @@ def run_test_process(run_id, cmd):
         for line in process.stdout:
             test_processes[run_id]['output'].append(line.strip())
             
-            # Check if line contains results file info
-            if "Results saved to " in line:
-                results_file = line.split("Results saved to ")[1].strip()
-                test_processes[run_id]['results_file'] = results_file
-                
             # Mark the process as active to prevent the watchdog from killing it
             test_processes[run_id]['last_update'] = time.time()
         
-        # Wait for process to complete
+        # Wait for process to complete and for its last progress events
         process.wait()
+        process.progress_reader.join(timeout=5)
         
         # Update status based on return code
         if process.returncode == 0:
@@ -429,22 +455,90 @@ def run_test_process(run_id, cmd):
         duration_seconds = (end_time - start_time).total_seconds()
         test_processes[run_id]['duration'] = duration_seconds
 
+def start_test_subprocess(run_id, cmd):
+    """Start a test script with a dedicated pipe for its structured progress events"""
+    read_fd, write_fd = os.pipe()
+    env = dict(os.environ)
+    env[progress.PROGRESS_FD_ENV] = str(write_fd)
+    
+    try:
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            universal_newlines=True,
+            pass_fds=(write_fd,),
+            env=env
+        )
+    except Exception:
+        os.close(read_fd)
+        raise
+    finally:
+        # Only the child keeps the write end open, so we see EOF when it exits
+        os.close(write_fd)
+    
+    reader = threading.Thread(target=progress.read_events,
+                              args=(read_fd, lambda event: handle_progress_event(run_id, event)),
+                              daemon=True)
+    reader.start()
+    process.progress_reader = reader
+    return process
+
+def handle_progress_event(run_id, event):
+    """Update the run registry from a structured progress event"""
+    process_data = test_processes.get(run_id)
+    if process_data is None:
+        return
+    
+    progress.apply_event(process_data['progress'], event)
+    
+    # The results file is written as the run goes, so it can be viewed before run_done
+    if event['event'] in ('run_started', 'run_done') and event.get('results_file'):
+        process_data['results_file'] = event['results_file']
+
+def watchdog_hang_reason(run_id):
+    """Return why a run looks hung, or None if it is still making progress"""
+    now = time.time()
+    process_data = test_processes[run_id]
+    prog = process_data.get('progress') or {}
+    
+    if prog.get('last_event') is None:
+        # Script doesn't report structured progress - fall back to output silence
+        if now - process_data.get('last_update', now) > OUTPUT_SILENCE_TIMEOUT:
+            return f"no output for {OUTPUT_SILENCE_TIMEOUT} seconds"
+        return None
+    
+    # Not even heartbeats - the script itself is frozen
+    if now - prog['last_event'] > EVENT_SILENCE_TIMEOUT:
+        return f"no progress events for {EVENT_SILENCE_TIMEOUT} seconds"
+    
+    # The script's own case watchdog should have recovered the browser by now
+    if prog.get('case_started_at') is not None:
+        case_timeout = prog.get('case_timeout') or DEFAULT_CASE_TIMEOUT
+        if now - prog['case_started_at'] > case_timeout + CASE_TIMEOUT_GRACE:
+            what = prog.get('upkeep') or f"test case {prog['current_case'] + 1}"
+            return f"{what} still running after {case_timeout + CASE_TIMEOUT_GRACE} seconds"
+    
+    return None
+
 def process_watchdog(run_id, process):
-    """Monitor a process and force terminate if it stops responding"""
+    """Monitor a process and force terminate it if its test cases stop making progress
+    
+    Stuck browsers are normally handled inside the test script, which kills the
+    session and moves on when a case overruns its deadline. This only steps in
+    when the script itself is frozen or failed to recover."""
     # Initialize the last update time
     test_processes[run_id]['last_update'] = time.time()
     
-    # Check every 15 seconds
     while process.poll() is None:  # While process is still running
-        time.sleep(15)
-        
-        # Check if the process has been updated in the last 2 minutes
-        current_time = time.time()
-        last_update = test_processes[run_id].get('last_update', 0)
+        time.sleep(WATCHDOG_POLL_INTERVAL)
         
-        if current_time - last_update > 120:  # 2 minutes with no output
-            print(f"Watchdog: Process {run_id} appears to be hung. Terminating.")
-            test_processes[run_id]['output'].append("WARNING: Process appears to be hung. Terminated by watchdog.")
+        reason = watchdog_hang_reason(run_id)
+        if reason:
+            print(f"Watchdog: Process {run_id} appears to be hung ({reason}). Terminating.")
+            test_processes[run_id]['output'].append(f"WARNING: Process appears to be hung ({reason}). Terminated by watchdog.")
             test_processes[run_id]['status'] = 'error'
             
             # Set end time and calculate duration
@@ -504,11 +598,23 @@ def test_output(run_id):
         'status': test_processes[run_id]['status'],
         'output': test_processes[run_id]['output'],
         'results_file': test_processes[run_id]['results_file'],
+        'progress': test_processes[run_id].get('progress'),
         'duration': test_processes[run_id].get('duration'),
         'start_time': test_processes[run_id].get('start_time'),
         'end_time': test_processes[run_id].get('end_time')
     })
 
+@app.route('/api/test_progress/<run_id>')
+def test_progress(run_id):
+    """Status and progress of a run without its console output, for pages that poll many runs"""
+    if run_id not in test_processes:
+        return jsonify({'error': 'Test run not found'}), 404
+
+    return jsonify({
+        'status': test_processes[run_id]['status'],
+        'progress': test_processes[run_id].get('progress')
+    })
+
 @app.route('/view_config/<config_file>')
 def view_config(config_file):
     try:
@@ -742,9 +848,36 @@ def view_results(results_file):
         else:
             pass_percent = 0
             
+        # Results files from before retries were added have no Attempts column
+        has_attempts = 'Attempts' in results_df.columns
+        if has_attempts:
+            results_df['Attempts'] = results_df['Attempts'].fillna(1).astype(int)
+            retried = int((results_df['Attempts'] > 1).sum())
+        else:
+            retried = 0
+        # Merged reruns keep the earlier result of the rerun rows only
+        if 'Previous' in results_df.columns:
+            results_df['Previous'] = results_df['Previous'].fillna('')
+
         # Convert DataFrame to list of dictionaries for template
         results = results_df.to_dict('records')
         
+        # Runs against all platforms (--platform all) have a Platform column
+        platform_rates = []
+        matrix_file = None
+        if 'Platform' in results_df.columns:
+            for platform_name, rows in results_df.groupby('Platform', sort=False):
+                platform_passed = sum(1 for r in rows['Result'] if str(r).startswith('P'))
+                platform_rates.append({
+                    'platform': platform_name,
+                    'total': len(rows),
+                    'passed': platform_passed,
+                    'pass_percent': round(platform_passed / len(rows) * 100, 1) if len(rows) else 0
+                })
+            candidate = 'matrix_' + results_file.replace('results_', '', 1)
+            if os.path.exists(candidate):
+                matrix_file = candidate
+        
         # Try to find associated duration - first check in-memory processes
         duration = None
         for run_id, process_data in test_processes.items():
@@ -756,6 +889,25 @@ def view_results(results_file):
         if duration is None and results_file in test_durations:
             duration = test_durations[results_file]
         
+        # Links between a results file and the reruns of its failures
+        reruns = load_reruns()
+        rerun_of = reruns.get(results_file)
+        rerun_files = [{'file': f, **info} for f, info in reruns.items()
+                       if info.get('original') == results_file and os.path.exists(f)]
+        
+        # Screenshots of the run(s) that wrote this file
+        artifact_runs = artifact_store.runs_for_results(results_file)
+        visual_reports = [report for report in map(visual_diff.load_report, artifact_runs) if report]
+        dom_reports = [report for report in map(dom_diff.load_report, artifact_runs) if report]
+        
+        # Rerun on the same platform type if we know which one this run used
+        run_platform = 'web'
+        for process_data in test_processes.values():
+            command = process_data.get('command', '').split()
+            if process_data.get('results_file') == results_file and '--platform' in command:
+                run_platform = command[command.index('--platform') + 1]
+                break
+        
         return render_template('view_results.html',
                               results_file=results_file,
                               results=results,
@@ -763,12 +915,46 @@ def view_results(results_file):
                               passed=passed,
                               failed=failed,
                               pass_percent=pass_percent,
-                              duration=duration)
+                              duration=duration,
+                              platform_rates=platform_rates,
+                              matrix_file=matrix_file,
+                              has_attempts=has_attempts,
+                              retried=retried,
+                              rerun_of=rerun_of,
+                              rerun_files=rerun_files,
+                              artifact_runs=artifact_runs,
+                              visual_reports=visual_reports,
+                              dom_reports=dom_reports,
+                              run_platform=run_platform)
     except Exception as e:
         flash(f"Could not open results file: {results_file}")
         print(f"Error viewing results: {str(e)}")
         return redirect(url_for('index'))
 
+@app.route('/rerun_failed/<results_file>', methods=['POST'])
+def rerun_failed(results_file):
+    """Rerun the failed cases of a results file and merge them into a new one"""
+    if not os.path.exists(results_file):
+        flash(f"Results file not found: {results_file}")
+        return redirect(url_for('all_results'))
+    platform_type = request.form.get('platform_type', 'web')
+    url = request.form.get('url', '')
+    
+    # Build command - the engine picks the failures and merges the outcomes
+    cmd = ["python3", "auto_test.py", "--platform", platform_type, "--rerun-failed", results_file]
+    if url:
+        cmd.extend(["--url", url])
+    if 'include_warnings' in request.form:
+        cmd.append("--include-warnings")
+    if 'headless' in request.form:
+        cmd.append("--headless")
+    
+    run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+    threading.Thread(target=run_test_process, args=(run_id, cmd)).start()
+    
+    flash(f"Rerunning failures of {results_file} with ID: {run_id}")
+    return redirect(url_for('test_status', run_id=run_id))
+
 @app.route('/delete_result/<results_file>')
 def delete_result(results_file):
     try:
@@ -786,37 +972,115 @@ def download_results(results_file):
         flash(f"Could not download file: {results_file}")
         return redirect(url_for('index'))
 
+@app.route('/dashboard')
+def dashboard():
+    """Pass-rate trends, slowest and flaky cases across all runs in the warehouse"""
+    days = request.args.get('days', 30, type=int)
+    platform = request.args.get('platform', '')
+    try:
+        # Pick up runs the engine couldn't ingest itself (crashed, older runs)
+        warehouse.ingest_all()
+        connection = warehouse.connect()
+        try:
+            trend = warehouse.pass_rate_trend(connection, days, platform)
+            slowest = warehouse.slowest_cases(connection, days, platform)
+            flaky = warehouse.flaky_cases(connection, days, platform)
+            categories = warehouse.failure_categories(connection, days, platform)
+            platforms = warehouse.platforms(connection)
+        finally:
+            connection.close()
+    except Exception as e:
+        flash(f"Could not read the results warehouse: {str(e)}")
+        return redirect(url_for('index'))
+    return render_template('dashboard.html', days=days, platform=platform, platforms=platforms,
+                           trend=trend, slowest=slowest, flaky=flaky, categories=categories,
+                           held=quarantine.load())
+
 @app.route('/screenshots')
 def view_screenshots():
     if not os.path.exists('screenshots'):
         flash("Screenshots directory not found")
         return redirect(url_for('index'))
         
+    # Newest first, from the artifact store and any older loose files.  With
+    # a run filter only that run's manifest is read; otherwise manifests are
+    # read newest run first until this page is full, so the number of pages
+    # isn't known - just whether there is a next one
+    filters = {key: request.args.get(key, '') for key in ('run', 'case', 'step', 'category')}
+    if filters['run']:
+        artifacts = artifact_store.list_artifacts('.png', run=filters['run'])
+    else:
+        artifacts = artifact_store.iter_artifacts('.png')
+    per_page = SCREENSHOTS_PER_PAGE
+    page = max(request.args.get('page', 1, type=int), 1)
+    skip = (page - 1) * per_page
     screenshots = []
-    for f in os.listdir('screenshots'):
-        if f.endswith('.png'):
-            timestamp = os.path.getmtime(os.path.join('screenshots', f))
-            date = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
-            screenshots.append({
-                'filename': f,
-                'date': date,
-                'path': os.path.join('screenshots', f)
-            })
-    
-    # Sort by timestamp (newest first)
-    screenshots.sort(key=lambda x: x['date'], reverse=True)
-    
-    return render_template('screenshots.html', screenshots=screenshots)
+    matched = 0
+    has_next = False
+    steps, categories = set(), set()
+    for artifact in artifacts:
+        screenshot = artifact_store.describe(artifact['name'])
+        # Step and error choices come from every screenshot read, not just the ones shown
+        steps.add(screenshot['step'])
+        if screenshot['category']:
+            categories.add(screenshot['category'])
+        if filters['case'].isdigit() and screenshot['case'] != int(filters['case']):
+            continue
+        if filters['step'] and screenshot['step'] != filters['step']:
+            continue
+        if filters['category'] and screenshot['category'] != filters['category']:
+            continue
+        matched += 1
+        if matched <= skip:
+            continue
+        if len(screenshots) < per_page:
+            screenshot.update(filename=artifact['name'], run=artifact['run'], time=artifact['time'])
+            screenshots.append(screenshot)
+            continue
+        has_next = True
+        if not filters['run']:
+            break
+    for screenshot in screenshots:
+        screenshot['date'] = datetime.fromtimestamp(screenshot['time']).strftime('%Y-%m-%d %H:%M:%S')
+    # A single run is read whole, so its page count is known
+    total = matched if filters['run'] else None
+    pages = max(1, (matched + per_page - 1) // per_page) if filters['run'] else None
+
+    # Recorded by the retention pass (see retention.py), not worked out on every view
+    usage = artifact_store.load_usage() or {}
+    return render_template('screenshots.html', screenshots=screenshots, total=total,
+                           page=page, pages=pages, has_next=has_next, filters=filters,
+                           runs=artifact_store.list_runs(), steps=sorted(steps), categories=sorted(categories),
+                           logical_mb=usage.get('logical', 0) / 1e6, stored_mb=usage.get('stored', 0) / 1e6,
+                           usage_date=datetime.fromtimestamp(usage['time']).strftime('%Y-%m-%d %H:%M') if usage else None)
+
+@app.route('/screenshots/thumb/<path:filename>')
+def serve_thumbnail(filename):
+    try:
+        thumbnail = artifact_store.make_thumbnail(filename)
+    except Exception as e:
+        print(f"Could not make a thumbnail of {filename}: {str(e)}")
+        thumbnail = None
+    if thumbnail is None:
+        # No Pillow or not an image - fall back to the screenshot itself
+        return redirect(url_for('serve_screenshot', filename=filename))
+    return send_file(thumbnail, mimetype='image/jpeg', max_age=86400)
 
-@app.route('/static/screenshots/<filename>')
+@app.route('/static/screenshots/<path:filename>')
 def serve_screenshot(filename):
-    return send_file(os.path.join('screenshots', filename))
+    data = artifact_store.read(filename)
+    if data is None:
+        return f"Artifact not found: {filename}", 404
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    return send_file(io.BytesIO(data), mimetype=mimetype, download_name=os.path.basename(filename))
 
-@app.route('/delete_screenshot/<filename>')
+@app.route('/delete_screenshot/<path:filename>')
 def delete_screenshot(filename):
     try:
-        os.remove(os.path.join('screenshots', filename))
-        flash(f"Screenshot {filename} deleted")
+        if artifact_store.delete([filename]):
+            flash(f"Screenshot {filename} deleted")
+        else:
+            flash(f"Screenshot {filename} was not deleted - it is gone or its run is still in progress")
     except Exception as e:
         flash(f"Error deleting screenshot: {str(e)}")
     return redirect(url_for('view_screenshots'))
@@ -824,12 +1088,8 @@ def delete_screenshot(filename):
 @app.route('/delete_all_screenshots', methods=['POST'])
 def delete_all_screenshots():
     try:
-        # Only delete PNG files in screenshots directory
-        count = 0
-        for f in os.listdir('screenshots'):
-            if f.endswith('.png'):
-                os.remove(os.path.join('screenshots', f))
-                count += 1
+        # Only delete the screenshots, not the saved HTML
+        count = artifact_store.delete([a['name'] for a in artifact_store.list_artifacts('.png')])
         flash(f"Deleted {count} screenshots")
     except Exception as e:
         flash(f"Error deleting screenshots: {str(e)}")
@@ -862,22 +1122,13 @@ def schedule_test():
                 return redirect(url_for('schedule_test'))
                 
             # Create command
-            if platform_type == "app":
-                cmd = ["python3", "app4app.py", "--test-set", test_file]
-            elif platform_type == "web":
-                cmd = ["python3", "app4web.py", "--test-set", test_file]
-            elif platform_type == "pro":
-                cmd = ["python3", "app4pro.py", "--test-set", test_file]
-            elif platform_type == "custom":
-                if not url:
-                    flash("URL is required for custom testing")
-                    return redirect(url_for('schedule_test'))
-                cmd = ["python3", "app4custom.py", "--test-set", test_file, "--url", url]
-            else:
-                cmd = ["python3", "auto_test.py", "--platform", platform_type, "--test-set", test_file]
+            if platform_type == "custom" and not url:
+                flash("URL is required for custom testing")
+                return redirect(url_for('schedule_test'))
+            cmd = ["python3", "auto_test.py", "--platform", platform_type, "--test-set", test_file]
             
             # Add options
-            if url and platform_type != "custom":
+            if url:
                 cmd.extend(["--url", url])
             if headless:
                 cmd.append("--headless")
@@ -892,7 +1143,8 @@ def schedule_test():
                 'schedule_type': schedule_type,
                 'schedule_datetime': schedule_datetime,
                 'command': ' '.join(cmd),
-                'status': 'scheduled'
+                'status': 'scheduled',
+                'predicted_seconds': predict_run_seconds(test_file, platform_type)
             }
             
             scheduled_tests.append(scheduled_test)
@@ -998,6 +1250,13 @@ def view_scheduled_tests():
                     test['run_id'] = run_id
                     break
     
+    # Live progress of the running tests, and which due tests are waiting their turn
+    now = datetime.now()
+    for test in scheduled_tests:
+        process_data = test_processes.get(test.get('run_id')) if test.get('status') == 'running' else None
+        test['progress'] = process_data.get('progress') if process_data else None
+        test['queued'] = test['status'] == 'scheduled' and test['schedule_datetime'] <= now
+    
     return render_template('view_scheduled_tests.html', scheduled_tests=scheduled_tests)
 
 @app.route('/cancel_scheduled_test/<int:test_id>')
@@ -1018,6 +1277,22 @@ def cancel_scheduled_test(test_id):
     
     return redirect(url_for('view_scheduled_tests'))
 
+def predict_run_seconds(test_file, platform_type):
+    """How long a test set is expected to run, from its cases' recorded durations (None if unknown)"""
+    try:
+        return sharding.estimate_run(test_file, platform_type)
+    except Exception as e:
+        print(f"Could not predict the duration of {test_file}: {str(e)}")
+        return None
+
+def scheduling_order(test, now):
+    """Sort key for due scheduled tests: shortest predicted run first, less the time it has waited, then by schedule"""
+    predicted = test.get('predicted_seconds')
+    if predicted is None:
+        predicted = UNKNOWN_RUN_SECONDS
+    waited = max((now - test['schedule_datetime']).total_seconds(), 0)
+    return (predicted - waited * SCHEDULE_AGING, test['schedule_datetime'])
+
 def scheduler_thread():
     """Background thread that checks and runs scheduled tests"""
     global scheduled_tests
@@ -1041,31 +1316,37 @@ def scheduler_thread():
             time_diff = (test_time - now).total_seconds()
             print(f"Test {test['id']} status: {test['status']}, scheduled for: {test_time.strftime('%Y-%m-%d %H:%M:%S')}, diff: {time_diff:.1f} seconds")
             
-            # Start new scheduled tests
-            should_run = False
-            if test['status'] == 'scheduled':
-                time_diff = (test_time - now).total_seconds()
-                should_run = time_diff <= 0
-                
-                if should_run:
-                    # Time to run this test
-                    print(f"Running scheduled test {test['id']} (time diff: {time_diff:.1f} seconds)")
-                    test['status'] = 'running'
-                    
-                    # Start in a separate thread
-                    runner = threading.Thread(target=run_scheduled_test, args=(test,), daemon=True)
-                    runner.start()
-                    print(f"Test runner thread started: {runner.is_alive()}")
-            
             # Update completed tests with results files
-            elif test['status'] in ['completed', 'failed', 'error'] and test.get('run_id') and not test.get('results_file'):
+            if test['status'] in ['completed', 'failed', 'error'] and test.get('run_id') and not test.get('results_file'):
                 # Check if there's a results file in the test process data
                 if test['run_id'] in test_processes and test_processes[test['run_id']].get('results_file'):
                     test['results_file'] = test_processes[test['run_id']]['results_file']
         
+        # Start one due test per check (so no two share a run ID), shortest
+        # predicted run first (see scheduling_order), while fewer than
+        # SCHEDULED_RUN_LIMIT are running
+        due = [test for test in scheduled_tests if test['status'] == 'scheduled' and test['schedule_datetime'] <= now]
+        running = sum(1 for test in scheduled_tests if test['status'] == 'running')
+        if due and (SCHEDULED_RUN_LIMIT <= 0 or running < SCHEDULED_RUN_LIMIT):
+            test = min(due, key=lambda test: scheduling_order(test, now))
+            print(f"Running scheduled test {test['id']} ({len(due) - 1} more due, {running} running)")
+            test['status'] = 'running'
+            
+            # Start in a separate thread
+            runner = threading.Thread(target=run_scheduled_test, args=(test,), daemon=True)
+            runner.start()
+            print(f"Test runner thread started: {runner.is_alive()}")
+        
         # Sleep for 10 seconds before checking again
         time.sleep(10)
 
+def retention_protected_files():
+    """Files the retention thread must not delete: test sets of scheduled tests, results being written"""
+    files = [test['test_file'] for test in scheduled_tests if test.get('test_file')]
+    files.extend(data['results_file'] for data in test_processes.values()
+                 if data.get('results_file') and data.get('status') == 'running')
+    return files
+
 def run_scheduled_test(test):
     """Run a scheduled test"""
     # Check if test file exists
@@ -1094,19 +1375,13 @@ def run_scheduled_test(test):
         'start_time': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         'end_time': None,
         'results_file': None,
-        'duration': None
+        'duration': None,
+        'progress': progress.new_progress_state()
     }
     
     try:
         # Start the process and capture output
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1,
-            universal_newlines=True
-        )
+        process = start_test_subprocess(run_id, cmd)
         
         # Create a watchdog thread to detect if the process stops responding
         threading.Thread(target=process_watchdog, args=(run_id, process), daemon=True).start()
@@ -1115,16 +1390,12 @@ def run_scheduled_test(test):
         for line in process.stdout:
             test_processes[run_id]['output'].append(line.strip())
             
-            # Check if line contains results file info
-            if "Results saved to " in line:
-                results_file = line.split("Results saved to ")[1].strip()
-                test_processes[run_id]['results_file'] = results_file
-                
             # Mark the process as active to prevent the watchdog from killing it
             test_processes[run_id]['last_update'] = time.time()
         
-        # Wait for process to complete
+        # Wait for process to complete and for its last progress events
         process.wait()
+        process.progress_reader.join(timeout=5)
         
         # Update status based on return code
         if process.returncode == 0:
@@ -1187,5 +1458,11 @@ if __name__ == '__main__':
         print(f"Starting scheduler thread on app startup with {len(scheduled_tests)} tests")
         threading.Thread(target=scheduler_thread, daemon=True).start()
     
+    # Prune old screenshots and results in the background - under the debug
+    # reloader only in the child process that serves requests, not in the watcher
+    debug = True  # Reloader enabled for development
+    if not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        threading.Thread(target=retention.gc_thread, args=(retention_protected_files,), daemon=True).start()
+    
     # Run the app
-    app.run(debug=True, host='0.0.0.0', port=5000)  # Reloader enabled for development
\ No newline at end of file
+    app.run(debug=debug, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,635 @@
+"""Content-addressed store for the screenshots and HTML saved while testing.
+
+save_debug_info() captures the page at many steps of every test case, and
+most of those pages look the same from case to case (the empty search page,
+the same "no results" page, ...).  Each artifact keeps its usual name, e.g.
+"error_Timeout_case_3_20240101_120000.png", but its bytes are stored once
+per SHA-256 hash:
+
+    screenshots/blobs/ab/ab12...ef.png      screenshots
+    screenshots/blobs/cd/cd34...01.html.gz  HTML sources, gzip-compressed
+
+Artifacts saved during a run are named "<run_id>/<name>" and listed in the
+run's manifest, screenshots/runs/<run_id>/manifest.json, by case and step:
+
+    {"run": ..., "platform": ..., "results_files": [...],
+     "cases": {"3": {"error": [{"name": ..., "blob": ..., ...}, ...]}},
+     "case_info": {"3": {"search": ...}}}
+
+Screenshot and DOM comparisons pair the steps of two runs by the search of
+their case, not its number, so runs of different test sets, shards or
+reruns only compare the cases they share.
+
+While the run goes on, each artifact is appended to the run's journal,
+screenshots/runs/<run_id>/journal.jsonl, and the manifest is only rewritten
+(with the journal folded in) when the run starts and when it finishes, so
+saving an artifact doesn't get slower as the run gets longer.  Readers
+merge the two.  Only the engine process of a run in progress writes to its
+manifest, so a name saved twice in the same second gets a "_2" suffix
+instead of overwriting the first; artifacts of a run in progress can't be
+deleted.  After the run, visual_diff.py files its output in the manifest
+too and retention or the web app may remove artifacts from it.  Viewing or
+pruning a run only reads its own manifest.  Artifacts
+saved outside a run are mapped to blobs by the append-only
+screenshots/index.jsonl.  A blob is written to a temporary file and
+renamed, so two processes saving the same page never see half a blob.
+Files saved directly in screenshots/ by older versions are still listed
+and served.  The gallery reads one run manifest at a time (iter_artifacts)
+and shows the disk usage the retention pass last recorded in
+screenshots/usage.json instead of stat-ing every blob on each view.
+
+Screenshots also get a small JPEG thumbnail in screenshots/thumbs/, one per
+blob, made on a background thread while the run goes on (or on first view
+for older files).  Thumbnails need Pillow; without it the gallery shows the
+full images.
+"""
+import gzip
+import hashlib
+import io
+import json
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+
+import quarantine
+
+STORE_DIR = "screenshots"
+BLOB_DIR = os.path.join(STORE_DIR, "blobs")
+INDEX_FILE = os.path.join(STORE_DIR, "index.jsonl")
+USAGE_FILE = os.path.join(STORE_DIR, "usage.json")
+# Page summaries cached by dom_diff.py
+DOM_SUMMARY_FILE = os.path.join(STORE_DIR, "dom_summaries.json")
+# Files of the store itself, never listed, served or pruned as artifacts
+STORE_FILES = (INDEX_FILE, USAGE_FILE, DOM_SUMMARY_FILE)
+RUNS_DIR = os.path.join(STORE_DIR, "runs")
+THUMB_DIR = os.path.join(STORE_DIR, "thumbs")
+THUMB_SIZE = (320, 240)
+
+# Artifact types that are stored compressed
+COMPRESSED_EXTENSIONS = (".html",)
+# Blobs used this recently are never garbage collected, so a run that just
+# found one of them already stored can still add its index or manifest line
+GC_GRACE_SECONDS = 300
+# A run that never finished (crashed) counts as over once its manifest is this old
+STALE_RUN_SECONDS = 24 * 3600
+
+# "<step>_case_<n>_<timestamp>.png", with step "error_<category>" for failures
+NAME_PATTERN = re.compile(r"^(?P<prefix>.*?)_(?P<timestamp>\d{8}_\d{6})(_\d+)?\.\w+$")
+# Manifest key of artifacts saved outside a test case
+RUN_LEVEL = "run"
+CASE_PATTERN = re.compile(r"_case_(\d+)")
+
+_thumb_queue = None
+_thumb_thread = None
+
+
+def _blob_path(blob):
+    return os.path.join(BLOB_DIR, blob[:2], blob)
+
+
+def _append_index(record):
+    with open(INDEX_FILE, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def manifest_path(run_id):
+    return os.path.join(RUNS_DIR, run_id, "manifest.json")
+
+
+def journal_path(run_id):
+    return os.path.join(RUNS_DIR, run_id, "journal.jsonl")
+
+
+def load_manifest(run_id):
+    """The manifest of a run with its journal folded in, or None if it saved no artifacts"""
+    run_id = os.path.basename(run_id)
+    try:
+        with open(manifest_path(run_id), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    try:
+        with open(journal_path(run_id), 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+    except OSError:
+        return manifest
+    names = set(manifest_records(manifest))
+    for line in lines:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            # A line cut short by a crash
+            continue
+        if 'info' in entry:
+            manifest.setdefault('case_info', {}).setdefault(entry['case'], {}).update(entry['info'])
+            continue
+        # Already folded in if the run stopped between rewriting the manifest and dropping the journal
+        if entry['record']['name'] in names:
+            continue
+        manifest['cases'].setdefault(entry['case'], {}).setdefault(entry['step'], []).append(entry['record'])
+        names.add(entry['record']['name'])
+    return manifest
+
+
+def last_written(run_id):
+    """When a run last saved an artifact or rewrote its manifest"""
+    times = []
+    for path in (manifest_path(run_id), journal_path(run_id)):
+        try:
+            times.append(os.path.getmtime(path))
+        except OSError:
+            pass
+    return max(times, default=0)
+
+
+def run_in_progress(manifest, now=None):
+    """Whether a run may still be saving artifacts: not finished, and not gone quiet for STALE_RUN_SECONDS"""
+    if manifest.get('finished'):
+        return False
+    now = time.time() if now is None else now
+    return now - last_written(manifest['run']) <= STALE_RUN_SECONDS
+
+
+def list_runs():
+    """Run IDs that have a manifest, newest first"""
+    if not os.path.isdir(RUNS_DIR):
+        return []
+    return sorted((run for run in os.listdir(RUNS_DIR) if os.path.exists(manifest_path(run))), reverse=True)
+
+
+def manifest_records(manifest):
+    """Artifact name -> record for every artifact in a run manifest"""
+    records = {}
+    for steps in manifest.get('cases', {}).values():
+        for files in steps.values():
+            for record in files:
+                records[record['name']] = dict(record, run=manifest['run'])
+    return records
+
+
+def runs_for_results(results_file):
+    """Run IDs whose artifacts belong to a results file (several for a --platform all run)"""
+    stem = os.path.splitext(os.path.basename(results_file))[0]
+    found = []
+    for run_id in list_runs():
+        manifest = load_manifest(run_id) or {}
+        for path in manifest.get('results_files', []):
+            other = os.path.splitext(os.path.basename(path))[0]
+            # The platform runs of a fan-out write results_<ts>_<platform>.csv
+            if other == stem or other.startswith(stem + "_"):
+                found.append(run_id)
+                break
+    return found
+
+
+def previous_run(run_id):
+    """The last finished run on the same platform that started before this one"""
+    manifest = load_manifest(run_id)
+    if manifest is None:
+        return None
+    earlier = []
+    for other_id in list_runs():
+        other = load_manifest(other_id)
+        if (other and other_id != run_id and other.get('finished') and other.get('platform') == manifest.get('platform')
+                and other.get('started', 0) < manifest.get('started', 0)):
+            earlier.append(other)
+    if not earlier:
+        return None
+    return max(earlier, key=lambda m: m['started'])['run']
+
+
+def case_identities(manifest):
+    """Case number -> what pairs it with the same case of another run: its search (and which
+    repeat of that search it is), or the number itself for runs saved without searches"""
+    info = manifest.get('case_info', {})
+    identities = {}
+    seen = {}
+    for case in sorted(manifest.get('cases', {}), key=lambda c: (not c.isdigit(), int(c) if c.isdigit() else 0)):
+        search = info.get(case, {}).get('search')
+        if search is None:
+            identities[case] = case
+            continue
+        key = quarantine.search_key(search)
+        seen[key] = seen.get(key, 0) + 1
+        identities[case] = f"{key}#{seen[key]}"
+    return identities
+
+
+def step_artifacts(manifest, extension):
+    """(case identity, step, occurrence) -> record with its 'case' number, for every screenshot
+    (".png") or page source (".html") of a run"""
+    identities = case_identities(manifest)
+    steps = {}
+    for case, case_steps in manifest.get('cases', {}).items():
+        for step, files in case_steps.items():
+            # Comparison output isn't compared itself
+            if step.startswith("visual_diff"):
+                continue
+            matching = [record for record in files if record['name'].endswith(extension)]
+            for occurrence, record in enumerate(matching):
+                steps[(identities[case], step, occurrence)] = dict(record, case=case)
+    return steps
+
+
+class RunManifest:
+    """Artifacts of one run by case and step, kept in screenshots/runs/<run_id>/manifest.json"""
+
+    def __init__(self, run_id, platform=None, results_file=None):
+        self.run = run_id
+        self.path = manifest_path(run_id)
+        # Case the engine is on; artifacts outside a case are filed under RUN_LEVEL
+        self.case = None
+        self.data = load_manifest(run_id) or {
+            'run': run_id, 'platform': platform, 'started': time.time(),
+            'results_files': [], 'cases': {}}
+        if results_file and results_file not in self.data['results_files']:
+            # A resumed run writes a new results file
+            self.data['results_files'].append(results_file)
+        self.names = set(manifest_records(self.data))
+        # Fold an earlier journal in, so this one starts empty
+        self.save()
+
+    def unique_base(self, base, extensions):
+        """base, or base_2, base_3, ... if an artifact of this run already has that name"""
+        candidate, count = base, 1
+        while any(f"{self.run}/{candidate}{extension}" in self.names for extension in extensions):
+            count += 1
+            candidate = f"{base}_{count}"
+        return candidate
+
+    def _case_key(self):
+        return RUN_LEVEL if self.case is None else str(self.case + 1)
+
+    def start_case(self, index, search=None):
+        """File the artifacts saved from now on under a test case (None: outside one)"""
+        self.case = index
+        if index is not None and search is not None:
+            self.set_case_info(search=search)
+
+    def set_case_info(self, **info):
+        """Remember something about the current case (its search, ...)"""
+        case = self._case_key()
+        self.data.setdefault('case_info', {}).setdefault(case, {}).update(info)
+        with open(journal_path(self.run), 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'case': case, 'info': info}) + "\n")
+
+    def add(self, record):
+        case = self._case_key()
+        step = describe(record['name'])['step']
+        self.data['cases'].setdefault(case, {}).setdefault(step, []).append(record)
+        self.names.add(record['name'])
+        with open(journal_path(self.run), 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'case': case, 'step': step, 'record': record}) + "\n")
+
+    def remove(self, names):
+        for steps in self.data['cases'].values():
+            for step, files in steps.items():
+                steps[step] = [record for record in files if record['name'] not in names]
+        self.names -= set(names)
+        if not self.names:
+            # Nothing left of the run
+            shutil.rmtree(os.path.dirname(self.path), ignore_errors=True)
+            return
+        self.save()
+
+    def finish(self):
+        """Mark the run as complete, so retention may prune it"""
+        self.data['finished'] = time.time()
+        self.save()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f)
+        os.replace(temp_path, self.path)
+        try:
+            os.remove(journal_path(self.run))
+        except FileNotFoundError:
+            pass
+
+
+def save(name, data, manifest=None):
+    """Store an artifact's bytes under its name (in a run's manifest, if given); returns the name of its blob"""
+    compress = name.endswith(COMPRESSED_EXTENSIONS)
+    digest = hashlib.sha256(data).hexdigest()
+    blob = digest + os.path.splitext(name)[1] + (".gz" if compress else "")
+    path = _blob_path(blob)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        if compress:
+            # Level 6 is nearly as small as 9 for HTML and much faster
+            with gzip.open(temp_path, 'wb', compresslevel=6) as f:
+                f.write(data)
+        else:
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+        os.replace(temp_path, path)
+    else:
+        os.utime(path)
+    if manifest is not None:
+        manifest.add({'name': f"{manifest.run}/{name}", 'blob': blob, 'size': len(data), 'time': time.time()})
+    else:
+        _append_index({'name': name, 'blob': blob, 'size': len(data), 'time': time.time()})
+    return blob
+
+
+def describe(name):
+    """{'step', 'case', 'category'} of an artifact, read from its name"""
+    name = os.path.basename(name)
+    match = NAME_PATTERN.match(name)
+    prefix = match.group('prefix') if match else os.path.splitext(name)[0]
+    case = CASE_PATTERN.search(prefix)
+    step = CASE_PATTERN.sub("", prefix)
+    category = None
+    if step.startswith("error_"):
+        category = step[len("error_"):]
+        step = "error"
+    return {'step': step, 'case': int(case.group(1)) if case else None, 'category': category}
+
+
+def _thumb_path(blob_or_name):
+    return os.path.join(THUMB_DIR, os.path.splitext(blob_or_name)[0] + ".jpg")
+
+
+def make_thumbnail(name, index=None):
+    """Path of the thumbnail of a screenshot, made now if needed; None without Pillow"""
+    if index is None:
+        index = _index_for(name)
+    record = index.get(name)
+    path = _thumb_path(record['blob'] if record else "loose_" + os.path.basename(name))
+    if os.path.exists(path):
+        return path
+    data = read(name, index=index)
+    if data is None:
+        return None
+    return _write_thumbnail(path, data)
+
+
+def _write_thumbnail(path, data):
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    image = Image.open(io.BytesIO(data))
+    image.thumbnail(THUMB_SIZE)
+    os.makedirs(THUMB_DIR, exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    image.convert("RGB").save(temp_path, "JPEG", quality=70)
+    os.replace(temp_path, path)
+    return path
+
+
+def _thumbnail_worker():
+    while True:
+        path, data = _thumb_queue.get()
+        try:
+            _write_thumbnail(path, data)
+        except Exception as e:
+            print(f"Could not make thumbnail {path}: {str(e)}")
+        finally:
+            _thumb_queue.task_done()
+
+
+def queue_thumbnail(blob, data):
+    """Make the thumbnail of a screenshot blob on the background thread"""
+    global _thumb_queue, _thumb_thread
+    path = _thumb_path(blob)
+    if os.path.exists(path):
+        return
+    if _thumb_thread is None:
+        _thumb_queue = queue.Queue()
+        _thumb_thread = threading.Thread(target=_thumbnail_worker, daemon=True)
+        _thumb_thread.start()
+    _thumb_queue.put((path, data))
+
+
+def finish_thumbnails():
+    """Wait for the queued thumbnails before the process exits"""
+    if _thumb_queue is not None:
+        _thumb_queue.join()
+
+
+def load_index(run=None):
+    """Artifact name -> {'blob', 'size', 'time'} for every stored artifact, or just those of one run"""
+    if run is not None:
+        return manifest_records(load_manifest(run) or {'run': run})
+    index = _load_index_file()
+    for run_id in list_runs():
+        index.update(load_index(run_id))
+    return index
+
+
+def _load_index_file():
+    """Artifacts saved outside a run, from index.jsonl"""
+    index = {}
+    try:
+        with open(INDEX_FILE, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A line cut short by a crash
+                    continue
+                if record.get('deleted'):
+                    index.pop(record['name'], None)
+                else:
+                    index[record['name']] = record
+    except OSError:
+        pass
+    return index
+
+
+def _index_for(name):
+    """Index to look an artifact up in - only its run's manifest for a run artifact"""
+    return load_index(name.split("/")[0]) if "/" in name else load_index()
+
+
+def list_artifacts(extension=None, index=None, run=None):
+    """[{'name', 'time', 'run'}] of the stored artifacts and the older loose files, newest first"""
+    if index is None:
+        index = load_index(run)
+    artifacts = [{'name': name, 'time': record['time'], 'run': record.get('run')} for name, record in index.items()]
+    if run is None and os.path.isdir(STORE_DIR):
+        for f in os.listdir(STORE_DIR):
+            path = os.path.join(STORE_DIR, f)
+            if f not in index and os.path.isfile(path) and path not in STORE_FILES:
+                artifacts.append({'name': f, 'time': os.path.getmtime(path), 'run': None})
+    if extension:
+        artifacts = [a for a in artifacts if a['name'].endswith(extension)]
+    artifacts.sort(key=lambda a: a['time'], reverse=True)
+    return artifacts
+
+
+def iter_artifacts(extension=None):
+    """Every artifact like list_artifacts(), but reading one manifest at a time as the caller goes
+
+    Newest run first, each run's artifacts newest first, then the artifacts
+    saved outside a run and the older loose files.
+    """
+    for run_id in list_runs():
+        yield from list_artifacts(extension, run=run_id)
+    yield from list_artifacts(extension, index=_load_index_file())
+
+
+def read(name, index=None):
+    """The bytes of an artifact, or None if there is no such artifact"""
+    if index is None:
+        index = _index_for(name)
+    record = index.get(name)
+    if record is None:
+        path = os.path.join(STORE_DIR, os.path.basename(name))
+        if not os.path.isfile(path) or path in STORE_FILES:
+            return None
+        with open(path, 'rb') as f:
+            return f.read()
+    return read_blob(record['blob'])
+
+
+def delete(names, index=None):
+    """Remove artifacts by name, and the blobs no other artifact uses; returns how many were removed
+
+    Artifacts of a run in progress are left alone - its engine would write
+    them back into the manifest.
+    """
+    if index is None:
+        index = load_index()
+    removed = 0
+    by_run = {}
+    dropped = set()
+    busy = {}
+    for name in names:
+        if "/" in name and name in index:
+            run_id = name.split("/")[0]
+            if run_id not in busy:
+                busy[run_id] = run_in_progress(load_manifest(run_id) or {'run': run_id})
+            if busy[run_id]:
+                continue
+            by_run.setdefault(run_id, set()).add(name)
+            dropped.add(index.pop(name)['blob'])
+            removed += 1
+        elif name in index:
+            _append_index({'name': name, 'deleted': True})
+            dropped.add(index.pop(name)['blob'])
+            removed += 1
+        else:
+            path = os.path.join(STORE_DIR, os.path.basename(name))
+            if os.path.isfile(path) and path not in STORE_FILES:
+                os.remove(path)
+                removed += 1
+                thumb = _thumb_path("loose_" + os.path.basename(name))
+                if os.path.exists(thumb):
+                    os.remove(thumb)
+    skipped = [run_id for run_id, running in busy.items() if running]
+    if skipped:
+        print(f"Not deleting artifacts of runs still in progress: {', '.join(sorted(skipped))}")
+    for run_id, run_names in by_run.items():
+        RunManifest(run_id).remove(run_names)
+    in_use = {record['blob'] for record in index.values()}
+    release_blobs(dropped - in_use)
+    return removed
+
+
+def release_blobs(blobs):
+    """Delete blobs (and their thumbnails) that no artifact uses any more; returns the bytes freed"""
+    cutoff = time.time() - GC_GRACE_SECONDS
+    freed = 0
+    for blob in blobs:
+        path = _blob_path(blob)
+        try:
+            # A fresh blob may have just been saved again by a run in progress
+            if os.path.getmtime(path) > cutoff:
+                continue
+            freed += os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            continue
+        thumb = _thumb_path(blob)
+        if os.path.exists(thumb):
+            os.remove(thumb)
+    return freed
+
+
+def collect_garbage(index=None):
+    """Sweep the whole blob store for blobs no artifact refers to any more; returns how many were deleted"""
+    if index is None:
+        index = load_index()
+    in_use = {record['blob'] for record in index.values()}
+    cutoff = time.time() - GC_GRACE_SECONDS
+    deleted = 0
+    if os.path.isdir(BLOB_DIR):
+        for prefix in os.listdir(BLOB_DIR):
+            folder = os.path.join(BLOB_DIR, prefix)
+            for blob in os.listdir(folder):
+                path = os.path.join(folder, blob)
+                # Temporary files and fresh blobs may belong to a run in progress
+                if blob in in_use or blob.endswith(".tmp") or os.path.getmtime(path) > cutoff:
+                    continue
+                os.remove(path)
+                deleted += 1
+    # Thumbnails of blobs that are gone
+    if os.path.isdir(THUMB_DIR):
+        thumbs_in_use = {os.path.basename(_thumb_path(blob)) for blob in in_use}
+        for thumb in os.listdir(THUMB_DIR):
+            path = os.path.join(THUMB_DIR, thumb)
+            if thumb in thumbs_in_use or thumb.startswith("loose_") or os.path.getmtime(path) > cutoff:
+                continue
+            os.remove(path)
+    return deleted
+
+
+def open_blob(blob):
+    """A binary file object reading a blob uncompressed"""
+    opener = gzip.open if blob.endswith(".gz") else open
+    return opener(_blob_path(blob), 'rb')
+
+
+def read_blob(blob):
+    """The bytes of a blob, uncompressed"""
+    with open_blob(blob) as f:
+        return f.read()
+
+
+def blob_sizes(blobs):
+    """Blob -> bytes on disk (0 if it is gone)"""
+    sizes = {}
+    for blob in blobs:
+        try:
+            sizes[blob] = os.path.getsize(_blob_path(blob))
+        except OSError:
+            sizes[blob] = 0
+    return sizes
+
+
+def disk_usage(index=None):
+    """(bytes the artifacts would take as plain files, bytes their blobs take)"""
+    if index is None:
+        index = load_index()
+    logical = sum(record.get('size', 0) for record in index.values())
+    stored = sum(blob_sizes({record['blob'] for record in index.values()}).values())
+    return logical, stored
+
+
+def record_usage(index=None):
+    """Work out disk_usage() and keep it in usage.json for the gallery; returns {'logical', 'stored', 'time'}"""
+    logical, stored = disk_usage(index)
+    usage = {'logical': logical, 'stored': stored, 'time': time.time()}
+    os.makedirs(STORE_DIR, exist_ok=True)
+    temp_path = f"{USAGE_FILE}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(usage, f)
+    os.replace(temp_path, USAGE_FILE)
+    return usage
+
+
+def load_usage():
+    """The disk usage the last retention pass recorded, or None"""
+    try:
+        with open(USAGE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
@@ -228,11 +228,8 @@ class AutomatedHTMLTester:
             self._show_error("Please select a test cases file")
             return
             
-        # Determine which script to run
-        script_file = f"app4{platform_type}.py"
-        
         # Build command
-        cmd = [sys.executable, script_file, "--test-set", test_file]
+        cmd = [sys.executable, "auto_test.py", "--platform", platform_type, "--test-set", test_file]
         
         # Add options
         if headless:
@@ -0,0 +1,118 @@
+"""Per-case deadline enforcement for the test scripts.
+
+A hung browser used to take the whole run with it: app.py only noticed after
+two minutes of silence and then killed the entire script.  CaseWatchdog runs
+inside the test script instead.  When a single test case overruns its
+deadline it kills the chromedriver process behind the stuck session and
+the Chrome processes under it (found with psutil if it is installed, with
+ps otherwise), which makes the blocked WebDriver call fail immediately.
+The script then records the case as a timeout, starts a fresh browser and
+moves on to the next case.
+The browser work between cases (fingerprinting the site, getting back to
+the search page) is held to the same deadline.
+"""
+import os
+import signal
+import subprocess
+import threading
+import time
+
+# Default per-case deadline in seconds (overridable with --case-timeout)
+DEFAULT_CASE_TIMEOUT = 300
+
+
+class CaseWatchdog:
+    """Fire a callback when the current test case runs past its deadline"""
+
+    def __init__(self, timeout, on_timeout, poll_interval=1.0):
+        self.timeout = timeout
+        self.on_timeout = on_timeout
+        self.poll_interval = poll_interval
+        self.fired = False
+        self._case = None
+        self._step = None
+        self._deadline = None
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def start_case(self, index, step=None):
+        """Arm the deadline for a new test case (or for a step of browser work outside one)"""
+        with self._lock:
+            self._case = index
+            self._step = step
+            self._deadline = time.monotonic() + self.timeout
+            self.fired = False
+
+    def finish_case(self):
+        """Disarm the deadline once the case has a result"""
+        with self._lock:
+            self._case = None
+            self._deadline = None
+
+    def _run(self):
+        while True:
+            time.sleep(self.poll_interval)
+            with self._lock:
+                expired = self._deadline is not None and time.monotonic() > self._deadline
+                if expired:
+                    what = f"test case {self._case + 1}" if self._case is not None else "the run"
+                    if self._step:
+                        what = f"{self._step} ({what})"
+                    self.fired = True
+                    self._deadline = None
+            if expired:
+                print(f"Case watchdog: {what} exceeded {self.timeout:.0f}s deadline - killing browser session")
+                try:
+                    self.on_timeout()
+                except Exception as e:
+                    print(f"Case watchdog: could not stop browser session: {str(e)}")
+
+
+def _descendants(pid):
+    """PIDs of every process below pid (Chrome and its renderers under chromedriver)"""
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        try:
+            return [child.pid for child in psutil.Process(pid).children(recursive=True)]
+        except psutil.Error:
+            return []
+    if os.name == "nt":
+        # taskkill /T takes the tree down itself
+        return []
+    try:
+        output = subprocess.run(["ps", "-A", "-o", "pid=,ppid="], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return []
+    children = {}
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) == 2 and parts[0].isdigit() and parts[1].isdigit():
+            children.setdefault(int(parts[1]), []).append(int(parts[0]))
+    found, todo = [], [pid]
+    while todo:
+        for child in children.get(todo.pop(), []):
+            found.append(child)
+            todo.append(child)
+    return found
+
+
+def kill_browser(driver):
+    """Forcefully stop the chromedriver process behind a WebDriver session, and the browser it started"""
+    process = getattr(getattr(driver, "service", None), "process", None)
+    if process is None:
+        # Fall back to a normal quit if we can't reach the driver process
+        driver.quit()
+        return
+    if os.name == "nt":
+        subprocess.run(["taskkill", "/T", "/F", "/PID", str(process.pid)], capture_output=True)
+    # Children first - once chromedriver is gone they can't be found under it
+    for pid in reversed(_descendants(process.pid)):
+        try:
+            os.kill(pid, signal.SIGKILL if hasattr(signal, "SIGKILL") else signal.SIGTERM)
+        except OSError:
+            pass
+    process.kill()
@@ -0,0 +1,101 @@
+"""Per-case checkpointing so long test runs can be resumed.
+
+Every finished test case is appended to checkpoints/<run_id>.jsonl as soon
+as it has a result.  If the run dies part way through (watchdog kill, Chrome
+crash, FATAL ERROR) it can be restarted with `--resume <run_id>`: cases that
+already have a result are skipped and the earlier results are copied into
+the new results file before testing continues.
+"""
+import json
+import os
+import uuid
+from datetime import datetime
+
+CHECKPOINT_DIR = "checkpoints"
+
+
+def checkpoint_path(run):
+    """Resolve a run ID or checkpoint file path to the checkpoint file"""
+    if run.endswith(".jsonl") or os.sep in run:
+        return run
+    return os.path.join(CHECKPOINT_DIR, f"{run}.jsonl")
+
+
+def case_key(index, search):
+    """Identify a test case by its row and search text, so an edited test file doesn't match stale results"""
+    return f"{index}|{search}"
+
+
+class Checkpoint:
+    """Append-only record of finished test cases for one run"""
+
+    def __init__(self, test_set, platform, resume=None):
+        self.completed = set()
+        self._earlier = 0
+
+        if resume:
+            self.path = checkpoint_path(resume)
+            if not os.path.exists(self.path):
+                raise FileNotFoundError(f"No checkpoint found for run '{resume}' ({self.path})")
+            self.run_id = os.path.splitext(os.path.basename(self.path))[0]
+            self._load()
+            print(f"Resuming run {self.run_id}: {len(self.completed)} test cases already complete")
+        else:
+            os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+            # Platform runs of a --platform all run, and the chunk engines of
+            # local runner agents, start in the same second - a short random
+            # suffix keeps their checkpoints and manifests apart
+            safe_platform = "".join(c if c.isalnum() or c in "-_" else "_" for c in str(platform))
+            self.run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{safe_platform}_{uuid.uuid4().hex[:6]}"
+            self.path = checkpoint_path(self.run_id)
+
+        self._file = open(self.path, "a", encoding="utf-8")
+        if not resume:
+            self._write({'type': 'run', 'test_set': test_set, 'platform': platform,
+                         'started': datetime.now().strftime("%Y-%m-%d %H:%M:%S")})
+        print(f"Checkpointing results to {self.path} (resume with --resume {self.run_id})")
+
+    def _records(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A partially written last line from a crash
+                    continue
+                if record.get('type') == 'case':
+                    yield record
+
+    def _load(self):
+        for record in self._records():
+            self.completed.add(case_key(record['index'], record['result']['Search']))
+            self._earlier += 1
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, default=str) + "\n")
+        self._file.flush()
+
+    def is_done(self, index, search):
+        """Check if a test case already has a result from an earlier attempt"""
+        return case_key(index, search) in self.completed
+
+    def record(self, index, result, duration=None):
+        """Append a finished test case to the checkpoint"""
+        record = {'type': 'case', 'index': index, 'result': result,
+                  'time': datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+        if duration is not None:
+            record['duration'] = round(duration, 2)
+        self.completed.add(case_key(index, result['Search']))
+        self._write(record)
+
+    def earlier_results(self):
+        """Results recorded by earlier attempts at this run, read back from the checkpoint file"""
+        for count, record in enumerate(self._records()):
+            if count >= self._earlier:
+                break
+            yield record['result']
+
+    def finish(self, results_file):
+        """Mark the run as complete"""
+        self._write({'type': 'done', 'results_file': results_file})
+        self._file.close()
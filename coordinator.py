@@ -0,0 +1,409 @@
+"""Coordinator for running one test set on several runner hosts.
+
+The coordinator splits the test set into chunks and serves them over HTTP
+to runner agents (runner_agent.py), which pull a chunk, run it with the
+engine on their own machine and post each result back as soon as the case
+finishes:
+
+    python coordinator.py --platform app --test-set test_cases.csv --port 8765
+    python runner_agent.py --coordinator http://coordinator-host:8765   (on each runner)
+
+Agents heartbeat while they work; a chunk whose agent goes quiet for
+AGENT_TIMEOUT seconds goes back in the queue, and so does whatever is left
+of an agent's chunk when it asks for more work (its engine crashed or a
+result got lost).  When the queue is empty an
+idle agent steals the back half of the busiest chunk, and the agent that
+owned it is told to stop once it reaches the stolen cases.  When every case
+has a result they are merged, in test set order, into one results file.
+
+Chunks are cut by the case durations recorded in results.db (see
+sharding.py): each holds about --chunk-size cases' worth of time and the
+longest chunks go out first, so no agent is left with all the slow cases
+at the end.  Without any recorded durations chunks are --chunk-size rows of
+the test set.
+
+For a single box, --local-agents N starts N agents on this machine.
+
+/job hands out the site credentials, so every request must carry the run's
+token in the X-Coordinator-Token header.  The token is taken from
+COORDINATOR_TOKEN, or made up and printed at startup; agents read it from
+COORDINATOR_TOKEN too.
+
+API (JSON over HTTP):
+    GET  /job        the run options agents need to build their engine command
+    POST /work       {"agent"} -> {"chunk": id, "cases": [...]} | {"wait": s} | {"done": true}
+    POST /heartbeat  {"agent", "chunk"}
+    POST /result     {"agent", "chunk", "index", "result", "attempts"} -> {"chunk_done": bool}
+    GET  /status     progress counters
+"""
+import argparse
+import hmac
+import json
+import os
+import secrets
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import progress
+import sharding
+from results_writer import ResultsWriter
+from test_loader import load_test_cases
+
+# Seconds without a heartbeat before an agent's chunks are handed out again
+AGENT_TIMEOUT = 60
+# Seconds an idle agent waits before asking for work again
+IDLE_WAIT = 5
+# Times a case goes back in the queue without a result before it is failed
+MAX_REQUEUES = 3
+# Shared secret every request must carry, since /job serves the site credentials
+TOKEN_ENV = "COORDINATOR_TOKEN"
+TOKEN_HEADER = "X-Coordinator-Token"
+# Options the agents pass on to the engine
+JOB_OPTIONS = ("platform", "site", "url", "username", "password", "headless",
+               "save_all_screenshots", "visual", "fixed_wait", "no_cache", "wait_time", "case_timeout", "retry_budget")
+
+# Set up by main()
+job = {}          # run options served on /job
+cases = {}        # case index -> {'search', 'expected', 'expected_result'}
+results = {}      # case index -> result row
+chunks = {}       # chunk id -> {'cases': [...], 'agent', 'state', 'stolen'}
+pending = []      # chunk ids waiting for an agent
+agents = {}       # agent name -> {'last_seen', 'chunks', 'completed'}
+requeues = {}     # case index -> times it went back in the queue without a result
+token = None      # shared secret of the run
+lock = threading.Lock()
+done_event = threading.Event()
+next_chunk_id = 0
+
+
+def build_parser():
+    """Command line arguments"""
+    parser = argparse.ArgumentParser(description="Distributed test run coordinator")
+    parser.add_argument("--test-set", default="test_cases.csv", help="Path to test cases CSV file")
+    parser.add_argument("--platform", choices=["web", "pro", "app", "custom"], default="web",
+                        help="Platform type to test (default: web)")
+    parser.add_argument("--site", help="Name of the platform entry in the config file to test")
+    parser.add_argument("--url", help="Override the URL in the config file (required for custom sites)")
+    parser.add_argument("--username", help="Username for login")
+    parser.add_argument("--password", help="Password for login")
+    parser.add_argument("--headless", action="store_true", help="Run the agents' browsers in headless mode")
+    parser.add_argument("--save-all-screenshots", action="store_true",
+                        help="Save screenshots for all steps, not just errors")
+    parser.add_argument("--wait-time", type=float, default=2.0, help="Wait time between actions (default: 2.0)")
+    parser.add_argument("--fixed-wait", action="store_true",
+                        help="Wait fixed multiples of --wait-time instead of pacing each step from measured page response times")
+    parser.add_argument("--case-timeout", type=float, default=300, help="Per-case deadline on the agents (default: 300)")
+    parser.add_argument("--visual", action="store_true", help="Load pages in full, ignoring resource blocking")
+    parser.add_argument("--no-cache", action="store_true", help="Run every test case even if the platform has a result cache")
+    parser.add_argument("--retry-budget", type=int, default=10,
+                        help="Retries of transient failures each agent's engine may use per chunk (default: 10)")
+    parser.add_argument("--chunk-size", type=int, default=5,
+                        help="Test cases handed to an agent at a time, on average when chunks are cut by "
+                             "recorded case durations (default: 5)")
+    parser.add_argument("--host", default="0.0.0.0", help="Address to listen on (default: 0.0.0.0)")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765)")
+    parser.add_argument("--local-agents", type=int, default=0,
+                        help="Start this many runner agents on this machine")
+    parser.add_argument("--results-file", help="Write results to this file instead of a new timestamped one")
+    return parser
+
+
+def new_chunk(case_indexes):
+    """Queue a chunk of test cases"""
+    global next_chunk_id
+    next_chunk_id += 1
+    chunks[next_chunk_id] = {'cases': list(case_indexes), 'agent': None, 'state': 'pending', 'stolen': []}
+    pending.append(next_chunk_id)
+    return next_chunk_id
+
+
+def remaining_cases(chunk):
+    """Cases of a chunk that don't have a result yet"""
+    return [index for index in chunk['cases'] if index not in results]
+
+
+def chunk_payload(chunk_id):
+    return {'chunk': chunk_id, 'cases': [dict(cases[index], index=index) for index in chunks[chunk_id]['cases']]}
+
+
+def steal_work(agent):
+    """Split off the back half of the busiest chunk for an idle agent"""
+    victim_id, victim_left = None, []
+    for chunk_id, chunk in chunks.items():
+        if chunk['state'] != 'assigned' or chunk['agent'] == agent:
+            continue
+        # The first case without a result is probably running - leave it alone
+        left = remaining_cases(chunk)[1:]
+        if len(left) >= 2 and len(left) > len(victim_left):
+            victim_id, victim_left = chunk_id, left
+    if victim_id is None:
+        return None
+
+    stolen = victim_left[len(victim_left) // 2:]
+    victim = chunks[victim_id]
+    victim['cases'] = [index for index in victim['cases'] if index not in stolen]
+    victim['stolen'].extend(stolen)
+    print(f"Agent {agent} stole {len(stolen)} cases from chunk {victim_id} ({victim['agent']})")
+    chunk_id = new_chunk(stolen)
+    pending.remove(chunk_id)
+    return chunk_id
+
+
+def release_chunks(agent, reason):
+    """Requeue what is left of an agent's assigned chunks; call with the lock held
+
+    A case that keeps coming back without a result (it crashes the engine
+    every time) is failed after MAX_REQUEUES tries instead of going round
+    forever."""
+    info = agents[agent]
+    for chunk_id in info['chunks']:
+        chunk = chunks[chunk_id]
+        if chunk['state'] != 'assigned':
+            continue
+        chunk['state'] = 'lost'
+        left = []
+        for index in remaining_cases(chunk):
+            requeues[index] = requeues.get(index, 0) + 1
+            if requeues[index] > MAX_REQUEUES:
+                store_result(agent, index, f"F - Agent Error: no result after {MAX_REQUEUES + 1} tries", 0)
+            else:
+                left.append(index)
+        if left:
+            print(f"Agent {agent} {reason} - requeueing {len(left)} cases from chunk {chunk_id}")
+            new_chunk(left)
+    info['chunks'] = []
+    if len(results) == len(cases):
+        done_event.set()
+
+
+def assign_work(agent):
+    """Answer a /work request"""
+    with lock:
+        agents.setdefault(agent, {'last_seen': time.time(), 'chunks': [], 'completed': 0})
+        agents[agent]['last_seen'] = time.time()
+        # An agent runs one chunk at a time, so asking for more means its
+        # engine is gone - cases it never reported (a crash, a lost result)
+        # go back in the queue
+        release_chunks(agent, "asked for more work")
+        if done_event.is_set():
+            return {'done': True}
+
+        chunk_id = pending.pop(0) if pending else steal_work(agent)
+        if chunk_id is None:
+            return {'wait': IDLE_WAIT}
+
+        chunk = chunks[chunk_id]
+        chunk['agent'] = agent
+        chunk['state'] = 'assigned'
+        agents[agent]['chunks'].append(chunk_id)
+        print(f"Chunk {chunk_id} ({len(chunk['cases'])} cases) -> agent {agent}")
+        return chunk_payload(chunk_id)
+
+
+def heartbeat(agent):
+    with lock:
+        if agent in agents:
+            agents[agent]['last_seen'] = time.time()
+    return {'ok': True}
+
+
+def store_result(agent, index, result, attempts):
+    """Keep the first result of a case (a stolen or requeued case may be run twice); call with the lock held"""
+    if index in results:
+        return
+    row = {'Search': cases[index]['search'], 'Expected': cases[index]['expected'], 'Result': result,
+           'Attempts': attempts}
+    results[index] = row
+    if agent in agents:
+        agents[agent]['completed'] += 1
+    progress.case_result(index, row['Search'], row['Result'], attempts)
+    print(f"[{agent}] case {index + 1}/{len(cases)}: {result}")
+
+
+def record_result(agent, chunk_id, index, result, attempts=1):
+    """Store a streamed result; tells the agent when its chunk needs nothing more"""
+    with lock:
+        if agent in agents:
+            agents[agent]['last_seen'] = time.time()
+        chunk = chunks.get(chunk_id)
+        if chunk is None or index not in cases:
+            return {'chunk_done': True}
+
+        store_result(agent, index, result, attempts)
+
+        chunk_done = not remaining_cases(chunk)
+        if chunk_done and chunk['state'] == 'assigned':
+            chunk['state'] = 'done'
+        if len(results) == len(cases):
+            done_event.set()
+        return {'chunk_done': chunk_done}
+
+
+def requeue_lost_work():
+    """Give the unfinished cases of agents that stopped heartbeating to someone else"""
+    with lock:
+        now = time.time()
+        for agent, info in agents.items():
+            if now - info['last_seen'] > AGENT_TIMEOUT:
+                release_chunks(agent, "went quiet")
+
+
+def status():
+    with lock:
+        return {
+            'total': len(cases),
+            'completed': len(results),
+            'pending_chunks': len(pending),
+            'agents': {name: {'completed': info['completed'], 'idle_seconds': round(time.time() - info['last_seen'], 1)}
+                       for name, info in agents.items()},
+            'done': done_event.is_set(),
+        }
+
+
+class CoordinatorHandler(BaseHTTPRequestHandler):
+    """JSON API for the runner agents"""
+
+    def _send(self, payload, code=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self):
+        given = self.headers.get(TOKEN_HEADER, "")
+        if token and hmac.compare_digest(given.encode("utf-8"), token.encode("utf-8")):
+            return True
+        self._send({'error': 'missing or wrong token'}, 401)
+        return False
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        if self.path == "/job":
+            self._send(job)
+        elif self.path == "/status":
+            self._send(status())
+        else:
+            self._send({'error': 'not found'}, 404)
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            data = json.loads(self.rfile.read(length) or b"{}")
+            agent = str(data.get("agent", self.client_address[0]))
+            if self.path == "/work":
+                self._send(assign_work(agent))
+            elif self.path == "/heartbeat":
+                self._send(heartbeat(agent))
+            elif self.path == "/result":
+                self._send(record_result(agent, data.get("chunk"), data.get("index"), data.get("result"),
+                                         data.get("attempts", 1)))
+            else:
+                self._send({'error': 'not found'}, 404)
+        except Exception as e:
+            print(f"Error handling {self.path}: {str(e)}")
+            self._send({'error': str(e)}, 400)
+
+    def log_message(self, format, *args):
+        # Requests are logged by the handlers themselves
+        pass
+
+
+def start_local_agents(count, port):
+    """Start runner agents on this machine (for trying the setup on one box)"""
+    processes = []
+    env = dict(os.environ)
+    env[TOKEN_ENV] = token
+    for number in range(count):
+        cmd = [sys.executable, "runner_agent.py", "--coordinator", f"http://127.0.0.1:{port}",
+               "--name", f"local-{number + 1}"]
+        processes.append(subprocess.Popen(cmd, env=env))
+        print(f"Started local agent local-{number + 1}")
+    return processes
+
+
+def write_results(path=None):
+    """Merge the streamed results into one results file in test set order"""
+    writer = ResultsWriter(path)
+    for index in sorted(results):
+        writer.write(results[index])
+    writer.close()
+    return writer
+
+
+def main(argv=None):
+    """Load and shard the test set, serve it to the agents and merge their results"""
+    global token
+    args = build_parser().parse_args(argv)
+    if args.platform == "custom" and not args.url:
+        print("--url is required for custom sites")
+        return 1
+
+    test_cases = load_test_cases(args.test_set, vehicle_search=args.platform != "custom")
+    for test_case in test_cases:
+        cases[test_case.index] = {'search': test_case.search, 'expected': test_case.expected,
+                                  'expected_result': test_case.expected_result}
+    job.update({option: getattr(args, option) for option in JOB_OPTIONS})
+    job['test_set'] = args.test_set
+    indexes = sorted(cases)
+    durations = sharding.case_durations(sharding.platform_name(args.platform, args.site))
+    if durations:
+        # Chunks of even estimated time, the longest handed out first
+        count = -(-len(indexes) // max(args.chunk_size, 1))
+        shards = sharding.lpt_shards(sharding.estimate([cases[index]['search'] for index in indexes], durations), count)
+        for total, positions in shards:
+            new_chunk([indexes[position] for position in positions])
+        print(f"Loaded {len(cases)} test cases from {args.test_set} in {len(chunks)} chunks of about "
+              f"{sum(total for total, _ in shards) / max(len(shards), 1) / 60:.1f} minutes each")
+    else:
+        for start in range(0, len(indexes), max(args.chunk_size, 1)):
+            new_chunk(indexes[start:start + args.chunk_size])
+        print(f"Loaded {len(cases)} test cases from {args.test_set} in {len(chunks)} chunks of up to {args.chunk_size}")
+
+    token = os.environ.get(TOKEN_ENV)
+    if not token:
+        token = secrets.token_urlsafe(16)
+        print(f"Agents must run with {TOKEN_ENV}={token} (set {TOKEN_ENV} before starting the coordinator to choose it)")
+    server = ThreadingHTTPServer((args.host, args.port), CoordinatorHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Coordinator listening on http://{args.host}:{args.port}")
+    progress.run_started(len(cases), args.test_set, args.platform, args.case_timeout)
+    progress.start_heartbeat()
+
+    local_agents = start_local_agents(args.local_agents, args.port)
+    started = time.time()
+    try:
+        while not done_event.wait(timeout=AGENT_TIMEOUT / 4):
+            requeue_lost_work()
+            current = status()
+            print(f"Progress: {current['completed']}/{current['total']} cases, {len(current['agents'])} agents")
+    except KeyboardInterrupt:
+        print("Interrupted - writing the results received so far")
+
+    # Give agents a moment to hear that the run is done
+    time.sleep(IDLE_WAIT)
+    server.shutdown()
+    for process in local_agents:
+        try:
+            process.wait(timeout=AGENT_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            process.terminate()
+
+    writer = write_results(args.results_file)
+    print(f"\nTesting complete in {time.time() - started:.0f}s! Results saved to {writer.path}")
+    for name, info in agents.items():
+        print(f"  Agent {name}: {info['completed']} cases")
+    progress.run_done(writer.path, writer.total, writer.passed, writer.failed)
+    writer.print_summary()
+    return 0 if len(results) == len(cases) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+"""Structural diff of the saved page sources of two runs.
+
+Selectors break when a site renames a form field, and searches go wrong
+when a dropdown loses options or the results table changes shape.  This
+compares the HTML saved at every case and step of a run with the same step
+of the case with the same search in a baseline run (by default the previous finished run on the same
+platform) and reports:
+
+    fields   form fields (input, select, textarea, button) added or removed,
+             by id or name
+    options  dropdown options added or removed, per select
+    tables   tables whose header cells or column count changed
+    broken   ids used in the platform's selectors (config4*.json) that the
+             baseline page had and this page doesn't
+
+Pages are parsed as a stream with html.parser, in a process pool, into a
+small summary that is cached by blob hash in screenshots/dom_summaries.json,
+so a page that recurs across cases and runs is parsed once.  The report is
+written to screenshots/runs/<run_id>/dom_diff.json, which the results page
+reads.
+
+    python dom_diff.py 20240101_120000_web_3f9a1c [--baseline 20231231_120000_web_b27e40]
+
+or run the engine with --compare-dom.
+"""
+import argparse
+import glob
+import io
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+
+import artifact_store
+
+SUMMARY_CACHE = artifact_store.DOM_SUMMARY_FILE
+REPORT_NAME = "dom_diff.json"
+FIELD_TAGS = ("input", "select", "textarea", "button")
+# Characters fed to the parser at a time
+CHUNK_SIZE = 64 * 1024
+# "#some-id" in a CSS selector
+SELECTOR_ID = re.compile(r"#([A-Za-z_][\w-]*)")
+
+
+class StructureParser(HTMLParser):
+    """Collects element ids, form fields, dropdown options and table shapes"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.ids = set()
+        self.fields = set()
+        self.selects = {}
+        self.tables = {}
+        self._select = None
+        self._option = None
+        self._tables = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if attrs.get('id'):
+            self.ids.add(attrs['id'])
+        if tag in FIELD_TAGS:
+            if attrs.get('id'):
+                self.fields.add(f"{tag}#{attrs['id']}")
+            elif attrs.get('name'):
+                self.fields.add(f"{tag}[name={attrs['name']}]")
+        if tag == "select":
+            self._close_option()
+            self._select = attrs.get('id') or attrs.get('name') or f"select {len(self.selects) + 1}"
+            self.selects[self._select] = []
+        elif tag == "option" and self._select is not None:
+            # </option> is optional - a new option ends the one before
+            self._close_option()
+            self._option = []
+        elif tag == "table":
+            key = attrs.get('id') or f"table {len(self.tables) + 1}"
+            self.tables[key] = {'headers': [], 'columns': 0}
+            self._tables.append({'key': key, 'row': 0, 'cells': 0, 'header': None})
+        elif self._tables:
+            table = self._tables[-1]
+            if tag == "tr":
+                table['row'] += 1
+                table['cells'] = 0
+            elif tag in ("td", "th"):
+                table['cells'] += 1
+                if table['row'] <= 1:
+                    self.tables[table['key']]['columns'] = table['cells']
+                if tag == "th":
+                    table['header'] = []
+
+    def _close_option(self):
+        if self._option is not None:
+            self.selects[self._select].append(" ".join("".join(self._option).split()))
+            self._option = None
+
+    def handle_endtag(self, tag):
+        if tag in ("option", "optgroup"):
+            self._close_option()
+        elif tag == "select":
+            self._close_option()
+            self._select = None
+        elif tag == "th" and self._tables and self._tables[-1]['header'] is not None:
+            table = self._tables[-1]
+            self.tables[table['key']]['headers'].append(" ".join("".join(table['header']).split()))
+            table['header'] = None
+        elif tag == "table" and self._tables:
+            self._tables.pop()
+
+    def handle_data(self, data):
+        if self._option is not None:
+            self._option.append(data)
+        elif self._tables and self._tables[-1]['header'] is not None:
+            self._tables[-1]['header'].append(data)
+
+    def summary(self):
+        self._close_option()
+        return {'ids': sorted(self.ids), 'fields': sorted(self.fields),
+                'selects': self.selects, 'tables': self.tables}
+
+
+def summarize_blob(blob):
+    """Parse a saved page a chunk at a time; runs in a worker process"""
+    parser = StructureParser()
+    # The text wrapper keeps multi-byte characters whole across chunks
+    with io.TextIOWrapper(artifact_store.open_blob(blob), encoding="utf-8", errors="replace") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            parser.feed(chunk)
+    parser.close()
+    return parser.summary()
+
+
+def load_summaries():
+    try:
+        with open(SUMMARY_CACHE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_summaries(summaries):
+    # Only keep the pages that are still stored
+    in_use = {record['blob'] for record in artifact_store.load_index().values()}
+    kept = {blob: summary for blob, summary in summaries.items() if blob in in_use}
+    temp_path = f"{SUMMARY_CACHE}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(kept, f)
+    os.replace(temp_path, SUMMARY_CACHE)
+
+
+def selector_ids(platform_name):
+    """Ids the selectors of a platform in the config files refer to"""
+    ids = set()
+    for config_file in glob.glob("config4*.json"):
+        try:
+            with open(config_file, 'r') as f:
+                platforms = json.load(f).get('platforms', [])
+        except (OSError, ValueError):
+            continue
+        for platform in platforms:
+            if platform.get('name') == platform_name:
+                ids.update(SELECTOR_ID.findall(json.dumps(platform)))
+    return ids
+
+
+def _added_removed(old, new):
+    old_set, new_set = set(old), set(new)
+    return [item for item in new if item not in old_set], [item for item in old if item not in new_set]
+
+
+def diff_summaries(old, new, watched_ids=()):
+    """Structural changes from one page summary to another (empty if none)"""
+    changes = {}
+    added, removed = _added_removed(old['fields'], new['fields'])
+    if added or removed:
+        changes['fields'] = {'added': added, 'removed': removed}
+    options = {}
+    for key in old['selects']:
+        if key in new['selects']:
+            added, removed = _added_removed(old['selects'][key], new['selects'][key])
+            if added or removed:
+                options[key] = {'added': added, 'removed': removed}
+    if options:
+        changes['options'] = options
+    tables = {}
+    for key in set(old['tables']) | set(new['tables']):
+        if old['tables'].get(key) != new['tables'].get(key):
+            tables[key] = {'old': old['tables'].get(key), 'new': new['tables'].get(key)}
+    if tables:
+        changes['tables'] = tables
+    old_ids, new_ids = set(old['ids']), set(new['ids'])
+    broken = sorted(i for i in watched_ids if i in old_ids and i not in new_ids)
+    if broken:
+        changes['broken'] = broken
+    return changes
+
+
+def report_path(run_id):
+    return os.path.join(os.path.dirname(artifact_store.manifest_path(run_id)), REPORT_NAME)
+
+
+def load_report(run_id):
+    """The DOM diff report of a run, or None if it wasn't compared"""
+    try:
+        with open(report_path(os.path.basename(run_id)), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def compare_runs(run_id, baseline=None, workers=None):
+    """Diff the page sources of a run against a baseline run; returns the report or None"""
+    manifest = artifact_store.load_manifest(run_id)
+    if manifest is None:
+        print(f"No page sources saved for run {run_id}")
+        return None
+    baseline = baseline or artifact_store.previous_run(run_id)
+    baseline_manifest = artifact_store.load_manifest(baseline) if baseline else None
+    if baseline_manifest is None:
+        print(f"No earlier run of {manifest.get('platform')} to compare run {run_id} with")
+        return None
+
+    started = time.perf_counter()
+    new_pages = artifact_store.step_artifacts(manifest, ".html")
+    old_pages = artifact_store.step_artifacts(baseline_manifest, ".html")
+    pairs = {key: (old_pages[key], record) for key, record in new_pages.items() if key in old_pages}
+
+    # Parse each page that isn't cached yet, once
+    summaries = load_summaries()
+    blobs = sorted({record['blob'] for pair in pairs.values() for record in pair
+                    if record['blob'] not in summaries and pair[0]['blob'] != pair[1]['blob']})
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for blob, summary in zip(blobs, pool.map(summarize_blob, blobs)):
+            summaries[blob] = summary
+    parsed = len(blobs)
+
+    watched_ids = selector_ids(manifest.get('platform'))
+    steps = []
+    for (_, step, occurrence), (old, new) in pairs.items():
+        if old['blob'] == new['blob']:
+            continue
+        changes = diff_summaries(summaries[old['blob']], summaries[new['blob']], watched_ids)
+        if changes:
+            steps.append(dict(changes, case=new['case'], step=step, occurrence=occurrence, name=new['name']))
+    save_summaries(summaries)
+
+    steps.sort(key=lambda entry: (not entry.get('broken'), not entry.get('fields'), entry['case']))
+    report = {
+        'run': run_id,
+        'baseline': baseline,
+        'compared': len(pairs),
+        'changed': len(steps),
+        'broken': sorted({i for entry in steps for i in entry.get('broken', [])}),
+        'time': time.time(),
+        'steps': steps,
+    }
+    with open(report_path(run_id), 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Compared {len(pairs)} page sources of run {run_id} with run {baseline} in "
+          f"{time.perf_counter() - started:.1f}s ({parsed} parsed): {len(steps)} changed structurally")
+    if report['broken']:
+        print(f"  Selector ids gone from their pages: {', '.join(report['broken'])}")
+    for entry in steps[:10]:
+        parts = []
+        if 'fields' in entry:
+            parts.append(f"{len(entry['fields']['added'])} fields added, {len(entry['fields']['removed'])} removed")
+        if 'options' in entry:
+            parts.append(f"options changed in {', '.join(entry['options'])}")
+        if 'tables' in entry:
+            parts.append(f"{len(entry['tables'])} tables changed")
+        print(f"  case {entry['case']} {entry['step']}: {', '.join(parts) or 'selector ids gone'}")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Diff the saved page sources of a run against an earlier run")
+    parser.add_argument("run", help="Run ID (see screenshots/runs/)")
+    parser.add_argument("--baseline", help="Run ID to compare with (default: the previous run on the same platform)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+    return 0 if compare_runs(args.run, args.baseline, args.workers) is not None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,959 @@
+"""Test execution engine shared by every platform.
+
+One run loop, one browser session and one set of helpers (debug capture,
+clicking, login, dropdown checks, error classification and results) for
+all platforms.  What differs between sites is the search flow for a single
+test case, which lives in a strategy class per platform type:
+
+    web     platform_web.WebStrategy        link dropdowns ("Step 1..16")
+    pro     platform_pro.ProStrategy        select dropdowns, login, interchange page
+    app     platform_app.AppStrategy        select dropdowns, interchange page
+    custom  platform_custom.CustomStrategy  generic site given with --url
+
+A platform entry with a "steps" list in the config file is run by
+platform_plan.PlanStrategy instead, whatever its type (see step_plan.py).
+That includes types of their own made in the web app (config4<type>.json),
+which --platform accepts as long as their config has a step plan.
+
+A test case that fails with a transient error is retried as RETRY_POLICIES
+says for its error category, within a --retry-budget for the whole run; the
+results file records the attempts each case took.
+
+A platform with a "cache" block skips test cases that passed recently on
+the same version of the site (see result_cache.py).
+
+A platform with a "blocking" profile keeps trackers, fonts and media out of
+the browser unless --visual is given (see resource_blocking.py).
+
+Waits go through settle() and wait_until(), which pace each step type from
+the response times measured on the site (see pacing.py).
+
+A strategy is created with the platform entry from the config file and
+provides run_case(test_case, index), which returns a result dict or raises.
+It may also override next_case() (after a result was recorded), recover()
+(after a failed case) and browser_restarted() (after the case watchdog
+replaced the browser).
+
+Run it through auto_test.py:  python auto_test.py --platform pro --test-set test_cases.csv
+"""
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import progress
+from pacing import Pacer
+from result_cache import ResultCache, site_fingerprint, DEFAULT_TTL_HOURS
+import resource_blocking
+import artifact_store
+import visual_diff
+import dom_diff
+import warehouse
+import quarantine
+import sharding
+from case_watchdog import CaseWatchdog, kill_browser, DEFAULT_CASE_TIMEOUT
+from checkpoint import Checkpoint
+from results_writer import ResultsWriter
+from test_loader import load_test_cases
+from runner_startup import dry_run, report_cold_start
+
+# Strategy class for each platform type, imported only when a run starts
+STRATEGIES = {
+    "web": ("platform_web", "WebStrategy"),
+    "pro": ("platform_pro", "ProStrategy"),
+    "app": ("platform_app", "AppStrategy"),
+    "custom": ("platform_custom", "CustomStrategy"),
+}
+
+# Retry policy per error category: (extra attempts, how to get ready for them)
+#   immediate    try again straight away
+#   reload       go back to the start page first (the strategy's recover())
+#   new_session  start a fresh browser session first
+# Other categories are not retried, and assertion failures are results, not errors.
+RETRY_POLICIES = {
+    "Page Changed": (2, "immediate"),
+    "Element Not Found": (1, "reload"),
+    "Timeout": (1, "new_session"),
+    "Case Timeout": (1, "new_session"),
+}
+DEFAULT_RETRY_BUDGET = 10
+
+# Set up by main() - the engine can be imported without side effects
+args = None
+WAIT_TIME = 2.0
+SAVE_ALL_SCREENSHOTS = False
+config = None
+platform = None
+chrome_options = None
+blocking_profile = None
+driver = None
+case_watchdog = None
+strategy = None
+checkpoint = None
+results_writer = None
+artifact_manifest = None
+pacer = None
+result_cache = None
+retries_left = 0
+retried_passes = 0
+dropdown_issues_log = []  # (search, issues) for the dropdown issues report
+
+
+def has_step_plan(platform_type):
+    """Whether config4<type>.json has a platform entry with a step plan"""
+    try:
+        with open(f"config4{platform_type}.json", 'r') as f:
+            platforms = json.load(f).get("platforms", [])
+    except (OSError, ValueError, AttributeError):
+        return False
+    return any(isinstance(entry, dict) and "steps" in entry for entry in platforms)
+
+
+def platform_type(value):
+    """--platform: a built-in type, 'all', or a type whose config file has a step plan"""
+    if value in STRATEGIES or value == "all" or has_step_plan(value):
+        return value
+    raise argparse.ArgumentTypeError(
+        f"unknown platform type '{value}' (expected one of {', '.join(sorted(STRATEGIES))}, all, "
+        f"or a type whose config4{value}.json has a step plan)")
+
+
+def build_parser():
+    """Command line arguments"""
+    parser = argparse.ArgumentParser(description="Car Parts Automation Test Script")
+    parser.add_argument("--platform", type=platform_type, default="web",
+                        help=f"Platform type to test ({', '.join(sorted(STRATEGIES))}, or a type of your own with a step plan "
+                             "in its config4<type>.json), or 'all' to run every configured platform in parallel (default: web)")
+    parser.add_argument("--site", help="Name of the platform entry in the config file to test (default: the first one)")
+    parser.add_argument("--test-set", help="Path to test cases CSV file")
+    parser.add_argument("--url", help="Override the URL in the config file (required for custom sites)")
+    parser.add_argument("--username", help="Username for login")
+    parser.add_argument("--password", help="Password for login")
+    parser.add_argument("--headless", action="store_true", help="Run tests in headless mode")
+    parser.add_argument("--save-all-screenshots", action="store_true",
+                        help="Save screenshots for all steps, not just errors (implies --visual)")
+    parser.add_argument("--visual", action="store_true",
+                        help="Load pages in full, ignoring the platform's resource blocking profile")
+    parser.add_argument("--compare-screenshots", action="store_true",
+                        help="After the run, diff its screenshots against the previous run's (see visual_diff.py)")
+    parser.add_argument("--compare-dom", action="store_true",
+                        help="After the run, diff its saved page sources against the previous run's (see dom_diff.py)")
+    parser.add_argument("--wait-time", type=float, default=2.0,
+                        help="Wait time between actions (default: 2.0)")
+    parser.add_argument("--fixed-wait", action="store_true",
+                        help="Wait fixed multiples of --wait-time instead of pacing each step from measured page response times")
+    parser.add_argument("--case-timeout", type=float, default=DEFAULT_CASE_TIMEOUT,
+                        help=f"Seconds a single test case may run before its browser session is restarted (default: {DEFAULT_CASE_TIMEOUT})")
+    parser.add_argument("--retry-budget", type=int, default=DEFAULT_RETRY_BUDGET,
+                        help=f"Retries of transient failures allowed in the whole run, 0 to turn retries off (default: {DEFAULT_RETRY_BUDGET})")
+    parser.add_argument("--results-file", help="Write results to this file instead of a new timestamped one")
+    parser.add_argument("--resume", metavar="RUN_ID",
+                        help="Resume an interrupted run, skipping test cases it already completed")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Run every test case even if the platform has a result cache")
+    parser.add_argument("--rerun-failed", metavar="RESULTS_FILE",
+                        help="Rerun only the failed test cases of an earlier results file and merge the outcomes into a new one")
+    parser.add_argument("--include-warnings", action="store_true",
+                        help="With --rerun-failed, rerun the P* (passed with warnings) cases too")
+    parser.add_argument("--quarantine", choices=["last", "skip", "only"], default="last",
+                        help="Flaky test cases in quarantine.json: run them after the others, skip them, "
+                             "or run only them (default: last)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Validate the config and test set without launching a browser")
+    return parser
+
+
+def import_selenium():
+    """Import selenium on first use - it is by far the slowest import in the engine"""
+    global webdriver, Options, By, WebDriverWait, EC, ActionChains, Keys, TimeoutException, NoSuchElementException, StaleElementReferenceException
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.common.action_chains import ActionChains
+    from selenium.webdriver.common.keys import Keys
+    from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
+
+
+def load_config(platform_type, url=None):
+    """Load the platform configuration, creating a default one if it doesn't exist"""
+    config_file = f"config4{platform_type}.json"
+    try:
+        with open(config_file, 'r') as f:
+            config = json.load(f)
+        print(f"Loaded configuration from {config_file}")
+    except FileNotFoundError:
+        print(f"Configuration file {config_file} not found. Creating default configuration.")
+        # Create a default configuration
+        config = {
+            "webdriver_options": ["--window-size=1200,800"],
+            "platforms": [
+                {
+                    "name": f"default_{platform_type}",
+                    "type": platform_type,
+                    "url": url or "https://example.com",
+                    "login": {"required": False}
+                }
+            ]
+        }
+        # Save default config
+        with open(config_file, 'w') as f:
+            json.dump(config, f, indent=4)
+    return config
+
+
+def select_platform(config, site=None):
+    """Pick the platform entry to test from the config (the first one unless --site is given)"""
+    if not site:
+        return config["platforms"][0]
+    for entry in config["platforms"]:
+        if entry["name"] == site:
+            return entry
+    print(f"No platform found with name '{site}'. Available platforms:")
+    for entry in config["platforms"]:
+        print(f"  - {entry['name']}")
+    return None
+
+
+def start_browser():
+    """Start Chrome, falling back to WebDriver Manager if no driver can be found"""
+    print("Starting Chrome browser...")
+    try:
+        # Selenium Manager finds a cached driver without a network round trip
+        browser = webdriver.Chrome(options=chrome_options)
+        print("Chrome browser started successfully")
+    except Exception as e:
+        print(f"Error starting Chrome browser: {str(e)}")
+        print("Attempting to start with WebDriver Manager...")
+        from selenium.webdriver.chrome.service import Service
+        from webdriver_manager.chrome import ChromeDriverManager
+        browser = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
+    if blocking_profile is not None:
+        resource_blocking.apply_to_driver(browser, blocking_profile)
+    return browser
+
+
+def restart_browser():
+    """Replace the browser session with a fresh one (after the case watchdog killed it, or to retry a case)"""
+    global driver
+    try:
+        driver.quit()
+    except Exception:
+        pass
+    driver = start_browser()
+    strategy.browser_restarted()
+    print("Started a fresh browser session")
+
+
+def save_debug_info(prefix, always_save=False, error_occurred=False):
+    """Save screenshot and HTML source for debugging"""
+    if case_watchdog.fired:
+        # The browser session was killed - nothing to capture
+        return None
+    if error_occurred or always_save or SAVE_ALL_SCREENSHOTS:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        name = f"{prefix}_{timestamp}"
+        if artifact_manifest is not None:
+            # Two saves in the same second must not share a name
+            name = artifact_manifest.unique_base(name, (".png", ".html"))
+            filename_base = f"screenshots/{artifact_manifest.run}/{name}"
+        else:
+            filename_base = f"screenshots/{name}"
+
+        # Pages that were already captured are only stored once (see artifact_store.py)
+        screenshot = driver.get_screenshot_as_png()
+        artifact_store.queue_thumbnail(artifact_store.save(f"{name}.png", screenshot, manifest=artifact_manifest), screenshot)
+        progress.artifact_saved(f"{filename_base}.png")
+        artifact_store.save(f"{name}.html", driver.page_source.encode("utf-8"), manifest=artifact_manifest)
+        progress.artifact_saved(f"{filename_base}.html")
+
+        print(f"Saved debug info to {filename_base}.png and {filename_base}.html")
+        return filename_base
+    else:
+        return None
+
+
+def scroll_to_element(element, description):
+    """Scroll to ensure element is in view before clicking"""
+    try:
+        driver.execute_script("arguments[0].scrollIntoView(true);", element)
+        print(f"Scrolled to {description}")
+        # Small delay to allow the page to settle after scrolling
+        settle("scroll", 0.25)
+        return True
+    except Exception as e:
+        print(f"Couldn't scroll to {description}: {str(e)}")
+        return False
+
+
+def try_click(element, description):
+    """Try multiple methods to click an element with scroll first"""
+    # First scroll to the element
+    scroll_to_element(element, description)
+
+    try:
+        # Method 1: Standard click
+        element.click()
+        print(f"Clicked {description} using standard click")
+        return True
+    except:
+        try:
+            # Method 2: JavaScript click
+            driver.execute_script("arguments[0].click();", element)
+            print(f"Clicked {description} using JavaScript")
+            return True
+        except:
+            try:
+                # Method 3: ActionChains
+                actions = ActionChains(driver)
+                actions.move_to_element(element).click().perform()
+                print(f"Clicked {description} using ActionChains")
+                return True
+            except Exception as e:
+                print(f"Could not click {description}: {str(e)}")
+                return False
+
+
+def settle(step, factor=1.0):
+    """Let the page settle after an action (at most factor x --wait-time, see pacing.py)"""
+    pacer.settle(driver, step, factor)
+
+
+def wait_until(condition, step="find", factor=1.0, optional=False):
+    """WebDriverWait for a condition with the step's paced timeout"""
+    return pacer.wait(driver, step, condition, factor, optional)
+
+
+def _wait_for_clickable(selector, method, wait_time=None, step="find", optional=False):
+    by = By.XPATH if method == "xpath" else By.CSS_SELECTOR
+    condition = EC.element_to_be_clickable((by, selector))
+    # An explicit wait time is used as is
+    if wait_time is not None:
+        return WebDriverWait(driver, wait_time).until(condition)
+    return wait_until(condition, step, optional=optional)
+
+
+def safe_find_and_click(selector, description, method="css", wait_time=None, optional=False, step="find"):
+    """Safely find and click an element, with fallbacks and error handling"""
+    try:
+        element = _wait_for_clickable(selector, method, wait_time, step, optional)
+
+        # Try to click the element (try_click scrolls it into view first)
+        if try_click(element, description):
+            print(f"Successfully clicked {description}")
+            return True
+        else:
+            print(f"Could not click {description} using standard methods")
+            return False
+    except Exception as e:
+        if optional:
+            print(f"Optional element {description} not found or not clickable: {str(e)}")
+            return False
+        else:
+            print(f"Error finding or clicking {description}: {str(e)}")
+            raise
+
+
+def safe_enter_text(selector, text, description, method="css", wait_time=None, optional=False, step="find"):
+    """Safely find an input element and enter text"""
+    try:
+        element = _wait_for_clickable(selector, method, wait_time, step, optional)
+        scroll_to_element(element, description)
+
+        # Clear and enter text
+        element.clear()
+        element.send_keys(text)
+        print(f"Entered {text} into {description}")
+        return True
+    except Exception as e:
+        if optional:
+            print(f"Optional element {description} not found or not accessible: {str(e)}")
+            return False
+        else:
+            print(f"Error finding or entering text into {description}: {str(e)}")
+            raise
+
+
+def handle_login(platform):
+    """Handle login if site requires it"""
+    if platform.get("requires_login", False):
+        try:
+            print(f"Logging in to {platform['name']}...")
+
+            # Wait for the login page to load
+            settle("login", 2)
+
+            # Take a screenshot to see the login page
+            save_debug_info("login_page", always_save=True)
+
+            # Find and fill username field
+            try:
+                username_field = wait_until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, platform["login_selectors"]["username_field"])), "login"
+                )
+                username_field.clear()
+                username_field.send_keys(platform["username"])
+                print(f"Entered username: {platform['username']}")
+
+                # Press Enter after username (sometimes required)
+                username_field.send_keys(Keys.RETURN)
+                settle("login")
+            except Exception as e:
+                print(f"Error entering username: {str(e)}")
+                return False
+
+            # Find and fill password field
+            try:
+                password_field = wait_until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, platform["login_selectors"]["password_field"])), "login"
+                )
+                password_field.clear()
+                password_field.send_keys(platform["password"])
+                print("Entered password")
+            except Exception as e:
+                print(f"Error entering password: {str(e)}")
+                return False
+
+            # Click login button
+            try:
+                login_button = wait_until(
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, platform["login_selectors"]["login_button"])), "login"
+                )
+                try_click(login_button, "login button")
+            except:
+                # Try submitting the form instead
+                try:
+                    password_field.send_keys(Keys.RETURN)
+                    print("Submitted login form with Enter key")
+                except Exception as e:
+                    print(f"Error clicking login button: {str(e)}")
+                    return False
+
+            # Wait for login to complete
+            settle("login", 2)
+
+            # Check if login was successful
+            current_url = driver.current_url
+            if "login" in current_url.lower():
+                print(f"Still on login page after attempt: {current_url}")
+                save_debug_info("login_failed", always_save=True)
+                return False
+            else:
+                print(f"Login successful! Redirected to: {current_url}")
+                return True
+        except Exception as e:
+            print(f"Login error: {str(e)}")
+            save_debug_info("login_error", error_occurred=True)
+            return False
+    else:
+        return True  # No login needed
+
+
+def check_dropdown_issues(select_element):
+    """Check for duplicates and ordering issues in a dropdown menu"""
+    dropdown_issues = []
+    options = [option.text for option in select_element.options if option.text.strip()]
+
+    # Check for duplicates
+    seen = set()
+    for option in options:
+        if option in seen and option != "Select Part":
+            dropdown_issues.append(f"Duplicate dropdown option found: {option}")
+        seen.add(option)
+
+    # Check alphabetical order (skipping any "Select" option)
+    sortable_options = [opt for opt in options if not opt.startswith("Select")]
+    sorted_options = sorted(sortable_options)
+    if sortable_options != sorted_options:
+        # Find some examples of out-of-order items
+        for i in range(len(sortable_options) - 1):
+            if sortable_options[i] > sortable_options[i+1]:
+                dropdown_issues.append(f"Dropdown options out of order: '{sortable_options[i]}' should come after '{sortable_options[i+1]}'")
+                # Limit to a few examples
+                if len([i for i in dropdown_issues if "out of order" in i]) >= 3:
+                    break
+
+    return dropdown_issues
+
+
+def summarize_dropdown_issues(dropdown_issues):
+    """Create a concise summary of dropdown issues"""
+    if not dropdown_issues:
+        return ""
+
+    # Count issues by type
+    duplicate_count = sum(1 for issue in dropdown_issues if "Duplicate dropdown option" in issue)
+    order_count = sum(1 for issue in dropdown_issues if "out of order" in issue)
+
+    # Create summary
+    summary_parts = []
+    if duplicate_count > 0:
+        summary_parts.append(f"{duplicate_count} duplicate dropdown options")
+    if order_count > 0:
+        summary_parts.append(f"{order_count} dropdown ordering issues")
+
+    return f" ({', '.join(summary_parts)})" if summary_parts else ""
+
+
+def log_dropdown_issues(search, dropdown_issues):
+    """Print dropdown issues and keep them for the end-of-run report"""
+    if not dropdown_issues:
+        return
+    print("Dropdown Issues Found:")
+    for issue in dropdown_issues[:5]:  # Show just the first few
+        print(f"  - {issue}")
+    if len(dropdown_issues) > 5:
+        print(f"  - And {len(dropdown_issues) - 5} more issues")
+    dropdown_issues_log.append((search, dropdown_issues))
+
+
+def write_dropdown_issues_log():
+    """Save detailed dropdown issues log if issues were found"""
+    if not dropdown_issues_log:
+        return None
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    issues_log_file = f"dropdown_issues_{timestamp}.txt"
+    with open(issues_log_file, 'w') as f:
+        for i, (test_case, issues) in enumerate(dropdown_issues_log):
+            f.write(f"Dropdown issues for test case {i+1}: {test_case}\n")
+            f.write("-" * 80 + "\n")
+            for issue in issues:
+                f.write(f"  - {issue}\n")
+            f.write("\n\n")
+    print(f"Detailed dropdown issues log saved to {issues_log_file}")
+    return issues_log_file
+
+
+def case_result(test_case, result):
+    """Build the results row for a test case"""
+    return {
+        'Search': test_case.search,
+        'Expected': test_case.expected,
+        'Result': result
+    }
+
+
+def classify_error(e):
+    """Error category of an exception raised by a test case"""
+    if case_watchdog.fired:
+        return "Case Timeout"
+    elif isinstance(e, NoSuchElementException):
+        return "Element Not Found"
+    elif isinstance(e, TimeoutException):
+        return "Timeout"
+    elif isinstance(e, StaleElementReferenceException):
+        return "Page Changed"
+    else:
+        return "General Error"
+
+
+def handle_test_error(e, test_case, index):
+    """Handle test errors, classify them, and document appropriately"""
+    error_message = str(e)
+    error_category = classify_error(e)
+
+    # Log detailed error information
+    print(f"ERROR ({error_category}): {error_message}")
+
+    # Save error screenshots and HTML
+    debug_file = save_debug_info(f"error_{error_category}_case_{index+1}", error_occurred=True)
+    print(f"Saved error debug info to {debug_file}")
+
+    # Capture additional diagnostic information
+    try:
+        current_url = driver.current_url
+        page_title = driver.title
+        print(f"Error occurred at: {page_title} - {current_url}")
+    except:
+        print("Could not get current page details")
+
+    # Store failure result with categorization
+    return case_result(test_case, f"F - {error_category}: {error_message[:100]}..." if len(error_message) > 100 else f"F - {error_category}: {error_message}")
+
+
+def prepare_retry(mode):
+    """Get ready to run a test case again"""
+    if mode == "new_session":
+        restart_browser()
+    elif mode == "reload":
+        strategy.recover()
+
+
+def run_case_with_retries(test_case, index):
+    """Run a test case, retrying transient failures as RETRY_POLICIES allows.
+
+    Returns the results row (with its Attempts) and the exception of the
+    last attempt, or None if it didn't raise."""
+    global retries_left, retried_passes
+    attempt = 0
+    while True:
+        attempt += 1
+        case_watchdog.start_case(index)
+        try:
+            result = strategy.run_case(test_case, index)
+        except Exception as e:
+            pacer.case_finished(error=True)
+            category = classify_error(e)
+            retries, mode = RETRY_POLICIES.get(category, (0, None))
+            if attempt > retries or retries_left <= 0:
+                if attempt <= retries:
+                    print(f"Retry budget for this run is used up - not retrying {category}")
+                result = handle_test_error(e, test_case, index)
+                result['Attempts'] = attempt
+                return result, e
+
+            retries_left -= 1
+            print(f"Attempt {attempt} failed ({category}): {str(e)[:100]}")
+            save_debug_info(f"retry_{category}_case_{index+1}_attempt_{attempt}", error_occurred=True)
+            print(f"Retrying case {index+1} ({mode}, {retries_left} retries left in this run)")
+            try:
+                prepare_retry(mode)
+            except Exception as prepare_error:
+                print(f"Could not prepare retry: {str(prepare_error)}")
+            continue
+
+        pacer.case_finished(error=False)
+        if attempt > 1 and str(result['Result']).startswith('P'):
+            retried_passes += 1
+        result['Attempts'] = attempt
+        return result, None
+
+
+@contextmanager
+def upkeep(step, index=None):
+    """Hold browser work outside a test case to the case deadline; check case_watchdog.fired afterwards"""
+    case_watchdog.start_case(index, step)
+    progress.upkeep_started(step, index)
+    try:
+        yield
+    finally:
+        case_watchdog.finish_case()
+        progress.upkeep_done()
+
+
+def plan_lanes(test_cases, quarantined, mode):
+    """[(index, test case, in quarantine)] in run order: the blocking lane, then the quarantine lane"""
+    blocking = [(index, test_case, False) for index, test_case in enumerate(test_cases)
+                if quarantine.search_key(test_case.search) not in quarantined]
+    held = [(index, test_case, True) for index, test_case in enumerate(test_cases)
+            if quarantine.search_key(test_case.search) in quarantined]
+    if mode == "skip":
+        return blocking
+    if mode == "only":
+        return held
+    return blocking + held
+
+
+def record_result(index, result, duration=None):
+    """Store a test case result and report it on the progress channel"""
+    case_watchdog.finish_case()
+    results_writer.write(result)
+    checkpoint.record(index, result, duration)
+    if artifact_manifest is not None:
+        # Retention keeps the artifacts of failed and retried cases longer
+        artifact_manifest.set_case_info(failed=not str(result['Result']).startswith('P'),
+                                        retried=result.get('Attempts', 1) > 1)
+    progress.case_result(index, result['Search'], result['Result'], result.get('Attempts', 1))
+
+
+class Strategy:
+    """Base class for per-platform search flows"""
+
+    # Test sets for this platform start with a year (see test_loader)
+    vehicle_search = True
+
+    def __init__(self, platform):
+        self.platform = platform
+
+    def run_case(self, test_case, index):
+        """Run one test case and return its results row"""
+        raise NotImplementedError
+
+    def next_case(self):
+        """Get ready for the next test case after a result was recorded"""
+
+    def recover(self):
+        """Get back to a usable page after a failed test case"""
+        try:
+            driver.get(self.platform["url"])
+            settle("page_load", 2)
+        except:
+            print("Could not reset to search page after error")
+
+    def browser_restarted(self):
+        """Called after the case watchdog replaced the browser session"""
+
+
+def run_tests():
+    """Run every test case in the test set with the selected platform strategy; returns False after a fatal error"""
+    global checkpoint, results_writer, retries_left, artifact_manifest
+    retries_left = args.retry_budget
+    try:
+        # Load all test cases
+        test_cases = load_test_cases(args.test_set, vehicle_search=strategy.vehicle_search)
+        print(f"Loaded {len(test_cases)} test cases from {args.test_set}")
+        checkpoint = Checkpoint(args.test_set, platform["name"], resume=args.resume)
+        results_writer = ResultsWriter(args.results_file)
+        artifact_manifest = artifact_store.RunManifest(checkpoint.run_id, platform["name"], results_writer.path)
+        # Carry over results from earlier attempts at this run
+        for earlier_result in checkpoint.earlier_results():
+            results_writer.write(earlier_result)
+
+        # Flaky cases (see quarantine.py) run in their own lane after the rest, or not at all
+        quarantined = quarantine.quarantined(platform["name"])
+        lanes = plan_lanes(test_cases, quarantined, args.quarantine)
+        held = sum(1 for _, _, in_quarantine in lanes if in_quarantine)
+        if args.quarantine == "skip" and len(lanes) < len(test_cases):
+            print(f"Skipping {len(test_cases) - len(lanes)} quarantined test cases")
+        quarantined_failures = 0
+        todo = [(index, test_case) for index, test_case, _ in lanes if not checkpoint.is_done(index, test_case.search)]
+        # Historical case durations let the progress channel predict when the run finishes
+        durations = sharding.case_durations(platform["name"])
+        estimates = {}
+        if durations:
+            estimates = dict(zip([index for index, _ in todo],
+                                 sharding.estimate([test_case.search for _, test_case in todo], durations)))
+        progress.run_started(len(todo), args.test_set, platform["name"], args.case_timeout, results_file=results_writer.path,
+                             estimated_seconds=round(sum(estimates.values()), 1) if estimates else None)
+
+        # Cached passes only count while the site is unchanged
+        if result_cache is not None:
+            try:
+                with upkeep("site fingerprint"):
+                    result_cache.fingerprint = site_fingerprint(driver, platform)
+                print(f"Site fingerprint {result_cache.fingerprint} - {len(result_cache.entries)} cached results for {platform['name']}")
+            except Exception as e:
+                print(f"Could not fingerprint the site, running without the result cache: {str(e)}")
+            if case_watchdog.fired:
+                restart_browser()
+
+        # Process each test case
+        for position, (index, test_case, in_quarantine) in enumerate(lanes):
+            if in_quarantine and (position == 0 or not lanes[position - 1][2]):
+                print(f"\nRunning {held} quarantined test cases")
+            if checkpoint.is_done(index, test_case.search):
+                print(f"Skipping case {index+1}/{len(test_cases)} - already completed in run {checkpoint.run_id}")
+                continue
+
+            print(f"\n{'='*80}\nTesting case {index+1}/{len(test_cases)}: {test_case.search}\n{'='*80}")
+            progress.case_started(index, len(test_cases), test_case.search, estimates.get(index))
+            case_started_at = time.perf_counter()
+            artifact_manifest.start_case(index, test_case.search)
+
+            cached = result_cache.lookup(test_case) if result_cache is not None else None
+            if cached is not None:
+                result = case_result(test_case, result_cache.cached_result(cached))
+                result['Attempts'] = 0
+                if in_quarantine:
+                    result['Quarantined'] = quarantine.QUARANTINED
+                print(f"Skipping - passed on this version of the site: {result['Result']}")
+                record_result(index, result)
+                continue
+
+            result, error = run_case_with_retries(test_case, index)
+            if in_quarantine:
+                result['Quarantined'] = quarantine.QUARANTINED
+                if not str(result['Result']).startswith('P'):
+                    quarantined_failures += 1
+            record_result(index, result, time.perf_counter() - case_started_at)
+            if result_cache is not None:
+                result_cache.store(test_case, result)
+            if error is not None:
+                # A stuck case had its browser killed - start a fresh one and move on
+                if case_watchdog.fired:
+                    restart_browser()
+
+                # Even after error, try to reset to search screen for next test
+                with upkeep("recovery", index):
+                    strategy.recover()
+                if case_watchdog.fired:
+                    restart_browser()
+                continue
+
+            try:
+                with upkeep("reset for next case", index):
+                    strategy.next_case()
+            except Exception as e:
+                print(f"Error resetting for next test: {str(e)}")
+            if case_watchdog.fired:
+                restart_browser()
+
+        artifact_manifest.start_case(None)
+
+        # Results were written to the CSV as each case finished
+        results_writer.close()
+        results_file = results_writer.path
+        print(f"\nTesting complete! Results saved to {results_file}")
+        checkpoint.finish(results_file)
+        artifact_manifest.finish()
+        try:
+            warehouse.ingest_checkpoint(checkpoint.path)
+        except Exception as e:
+            print(f"Could not add the run to {warehouse.DB_FILE}: {str(e)}")
+        if args.compare_screenshots:
+            try:
+                visual_diff.compare_runs(checkpoint.run_id)
+            except Exception as e:
+                print(f"Could not compare screenshots with the previous run: {str(e)}")
+        if args.compare_dom:
+            try:
+                dom_diff.compare_runs(checkpoint.run_id)
+            except Exception as e:
+                print(f"Could not compare page sources with the previous run: {str(e)}")
+        write_dropdown_issues_log()
+
+        # Summary statistics
+        progress.run_done(results_file, results_writer.total, results_writer.passed, results_writer.failed)
+        results_writer.print_summary()
+        if args.retry_budget > 0:
+            print(f"  Retries: {args.retry_budget - retries_left} of {args.retry_budget} used, "
+                  f"{retried_passes} cases passed on a retry")
+        if held:
+            print(f"  Quarantine lane: {held} flaky test cases, {quarantined_failures} failed (not blocking)")
+        if result_cache is not None and result_cache.fingerprint is not None:
+            print(f"  Cached passes: {result_cache.hits} test cases skipped (site unchanged)")
+        pacer.print_summary()
+
+        # Keep browser open for inspection when run by hand
+        if not args.headless and sys.stdin.isatty():
+            input("Press Enter to close the browser...")
+
+    except Exception as e:
+        print(f"FATAL ERROR: {str(e)}")
+        if results_writer is not None:
+            print(f"Partial results saved to {results_writer.path}")
+        if checkpoint is not None:
+            print(f"Completed test cases were checkpointed - rerun with --resume {checkpoint.run_id} to continue")
+        # Save screenshot when an error occurs
+        debug_file = save_debug_info("fatal_error", error_occurred=True)
+        print(f"Saved error debug info to {debug_file}")
+        return False
+
+    finally:
+        print("Test complete")
+        pacer.save()
+        if result_cache is not None:
+            result_cache.save()
+        driver.quit()
+        artifact_store.finish_thumbnails()
+    return True
+
+
+def main(argv=None):
+    """Parse arguments, check the config and test set, then start the browser and run the tests"""
+    global args, WAIT_TIME, SAVE_ALL_SCREENSHOTS, config, platform, chrome_options, driver, case_watchdog, strategy, pacer, result_cache, blocking_profile
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.platform == "custom" and not args.url:
+        parser.error("--url is required for custom sites")
+    WAIT_TIME = args.wait_time
+    SAVE_ALL_SCREENSHOTS = args.save_all_screenshots
+    if args.test_set is None:
+        args.test_set = "test_cases_custom.csv" if args.platform == "custom" else "test_cases.csv"
+
+    if args.rerun_failed:
+        # The failures of an earlier run, in an engine process per platform they ran on
+        import rerun
+        return rerun.run_failed(args)
+
+    if args.platform == "all":
+        # One engine process per configured platform
+        import fanout
+        return fanout.run_all(args)
+
+    # Load configuration
+    config_file = f"config4{args.platform}.json"
+    config = load_config(args.platform, args.url)
+    platform = select_platform(config, args.site)
+    if platform is None:
+        return 1
+
+    # Command line overrides for the selected platform
+    if args.url:
+        print(f"Overriding URL with command line parameter: {args.url}")
+        platform["url"] = args.url
+    if args.username and args.password:
+        platform["username"] = args.username
+        platform["password"] = args.password
+        platform["requires_login"] = True
+
+    if args.dry_run:
+        return dry_run(args.test_set, config, config_file, vehicle_search=args.platform != "custom")
+
+    # Make a directory for screenshots if it doesn't exist
+    os.makedirs("screenshots", exist_ok=True)
+
+    # Waits are paced from this platform's measured response times
+    pacer = Pacer(platform["name"], WAIT_TIME, adaptive=not args.fixed_wait)
+    if "cache" in platform and not args.no_cache:
+        result_cache = ResultCache(platform["name"], platform["cache"].get("ttl_hours", DEFAULT_TTL_HOURS))
+
+    import_started = time.perf_counter()
+    import_selenium()
+    # Platforms with a step plan in the config don't need a strategy of their own
+    if "steps" not in platform and args.platform not in STRATEGIES:
+        print(f"Platform '{platform['name']}' in {config_file} has no step plan, and '{args.platform}' has no built-in search flow")
+        return 1
+    module_name, class_name = ("platform_plan", "PlanStrategy") if "steps" in platform else STRATEGIES[args.platform]
+    strategy = getattr(importlib.import_module(module_name), class_name)(platform)
+    import_seconds = time.perf_counter() - import_started
+
+    # Set up Chrome with configured options
+    chrome_options = Options()
+    for option in config["webdriver_options"]:
+        chrome_options.add_argument(option)
+
+    # Add headless mode if requested
+    if args.headless:
+        print("Running in headless mode")
+        chrome_options.add_argument("--headless")
+
+    # Skip the images, fonts and trackers the tests don't look at, unless screenshots need the full page
+    problems = resource_blocking.check_blocking_config(platform)
+    if problems:
+        for problem in problems:
+            print(f"Config error: {problem}")
+        return 1
+    if args.visual or args.save_all_screenshots:
+        if platform.get("blocking"):
+            print("Visual mode - loading pages in full")
+    else:
+        blocking_profile = resource_blocking.resolve_profile(platform)
+    if blocking_profile is not None:
+        resource_blocking.configure_options(chrome_options, blocking_profile)
+        print(resource_blocking.describe(blocking_profile))
+
+    # Start browser
+    launch_started = time.perf_counter()
+    driver = start_browser()
+    report_cold_start(import_seconds, time.perf_counter() - launch_started)
+
+    # Kill the browser session if a single test case overruns its deadline
+    case_watchdog = CaseWatchdog(args.case_timeout, lambda: kill_browser(driver))
+
+    # Let app.py know the script is alive (progress is judged per test case)
+    progress.start_heartbeat()
+
+    # A run that ended in a fatal error must not look like a finished one to
+    # app.py, fanout.py or a runner agent
+    return 0 if run_tests() else 1
+
+
+def legacy_main(platform_type, argv=None):
+    """Entry point for the old per-platform scripts (app4web.py etc.).
+
+    Their --platform option named a config entry ("all" for the first one),
+    which is --site here."""
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if "--platform" in argv:
+        i = argv.index("--platform")
+        site = argv[i + 1] if i + 1 < len(argv) else "all"
+        del argv[i:i + 2]
+        if site != "all":
+            argv += ["--site", site]
+    return main(["--platform", platform_type] + argv)
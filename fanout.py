@@ -0,0 +1,229 @@
+"""Run one test set against every configured platform at once.
+
+`python auto_test.py --platform all --test-set test_cases.csv` starts one
+engine process per platform entry in config4web.json, config4pro.json and
+config4app.json (plus the custom site when --url is given), each with its
+own browser.  Their console output is prefixed with the platform and their
+progress events are relayed on our own progress channel, so app.py sees
+a single run of cases x platforms.
+
+When they are all done the per-platform results are merged into
+  results_<ts>.csv  one row per case and platform (Search, Expected, Platform, Result, Attempts, Quarantined)
+  matrix_<ts>.csv   one row per case with a result column per platform
+and the pass rate of each platform is printed.
+"""
+import csv
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+import progress
+from results_writer import ResultsWriter, FANOUT_COLUMNS
+from test_loader import iter_test_cases
+
+# Platform types included in a fan-out run (custom only when a URL is given)
+FANOUT_PLATFORMS = ("web", "pro", "app")
+
+# Options passed through unchanged to every platform process
+PASSTHROUGH_FLAGS = ("headless", "save_all_screenshots", "visual", "compare_screenshots", "compare_dom", "fixed_wait", "no_cache", "dry_run")
+PASSTHROUGH_VALUES = ("wait_time", "case_timeout", "retry_budget", "quarantine")
+
+
+def fanout_targets(url=None):
+    """List the (platform type, site name) pairs to run"""
+    targets = []
+    for platform_type in FANOUT_PLATFORMS:
+        config_file = f"config4{platform_type}.json"
+        try:
+            with open(config_file, 'r') as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Skipping {platform_type}: could not read {config_file} ({str(e)})")
+            continue
+        for platform in config.get("platforms", []):
+            targets.append((platform_type, platform["name"]))
+    if url:
+        targets.append(("custom", "custom"))
+    return targets
+
+
+def target_label(target):
+    return f"{target[0]}/{target[1]}"
+
+
+def build_command(args, target, results_file):
+    """Command line for the engine process testing one platform"""
+    platform_type, site = target
+    cmd = [sys.executable, "auto_test.py", "--platform", platform_type, "--test-set", args.test_set,
+           "--results-file", results_file]
+    if platform_type == "custom":
+        cmd += ["--url", args.url]
+    else:
+        cmd += ["--site", site]
+    # Credentials turn on login, so only the pro site gets them
+    if platform_type == "pro" and args.username and args.password:
+        cmd += ["--username", args.username, "--password", args.password]
+    for flag in PASSTHROUGH_FLAGS:
+        if getattr(args, flag):
+            cmd.append("--" + flag.replace("_", "-"))
+    for option in PASSTHROUGH_VALUES:
+        cmd += ["--" + option.replace("_", "-"), str(getattr(args, option))]
+    return cmd
+
+
+class PlatformRun:
+    """One engine process in a fan-out run"""
+
+    def __init__(self, target, cmd, results_file, offset):
+        self.target = target
+        self.label = target_label(target)
+        self.cmd = cmd
+        self.results_file = results_file
+        # Where this platform's case numbers start in the combined run
+        self.offset = offset
+        self.process = None
+        self.threads = []
+
+    def start(self):
+        """Start the process with its own progress pipe, like app.py does for a run"""
+        read_fd, write_fd = os.pipe()
+        env = dict(os.environ)
+        env[progress.PROGRESS_FD_ENV] = str(write_fd)
+        try:
+            self.process = subprocess.Popen(self.cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                            text=True, bufsize=1, pass_fds=(write_fd,), env=env)
+        except Exception:
+            os.close(read_fd)
+            raise
+        finally:
+            os.close(write_fd)
+        self.threads = [
+            threading.Thread(target=self._relay_output, daemon=True),
+            threading.Thread(target=progress.read_events, args=(read_fd, self._relay_event), daemon=True),
+        ]
+        for thread in self.threads:
+            thread.start()
+        print(f"Started {self.label}: {' '.join(self.cmd)}")
+
+    def _relay_output(self):
+        for line in self.process.stdout:
+            print(f"[{self.label}] {line.rstrip()}", flush=True)
+
+    def _relay_event(self, event):
+        """Pass a platform's progress on with case numbers offset into the combined run"""
+        kind = event['event']
+        case = event.get('case')
+        if case is not None:
+            case += self.offset
+        if kind == 'case_started':
+            progress.emit('case_started', case=case, total=None, search=f"[{self.label}] {event.get('search')}")
+        elif kind == 'case_result':
+            progress.emit('case_result', case=case, search=f"[{self.label}] {event.get('search')}",
+                          result=event.get('result'), attempts=event.get('attempts', 1))
+        elif kind in ('step_done', 'artifact_saved'):
+            fields = {k: v for k, v in event.items() if k not in ('event', 'time', 'case')}
+            progress.emit(kind, case=case, **fields)
+
+    def wait(self):
+        code = self.process.wait()
+        for thread in self.threads:
+            thread.join(timeout=5)
+        return code
+
+
+def read_results(path):
+    """Rows of a platform's results file (empty if it never got written)"""
+    if not os.path.exists(path):
+        return []
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def merge_results(runs, results_path, matrix_path):
+    """Write the merged results and matrix files; returns the results writer and {label: (total, passed)}"""
+    writer = ResultsWriter(results_path, columns=FANOUT_COLUMNS)
+    matrix = {}  # (search, expected, occurrence) -> {label: result}, in test set order
+    rates = {}
+    for run in runs:
+        total = passed = 0
+        seen = {}
+        for row in read_results(run.results_file):
+            writer.write(dict(row, Platform=run.label))
+            # Count repeats so duplicate rows in the test set stay separate
+            key = (row['Search'], row['Expected'])
+            seen[key] = seen.get(key, 0) + 1
+            matrix.setdefault(key + (seen[key],), {})[run.label] = row['Result']
+            total += 1
+            if str(row['Result']).startswith('P'):
+                passed += 1
+        rates[run.label] = (total, passed)
+    writer.close()
+
+    labels = [run.label for run in runs]
+    with open(matrix_path, 'w', newline='', encoding='utf-8') as f:
+        matrix_writer = csv.writer(f)
+        matrix_writer.writerow(['Search', 'Expected'] + labels)
+        for (search, expected, _), results in matrix.items():
+            matrix_writer.writerow([search, expected] + [results.get(label, '') for label in labels])
+    print(f"Results matrix saved to {matrix_path}")
+    return writer, rates
+
+
+def print_pass_rates(rates):
+    print("\nPass rate by platform:")
+    for label, (total, passed) in rates.items():
+        rate = f"{passed/total*100:.1f}%" if total else "n/a"
+        print(f"  {label}: {passed}/{total} passed ({rate})")
+
+
+def run_all(args):
+    """Run the test set against every configured platform in parallel; returns the exit code"""
+    if args.resume:
+        print("--resume can't be used with --platform all - resume the platform runs one at a time")
+        return 1
+    targets = fanout_targets(args.url)
+    if not targets:
+        print("No platforms configured")
+        return 1
+    try:
+        case_count = sum(1 for _ in iter_test_cases(args.test_set))
+    except Exception as e:
+        print(f"Could not read test set {args.test_set}: {str(e)}")
+        return 1
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    results_path = args.results_file or f"results_{timestamp}.csv"
+    matrix_path = "matrix_" + os.path.basename(results_path).replace("results_", "", 1)
+    runs = []
+    for number, target in enumerate(targets):
+        platform_results = f"results_{timestamp}_{target[0]}_{target[1]}.csv"
+        runs.append(PlatformRun(target, build_command(args, target, platform_results),
+                                platform_results, number * case_count))
+
+    print(f"Running {args.test_set} ({case_count} cases) on {len(runs)} platforms: "
+          f"{', '.join(run.label for run in runs)}")
+    if not args.dry_run:
+        progress.run_started(case_count * len(runs), args.test_set, "all", args.case_timeout,
+                             results_file=results_path)
+        progress.start_heartbeat()
+
+    started = time.time()
+    for run in runs:
+        run.start()
+    exit_codes = {run.label: run.wait() for run in runs}
+    failed_runs = [label for label, code in exit_codes.items() if code != 0]
+    if failed_runs:
+        print(f"Platform runs that exited with an error: {', '.join(failed_runs)}")
+    if args.dry_run:
+        return 1 if failed_runs else 0
+
+    writer, rates = merge_results(runs, results_path, matrix_path)
+    print(f"\nAll platforms complete in {time.time() - started:.0f}s! Results saved to {results_path}")
+    progress.run_done(results_path, writer.total, writer.passed, writer.failed)
+    writer.print_summary()
+    print_pass_rates(rates)
+    return 1 if failed_runs else 0
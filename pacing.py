@@ -0,0 +1,221 @@
+"""Adaptive pacing: learn how long each kind of step takes on a site.
+
+Every wait in the search flows used to be a fixed multiple of --wait-time.
+The pacer times each step type ("page_load", "dropdown", "search", "find",
+...) on the platform under test and paces the run from what it measured:
+
+    settle(driver, step)           after an action, wait until the page is
+                                   quiet (loaded, no jQuery requests running,
+                                   no DOM changes for QUIET_SECONDS)
+    wait(driver, step, condition)  WebDriverWait for an element
+
+A step's timeout is the p99 of its last WINDOW samples x HEADROOM, times a
+backoff factor.  The backoff doubles when a wait for that step times out and
+rises with the share of recent test cases that ended in an error, and it
+eases back as things succeed again.  Settling never waits longer than the
+fixed --wait-time multiple would have (unless backing off), so fast sites
+get faster and slow ones get longer element timeouts instead of flaking.
+
+Settling and element waits of the same step type take very different
+times (a page goes quiet long before a slow results table shows up), so
+they keep their samples apart, as "settle:<step>" and "wait:<step>"; the
+backoff is shared.  Until a step type has MIN_SAMPLES samples of a kind,
+settle() sleeps the full fixed time as before while it measures.  Samples
+are saved per platform in pacing.json (see shared_json.py) so the next run
+starts from what this one learned.
+"""
+import math
+import time
+from collections import deque
+
+import shared_json
+
+PACING_FILE = "pacing.json"
+# Samples kept per step type
+WINDOW = 50
+# Samples needed before a step type is paced from measurements
+MIN_SAMPLES = 5
+PERCENTILE = 99
+HEADROOM = 1.5
+# Bounds for a paced timeout, in seconds
+MIN_TIMEOUT = 0.25
+MAX_TIMEOUT = 60
+# Backoff bounds and how fast it eases after a success
+MAX_BACKOFF = 4.0
+BACKOFF_EASE = 0.75
+# Recent test cases looked at for the error backoff
+ERROR_WINDOW = 10
+# The page counts as ready after this long without DOM changes
+QUIET_SECONDS = 0.3
+POLL_INTERVAL = 0.1
+# Kinds of samples kept for a step type
+SETTLE = "settle"
+WAIT = "wait"
+
+# Milliseconds since the page last changed, or -1 while it is still busy
+QUIET_SCRIPT = """
+if (!window.__pacing) {
+    window.__pacing = {last: Date.now()};
+    try {
+        new MutationObserver(function() { window.__pacing.last = Date.now(); })
+            .observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+    } catch (e) {}
+}
+if (document.readyState !== 'complete' || (window.jQuery && window.jQuery.active > 0)) {
+    return -1;
+}
+return Date.now() - window.__pacing.last;
+"""
+
+
+def sample_key(kind, step):
+    """Key of the samples of one kind (SETTLE or WAIT) for a step type"""
+    return f"{kind}:{step}"
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class Pacer:
+    """Per-platform step timings and the waits derived from them"""
+
+    def __init__(self, site, wait_time, adaptive=True, path=PACING_FILE):
+        self.site = site
+        self.wait_time = wait_time
+        self.adaptive = adaptive
+        self.path = path
+        self.samples = {}   # sample key -> deque of seconds
+        self.backoff = {}   # step type -> factor
+        self.recent_errors = deque(maxlen=ERROR_WINDOW)
+        if adaptive:
+            self.load()
+
+    def load(self):
+        """Start from the samples an earlier run saved for this platform"""
+        saved = shared_json.load(self.path).get(self.site, {})
+        for key, samples in saved.items():
+            # Samples saved by step type alone mix settling and waiting - measure those again
+            if ":" in key:
+                self.samples[key] = deque(samples[-WINDOW:], maxlen=WINDOW)
+        if self.samples:
+            print(f"Loaded pacing for {self.site}: {', '.join(sorted(self.samples))}")
+
+    def save(self):
+        if not self.adaptive or not self.samples:
+            return
+        measured = {key: [round(s, 3) for s in samples] for key, samples in self.samples.items()}
+
+        def merge(saved):
+            # Only the samples this run measured; another run of the site may have saved others
+            site = {key: samples for key, samples in saved.get(self.site, {}).items() if ":" in key}
+            site.update(measured)
+            saved[self.site] = site
+
+        try:
+            shared_json.update(self.path, merge, indent=2)
+        except OSError as e:
+            print(f"Could not save pacing to {self.path}: {str(e)}")
+
+    def record(self, kind, step, seconds):
+        self.samples.setdefault(sample_key(kind, step), deque(maxlen=WINDOW)).append(seconds)
+
+    def learned(self, kind, step):
+        """p99 x HEADROOM of the step's samples of a kind, or None while they are still warming up"""
+        samples = self.samples.get(sample_key(kind, step))
+        if not self.adaptive or samples is None or len(samples) < MIN_SAMPLES:
+            return None
+        return max(MIN_TIMEOUT, percentile(samples, PERCENTILE) * HEADROOM)
+
+    def factor(self, step):
+        """Backoff for a step: its own timeouts plus the recent error rate"""
+        if not self.adaptive:
+            return 1.0
+        errors = sum(self.recent_errors) / len(self.recent_errors) if self.recent_errors else 0
+        return min(MAX_BACKOFF, self.backoff.get(step, 1.0) * (1 + errors * (MAX_BACKOFF - 1)))
+
+    def timeout(self, step, factor=1.0):
+        """How long to wait for an element in this step"""
+        learned = self.learned(WAIT, step)
+        base = self.wait_time * factor if learned is None else learned
+        return min(MAX_TIMEOUT, base * self.factor(step))
+
+    def settle_time(self, step, factor=1.0):
+        """Longest time to let the page settle after this step"""
+        fixed = self.wait_time * factor
+        learned = self.learned(SETTLE, step)
+        base = fixed if learned is None else min(fixed, learned)
+        return min(MAX_TIMEOUT, base * self.factor(step))
+
+    def timed_out(self, step):
+        self.backoff[step] = min(MAX_BACKOFF, self.backoff.get(step, 1.0) * 2)
+
+    def succeeded(self, step):
+        if step in self.backoff:
+            self.backoff[step] = max(1.0, self.backoff[step] * BACKOFF_EASE)
+
+    def case_finished(self, error):
+        """Note whether a test case ended in an error (timeouts, missing elements)"""
+        self.recent_errors.append(1 if error else 0)
+
+    def settle(self, driver, step, factor=1.0):
+        """Wait for the page to settle after an action in this step"""
+        limit = self.settle_time(step, factor)
+        if not self.adaptive:
+            time.sleep(limit)
+            return
+        warming_up = self.learned(SETTLE, step) is None
+        started = time.perf_counter()
+        ready = None
+        while True:
+            elapsed = time.perf_counter() - started
+            if elapsed >= limit:
+                break
+            try:
+                quiet_ms = driver.execute_script(QUIET_SCRIPT)
+            except Exception:
+                # Alerts and pages in the middle of navigating can't run scripts
+                quiet_ms = -1
+            if quiet_ms is not None and quiet_ms >= QUIET_SECONDS * 1000:
+                ready = elapsed
+                break
+            time.sleep(POLL_INTERVAL)
+
+        # A page that never got quiet counts as taking the whole time
+        self.record(SETTLE, step, limit if ready is None else ready)
+        if warming_up:
+            # Keep the old fixed pacing until we know the site
+            remaining = limit - (time.perf_counter() - started)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def wait(self, driver, step, condition, factor=1.0, optional=False):
+        """WebDriverWait for a condition with the step's paced timeout"""
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.common.exceptions import TimeoutException
+        started = time.perf_counter()
+        try:
+            result = WebDriverWait(driver, self.timeout(step, factor)).until(condition)
+        except TimeoutException:
+            # An optional element that isn't there says nothing about the site's speed
+            if not optional:
+                self.timed_out(step)
+            raise
+        self.record(WAIT, step, time.perf_counter() - started)
+        self.succeeded(step)
+        return result
+
+    def print_summary(self):
+        if not self.adaptive or not self.samples:
+            return
+        print(f"\nPacing for {self.site} (fixed wait {self.wait_time}s):")
+        for key in sorted(self.samples):
+            samples = self.samples[key]
+            kind, step = key.split(":", 1)
+            learned = self.learned(kind, step)
+            paced = f"{learned:.2f}s" if learned is not None else "warming up"
+            print(f"  {step} ({kind}): {len(samples)} samples, p{PERCENTILE} {percentile(samples, PERCENTILE):.2f}s, "
+                  f"limit {paced}, backoff x{self.factor(step):.1f}")
@@ -0,0 +1,9 @@
+"""Search flow for the app platform (car-part.com style sites without login)."""
+from platform_select import SelectDropdownStrategy
+
+
+class AppStrategy(SelectDropdownStrategy):
+    """Standard #year / #model / part dropdown search"""
+
+    def recover(self):
+        """Every test case opens the site fresh, so there is nothing to reset"""
@@ -0,0 +1,64 @@
+"""Search flow for platforms described by a step plan in the config file.
+
+Used for any platform entry with a "steps" list, whatever --platform type
+it is run as.  See step_plan.py for the plan format.
+"""
+import time
+
+import engine
+import progress
+import step_plan
+from engine import Strategy, save_debug_info, handle_login, case_result
+
+step_plan.import_selenium()
+
+
+class PlanStrategy(Strategy):
+    """Run the platform's compiled step plan for every test case"""
+
+    def __init__(self, platform):
+        super().__init__(platform)
+        self.steps = step_plan.compile_plan(platform["steps"], platform.get("selectors"),
+                                            platform.get("vars"), engine.WAIT_TIME, engine.pacer)
+        self.variables = dict(platform.get("vars", {}), url=platform["url"])
+        self.needs_login = True  # Log in on the first test case and after a browser restart
+        print(f"Compiled step plan for {platform['name']}: {len(platform['steps'])} steps in {len(self.steps)} calls")
+
+    def browser_restarted(self):
+        self.needs_login = True
+
+    def run_case(self, test_case, index):
+        driver = engine.driver
+        values = step_plan.test_case_values(test_case, self.variables)
+
+        driver.get(self.platform["url"])
+        print(f"Opened website: {self.platform['url']}")
+        if self.needs_login:
+            if not handle_login(self.platform):
+                raise Exception(f"Failed to log in to {self.platform['name']}")
+            self.needs_login = False
+            driver.get(self.platform["url"])
+
+        for step in self.steps:
+            print(f"{step.label}: {step.action}")
+            try:
+                failure = step.run(driver, values)
+            except Exception as e:
+                if not step.optional:
+                    raise
+                print(f"Optional {step.label} skipped: {str(e)}")
+                continue
+
+            if failure:
+                print(f"TEST FAILED: {failure}")
+                save_debug_info(f"assert_failed_case_{index+1}", error_occurred=True)
+                return case_result(test_case, f"F - Assertion failed: {failure}")
+
+            progress.step_done(step.name)
+            if step.pause:
+                time.sleep(step.pause)
+
+        save_debug_info(f"final_page_case_{index+1}")
+        result = f"P - All {len(self.platform['steps'])} plan steps passed"
+        print(f"TEST PASSED: {result}")
+        return case_result(test_case, result)
@@ -0,0 +1,324 @@
+"""Search flow for the pro platform (Car-Part Pro).
+
+Same dropdown search as the app platform, but behind a login and with its
+own selectors.  The login is done once per browser session; later test
+cases just reopen the search page and re-enable the dropdown search.
+"""
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support.ui import Select
+from selenium.webdriver.support import expected_conditions as EC
+
+import engine
+from engine import save_debug_info, try_click, handle_login
+from platform_select import SelectDropdownStrategy, PART_SELECTOR
+
+
+class ProStrategy(SelectDropdownStrategy):
+    """Car-Part Pro selectors, login once per browser session"""
+
+    def __init__(self, platform):
+        super().__init__(platform)
+        self.needs_login = True  # Log in on the first test case and after a browser restart
+
+    def browser_restarted(self):
+        self.needs_login = True
+
+    def open_search(self):
+        """Log in on the first test case, otherwise reopen the search page and set up the dropdowns"""
+        driver = engine.driver
+        platform = self.platform
+        # For the first test (or a fresh browser), navigate directly to the URL and handle login
+        if self.needs_login:
+            driver.get(platform["url"])
+            print(f"Opened website: {platform['url']}")
+
+            # Handle login if required
+            if not handle_login(platform):
+                raise Exception(f"Failed to log in to {platform['name']}")
+            self.needs_login = False
+
+            # Wait for the page to load
+            engine.settle("login")
+        # For subsequent tests, just make sure search dropdowns are set up properly
+        else:
+            # Navigate back to the main URL to ensure we're in a clean state
+            driver.get(platform["url"])
+            print(f"Opened website: {platform['url']}")
+            engine.settle("page_load", 2)
+
+            # Set up all search dropdowns
+            self.setup_search_dropdowns()
+
+    def setup_search_dropdowns(self):
+        """Ensure all search dropdowns are active by clicking dropdown links"""
+        driver = engine.driver
+        try:
+            # First check if we need to click the VIN dropdown link
+            try:
+                vin_dropdown_link = engine.wait_until(
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, "#vin_dropdown_link")), "dropdown", optional=True
+                )
+                if vin_dropdown_link.is_displayed():
+                    print("Found VIN dropdown link, clicking to enable dropdown search...")
+                    try_click(vin_dropdown_link, "VIN dropdown link")
+                    engine.settle("dropdown")
+                    save_debug_info("after_vin_dropdown_click", always_save=True)
+            except Exception as e:
+                print(f"VIN dropdown link not found or not clickable: {str(e)}")
+
+            # Then check if we need to click the part dropdown link
+            try:
+                part_dropdown_link = engine.wait_until(
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, "#part_dropdown_link")), "dropdown", optional=True
+                )
+                if part_dropdown_link.is_displayed():
+                    print("Found part dropdown link, clicking to enable part selection...")
+                    try_click(part_dropdown_link, "part dropdown link")
+                    engine.settle("dropdown")
+                    save_debug_info("after_part_dropdown_click", always_save=True)
+            except Exception as e:
+                print(f"Part dropdown link not found or not clickable: {str(e)}")
+
+            # Check if X button needs to be clicked to clear part selection
+            try:
+                x_button = driver.find_element(By.XPATH, "//img[@src='img/x.gif' and contains(@style, 'border:0')]")
+                if x_button.is_displayed():
+                    print("Found X button, clicking to clear part selection...")
+                    try_click(x_button, "X button")
+                    engine.settle("dropdown")
+                    save_debug_info("after_x_button_click", always_save=True)
+
+                    # After clicking X, we may need to click part dropdown link again
+                    try:
+                        part_dropdown_link = engine.wait_until(
+                            EC.element_to_be_clickable((By.CSS_SELECTOR, "#part_dropdown_link")), "dropdown", optional=True
+                        )
+                        if part_dropdown_link.is_displayed():
+                            print("Found part dropdown link again, clicking to re-enable part selection...")
+                            try_click(part_dropdown_link, "part dropdown link")
+                            engine.settle("dropdown")
+                            save_debug_info("after_part_dropdown_click_2", always_save=True)
+                    except Exception as e:
+                        print(f"Part dropdown link not found after X button click: {str(e)}")
+
+            except Exception as e:
+                print(f"X button not found: {str(e)}")
+
+            return True
+        except Exception as e:
+            print(f"Error setting up search dropdowns: {str(e)}")
+            return False
+
+    def select_year(self, year):
+        """Different selector for Car-Part Pro"""
+        driver = engine.driver
+        try:
+            # Try Car-Part Pro specific year selector
+            year_select = Select(driver.find_element(By.CSS_SELECTOR, "#year_dropdown"))
+            year_select.select_by_visible_text(year)
+            print(f"Selected year using #year_dropdown")
+        except:
+            try:
+                # Try standard selector
+                year_select = Select(driver.find_element(By.CSS_SELECTOR, "#year"))
+                year_select.select_by_visible_text(year)
+                print(f"Selected year using #year")
+            except Exception as e:
+                print(f"Error selecting year: {str(e)}")
+
+                # Try to find any year dropdown on the page
+                year_elements = driver.find_elements(By.XPATH, "//select[contains(@id, 'year')]")
+                if year_elements:
+                    print(f"Found {len(year_elements)} year-related dropdowns")
+                    for i, elem in enumerate(year_elements):
+                        print(f"Year dropdown {i} id: {elem.get_attribute('id')}")
+
+                    # Try the first one
+                    if len(year_elements) > 0:
+                        try:
+                            year_select = Select(year_elements[0])
+                            year_select.select_by_visible_text(year)
+                            print(f"Selected year using found dropdown")
+                        except Exception as ex:
+                            print(f"Could not select year from found dropdown: {str(ex)}")
+
+                # If all else fails, raise the exception
+                raise Exception(f"Could not find or select year dropdown: {str(e)}")
+
+    def select_model(self, model):
+        """Different selector for Car-Part Pro, returns the option that was selected"""
+        driver = engine.driver
+        try:
+            # Try Car-Part Pro specific model selector
+            model_select = Select(driver.find_element(By.CSS_SELECTOR, "#model_dropdown"))
+            model_select.select_by_visible_text(model)
+            print(f"Selected model using #model_dropdown")
+        except:
+            try:
+                # Try standard selector
+                model_select = Select(driver.find_element(By.CSS_SELECTOR, "#model"))
+                model_select.select_by_visible_text(model)
+                print(f"Selected model using #model")
+            except Exception as e:
+                print(f"Error selecting model '{model}': {str(e)}")
+                # Print available models for debugging
+                try:
+                    available_models = []
+                    model_elements = driver.find_elements(By.XPATH, "//select[contains(@id, 'model')]")
+                    if model_elements:
+                        print(f"Found {len(model_elements)} model-related dropdowns")
+                        for elem in model_elements:
+                            model_select = Select(elem)
+                            options = [option.text for option in model_select.options]
+                            available_models.extend(options)
+                            print(f"Model dropdown id: {elem.get_attribute('id')}")
+                            print(f"Options: {options[:10]}...")  # Show first 10
+
+                    print("Available models across all dropdowns:")
+                    for option in available_models:
+                        print(f"  - {option}")
+
+                    # Try to find a close match in any dropdown
+                    found_match = False
+                    model_lower = model.lower()
+                    for elem in model_elements:
+                        model_select = Select(elem)
+                        for option in model_select.options:
+                            if model_lower in option.text.lower():
+                                print(f"Found similar model: {option.text}")
+                                model_select.select_by_visible_text(option.text)
+                                model = option.text  # Update model for later verification
+                                found_match = True
+                                break
+                        if found_match:
+                            break
+
+                    if not found_match:
+                        raise Exception(f"Could not find model '{model}' or a similar match")
+                except:
+                    # If all fails, re-raise the original exception
+                    raise Exception(f"Could not find model '{model}' or a similar match")
+        return model
+
+    def after_model_selected(self):
+        """After selecting year and model, click the part dropdown link if it exists"""
+        driver = engine.driver
+        try:
+            part_dropdown_link = driver.find_element(By.CSS_SELECTOR, "#part_dropdown_link")
+            if part_dropdown_link.is_displayed():
+                print("Found part dropdown link, clicking to enable part selection...")
+                try_click(part_dropdown_link, "part dropdown link")
+                engine.settle("dropdown")  # Wait for part dropdown to appear
+
+                # Save a screenshot after clicking the part dropdown link
+                save_debug_info("after_part_dropdown_link", always_save=True)
+        except Exception as e:
+            print(f"No part dropdown link found, continuing with standard part selection: {str(e)}")
+
+    def find_part_select(self):
+        """Try different selectors for Car-Part Pro"""
+        driver = engine.driver
+        try:
+            # First try Car-Part Pro specific part selectors
+            part_selectors = [
+                "#part_dropdown",  # Try specific Car-Part Pro selector first
+                "select[name='part']",
+                "select[id*='part']",
+                PART_SELECTOR
+            ]
+
+            found_part_select = False
+            for selector in part_selectors:
+                try:
+                    part_select = Select(driver.find_element(By.CSS_SELECTOR, selector))
+                    print(f"Found part dropdown using selector: {selector}")
+                    found_part_select = True
+                    break
+                except:
+                    continue
+
+            if not found_part_select:
+                # Try to find any part-related dropdown
+                part_elements = driver.find_elements(By.XPATH, "//select[contains(@id, 'part') or contains(@name, 'part')]")
+                if part_elements:
+                    print(f"Found {len(part_elements)} part-related dropdowns")
+                    part_select = Select(part_elements[0])
+                    print(f"Using first part dropdown with id: {part_elements[0].get_attribute('id')}")
+                else:
+                    raise Exception("Could not find part dropdown")
+
+        except Exception as e:
+            print(f"Error finding part dropdown: {str(e)}")
+            # Take a screenshot to see what's on the page
+            save_debug_info("part_dropdown_error", always_save=True)
+            raise Exception(f"Could not find part dropdown: {str(e)}")
+        return part_select
+
+    def click_search(self):
+        """Try different search button selectors for Car-Part Pro"""
+        driver = engine.driver
+        platform = self.platform
+        search_button_found = False
+
+        # Try multiple possible search button selectors
+        search_button_selectors = [
+            "body > div.wrapper > div.search > div > table > tbody > tr:nth-child(2) > td > div > div > a > img",  # Car-Part Pro specific
+            platform["selectors"]["search_button"],  # Config value
+            "input[type='submit'][value='Search']",
+            "button[type='submit']",
+            "input[type='image'][alt='Search']",
+            "input.searchButton",
+            "#search_button"
+        ]
+
+        for selector in search_button_selectors:
+            try:
+                search_button = driver.find_element(By.CSS_SELECTOR, selector)
+                if try_click(search_button, f"search button ({selector})"):
+                    search_button_found = True
+                    break
+            except:
+                continue
+
+        if not search_button_found:
+            # Try to find any clickable button/input with search-related attributes
+            try:
+                search_elements = driver.find_elements(By.XPATH, 
+                                                     "//input[@type='submit' or @type='image' or @type='button'] | //button")
+
+                for element in search_elements:
+                    try:
+                        if element.is_displayed():
+                            element_text = element.text.lower() if element.text else ""
+                            element_value = element.get_attribute("value")
+                            element_value = element_value.lower() if element_value else ""
+                            element_id = element.get_attribute("id")
+                            element_id = element_id.lower() if element_id else ""
+
+                            # Check if this looks like a search button
+                            if ("search" in element_text or 
+                                "search" in element_value or 
+                                "search" in element_id or
+                                "go" in element_text or 
+                                "find" in element_text):
+
+                                if try_click(element, "detected search button"):
+                                    search_button_found = True
+                                    break
+                    except:
+                        continue
+            except:
+                pass
+
+        if not search_button_found:
+            # Last resort - try pressing Enter on the last input field
+            try:
+                active_element = driver.switch_to.active_element
+                active_element.send_keys(Keys.RETURN)
+                print("Pressed Enter to submit search")
+                search_button_found = True
+            except:
+                save_debug_info("search_button_not_found", always_save=True)
+                raise Exception("Could not find search button")
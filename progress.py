@@ -0,0 +1,264 @@
+"""Structured progress protocol between the test scripts and app.py.
+
+Test scripts emit one JSON object per line on a dedicated pipe whose file
+descriptor is handed over in the TEST_PROGRESS_FD environment variable.
+app.py reads that pipe to get real progress, live pass/fail counts and an
+ETA without parsing the human-readable console output.  The engine sends
+the historical duration of the run and of each case along (see
+sharding.py), so the ETA is known from the first case on.
+
+When the variable is not set (e.g. a script run by hand from a terminal)
+every emit call is a no-op.
+"""
+import json
+import os
+import threading
+import time
+
+# Environment variable used by app.py to pass the write end of the pipe
+PROGRESS_FD_ENV = "TEST_PROGRESS_FD"
+
+# Events understood by the consumer side
+EVENT_TYPES = (
+    "run_started",
+    "case_started",
+    "step_done",
+    "case_result",
+    "upkeep_started",
+    "upkeep_done",
+    "artifact_saved",
+    "heartbeat",
+    "run_done",
+)
+
+# Limits on how much faster or slower than its history a run is assumed to go
+MIN_PACE = 0.25
+MAX_PACE = 4.0
+
+_stream = None
+_stream_opened = False
+_lock = threading.Lock()
+_current_case = None
+
+
+def _get_stream():
+    """Open the progress pipe on first use (None if no pipe was provided)"""
+    global _stream, _stream_opened
+    if not _stream_opened:
+        _stream_opened = True
+        fd = os.environ.get(PROGRESS_FD_ENV)
+        if fd:
+            try:
+                _stream = os.fdopen(int(fd), "w", buffering=1, encoding="utf-8")
+            except (OSError, ValueError) as e:
+                print(f"Could not open progress channel: {str(e)}")
+                _stream = None
+    return _stream
+
+
+def emit(event, **fields):
+    """Write a single progress event as a JSON line"""
+    global _stream
+    record = {"event": event, "time": time.time()}
+    record.update(fields)
+    with _lock:
+        stream = _get_stream()
+        if stream is None:
+            return
+        try:
+            stream.write(json.dumps(record) + "\n")
+        except (OSError, ValueError):
+            # The reader went away - stop emitting rather than failing the run
+            _stream = None
+
+
+def run_started(total, test_set=None, platform=None, case_timeout=None, results_file=None, estimated_seconds=None):
+    emit("run_started", total=total, test_set=test_set, platform=platform,
+         case_timeout=case_timeout, results_file=results_file, estimated_seconds=estimated_seconds)
+
+
+def case_started(index, total, search, estimate=None):
+    global _current_case
+    _current_case = index
+    emit("case_started", case=index, total=total, search=search, estimate=estimate)
+
+
+def step_done(step):
+    emit("step_done", case=_current_case, step=step)
+
+
+def case_result(index, search, result, attempts=1):
+    emit("case_result", case=index, search=search, result=result, attempts=attempts)
+
+
+def upkeep_started(step, index=None):
+    """Browser work outside a test case began; it is held to the case deadline too"""
+    emit("upkeep_started", case=index, step=step)
+
+
+def upkeep_done():
+    emit("upkeep_done", case=_current_case)
+
+
+def artifact_saved(path):
+    emit("artifact_saved", case=_current_case, path=path)
+
+
+def heartbeat():
+    emit("heartbeat", case=_current_case)
+
+
+def run_done(results_file, total, passed, failed):
+    emit("run_done", results_file=results_file, total=total, passed=passed, failed=failed)
+
+
+def start_heartbeat(interval=15):
+    """Emit a heartbeat event from a background thread every `interval` seconds.
+
+    Heartbeats only prove the script is alive; app.py judges a hung browser
+    by the per-case deadline, not by heartbeats."""
+    def heartbeat_func():
+        while True:
+            time.sleep(interval)
+            heartbeat()
+
+    thread = threading.Thread(target=heartbeat_func, daemon=True)
+    thread.start()
+    return thread
+
+
+# ---------------------------------------------------------------------------
+# Consumer side (used by app.py)
+# ---------------------------------------------------------------------------
+
+def new_progress_state():
+    """Create an empty progress record for a test run"""
+    return {
+        'total': None,
+        'completed': 0,
+        'passed': 0,
+        'failed': 0,
+        'current_case': None,
+        'current_search': None,
+        'current_step': None,
+        'case_started_at': None,
+        'upkeep': None,
+        'case_timeout': None,
+        'started_at': None,
+        'last_event': None,
+        'cases_per_minute': None,
+        'eta_seconds': None,
+        'finish_at': None,
+        'estimated_seconds': None,
+        'estimated_done': 0,
+        'current_estimate': None,
+        'artifacts': 0,
+    }
+
+
+def parse_event(line):
+    """Parse one line from the progress pipe, returning None for garbage"""
+    try:
+        event = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(event, dict) or event.get('event') not in EVENT_TYPES:
+        return None
+    return event
+
+
+def apply_event(state, event):
+    """Fold a progress event into a progress record created by new_progress_state"""
+    kind = event['event']
+    now = event.get('time', time.time())
+    state['last_event'] = now
+
+    if kind == 'run_started':
+        state['total'] = event.get('total')
+        state['case_timeout'] = event.get('case_timeout')
+        state['started_at'] = now
+        # Sum of the remaining cases' historical durations, if the engine had any
+        state['estimated_seconds'] = event.get('estimated_seconds')
+        if state['estimated_seconds'] is not None:
+            state['eta_seconds'] = state['estimated_seconds']
+            state['finish_at'] = now + state['estimated_seconds']
+    elif kind == 'case_started':
+        if state['started_at'] is None:
+            state['started_at'] = now
+        if state['total'] is None:
+            state['total'] = event.get('total')
+        state['current_case'] = event.get('case')
+        state['current_search'] = event.get('search')
+        state['current_step'] = None
+        state['case_started_at'] = now
+        state['upkeep'] = None
+        state['current_estimate'] = event.get('estimate')
+    elif kind == 'step_done':
+        state['current_step'] = event.get('step')
+    elif kind == 'upkeep_started':
+        # The deadline covers the browser work between cases as well
+        state['case_started_at'] = now
+        state['upkeep'] = event.get('step')
+    elif kind == 'upkeep_done':
+        state['case_started_at'] = None
+        state['upkeep'] = None
+    elif kind == 'artifact_saved':
+        state['artifacts'] += 1
+    elif kind == 'case_result':
+        state['case_started_at'] = None
+        state['completed'] += 1
+        if state['current_estimate'] is not None and state['estimated_seconds'] is not None:
+            if event.get('attempts') == 0:
+                # A cached pass took no time - it drops out of the estimate
+                state['estimated_seconds'] -= state['current_estimate']
+            else:
+                state['estimated_done'] += state['current_estimate']
+        state['current_estimate'] = None
+        if str(event.get('result', '')).startswith('P'):
+            state['passed'] += 1
+        else:
+            state['failed'] += 1
+        _update_rate(state, now)
+    elif kind == 'run_done':
+        state['case_started_at'] = None
+        state['current_case'] = None
+        state['current_step'] = None
+        state['eta_seconds'] = 0
+        state['finish_at'] = now
+
+    return state
+
+
+def _update_rate(state, now):
+    """Recompute throughput and ETA after a case finishes
+
+    With historical case durations the ETA is what the remaining cases took
+    before, scaled by how fast this run has been against its own estimate
+    so far (a slow site today slows the whole prediction).  Without them
+    it is the remaining count at the run's average case time."""
+    if state['started_at'] is None:
+        return
+    elapsed = now - state['started_at']
+    if elapsed <= 0:
+        return
+    state['cases_per_minute'] = round(state['completed'] / elapsed * 60, 2)
+    if state['estimated_seconds'] is not None:
+        pace = 1.0
+        if state['estimated_done'] > 0:
+            pace = min(max(elapsed / state['estimated_done'], MIN_PACE), MAX_PACE)
+        remaining = max(state['estimated_seconds'] - state['estimated_done'], 0) * pace
+    elif state['total']:
+        remaining = max(state['total'] - state['completed'], 0) * elapsed / state['completed']
+    else:
+        return
+    state['eta_seconds'] = round(remaining, 1)
+    state['finish_at'] = now + remaining
+
+
+def read_events(read_fd, on_event):
+    """Read JSON-line events from a pipe until EOF, calling on_event for each"""
+    with os.fdopen(read_fd, "r", encoding="utf-8") as stream:
+        for line in stream:
+            event = parse_event(line)
+            if event is not None:
+                on_event(event)
@@ -0,0 +1,163 @@
+"""Quarantine of flaky test cases, scored from their history in results.db.
+
+A case that keeps flipping between pass and fail on a site that hasn't
+changed tells us nothing on a given night, but each of its failures still
+has to be looked at.  update() scores every Year|Model|Group|Part case of
+every platform with warehouse.flakiness_scores() and quarantines the cases
+that ran at least MIN_RUNS times in the last DAYS days and flipped in at
+least FLAKY_SCORE of their consecutive runs.  A case whose score drops
+below the threshold is released again on the next update.  Cases can also
+be quarantined by hand; those stay until they are removed.
+
+The list is kept per platform in quarantine.json.  The engine runs
+quarantined cases after all the others (--quarantine last, the default),
+leaves them out (--quarantine skip, for a blocking nightly run) or runs
+only them (--quarantine only, for a separate lane), and marks their results
+so the results pages can report their failures apart.
+
+    python quarantine.py                      (rescore and show the list)
+    python quarantine.py --add "2020|Ford F-150|Brakes|Pads" --platform cp31prod_mobileWEB
+    python quarantine.py --remove "2020|Ford F-150|Brakes|Pads" --platform cp31prod_mobileWEB
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+import warehouse
+
+QUARANTINE_FILE = "quarantine.json"
+# Window of history that is scored
+DAYS = 30
+# Runs a case needs in the window before it can be quarantined
+MIN_RUNS = 5
+# Share of consecutive runs with a flipped outcome that makes a case flaky
+FLAKY_SCORE = 0.3
+# Value of the Quarantined column of a results file
+QUARANTINED = "yes"
+
+
+def search_key(search):
+    """Normalized search: case and spacing don't matter"""
+    return "|".join(" ".join(part.split()) for part in str(search).lower().split("|"))
+
+
+def load(path=QUARANTINE_FILE):
+    """{platform: {search: entry}} from the quarantine file"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except OSError:
+        return {}
+    except ValueError as e:
+        print(f"Could not read {path}, nothing is quarantined: {str(e)}")
+        return {}
+
+
+def save(quarantine, path=QUARANTINE_FILE):
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(quarantine, f, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def quarantined(platform_name, path=QUARANTINE_FILE):
+    """Normalized searches quarantined on a platform"""
+    return {search_key(search) for search in load(path).get(platform_name, {})}
+
+
+def update(days=DAYS, min_runs=MIN_RUNS, threshold=FLAKY_SCORE, path=QUARANTINE_FILE):
+    """Rescore every case from the warehouse and rewrite the quarantine list; returns (added, released)"""
+    warehouse.ingest_all()
+    connection = warehouse.connect()
+    try:
+        scores = warehouse.flakiness_scores(connection, days)
+    finally:
+        connection.close()
+
+    old = load(path)
+    today = datetime.now().strftime("%Y-%m-%d")
+    quarantine = {}
+    added = []
+    for row in scores:
+        if row['runs'] < min_runs or row['score'] < threshold or not row['platform']:
+            continue
+        earlier = old.get(row['platform'], {}).get(row['search'], {})
+        quarantine.setdefault(row['platform'], {})[row['search']] = {
+            'score': row['score'], 'runs': row['runs'], 'failures': row['failures'], 'flips': row['flips'],
+            'since': earlier.get('since', today),
+        }
+        if not earlier:
+            added.append((row['platform'], row['search']))
+    # Cases quarantined by hand stay until they are removed
+    for platform_name, entries in old.items():
+        for search, entry in entries.items():
+            if entry.get('manual'):
+                quarantine.setdefault(platform_name, {})[search] = entry
+    released = [(platform_name, search) for platform_name, entries in old.items() for search in entries
+                if search not in quarantine.get(platform_name, {})]
+    save(quarantine, path)
+    return added, released
+
+
+def add(platform_name, search, path=QUARANTINE_FILE):
+    quarantine = load(path)
+    quarantine.setdefault(platform_name, {})[search] = {'manual': True, 'since': datetime.now().strftime("%Y-%m-%d")}
+    save(quarantine, path)
+
+
+def remove(platform_name, search, path=QUARANTINE_FILE):
+    """Release a case; returns False if it wasn't quarantined"""
+    quarantine = load(path)
+    entries = quarantine.get(platform_name, {})
+    matches = [s for s in entries if search_key(s) == search_key(search)]
+    for s in matches:
+        del entries[s]
+    if not entries:
+        quarantine.pop(platform_name, None)
+    save(quarantine, path)
+    return bool(matches)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score test cases for flakiness and update the quarantine list")
+    parser.add_argument("--days", type=int, default=DAYS, help=f"Days of history to score (default: {DAYS})")
+    parser.add_argument("--min-runs", type=int, default=MIN_RUNS,
+                        help=f"Runs a case needs before it can be quarantined (default: {MIN_RUNS})")
+    parser.add_argument("--score", type=float, default=FLAKY_SCORE,
+                        help=f"Share of flipped outcomes that quarantines a case (default: {FLAKY_SCORE})")
+    parser.add_argument("--add", metavar="SEARCH", help="Quarantine a case by hand")
+    parser.add_argument("--remove", metavar="SEARCH", help="Release a case")
+    parser.add_argument("--platform", help="Platform name for --add and --remove")
+    args = parser.parse_args(argv)
+
+    if args.add or args.remove:
+        if not args.platform:
+            parser.error("--platform is required with --add and --remove")
+        if args.add:
+            add(args.platform, args.add)
+            print(f"Quarantined '{args.add}' on {args.platform}")
+        elif remove(args.platform, args.remove):
+            print(f"Released '{args.remove}' on {args.platform}")
+        else:
+            print(f"'{args.remove}' is not quarantined on {args.platform}")
+            return 1
+    else:
+        added, released = update(args.days, args.min_runs, args.score)
+        for platform_name, search in added:
+            print(f"Quarantined {search} on {platform_name}")
+        for platform_name, search in released:
+            print(f"Released {search} on {platform_name}")
+
+    for platform_name, entries in sorted(load().items()):
+        print(f"\n{platform_name}: {len(entries)} quarantined")
+        for search, entry in sorted(entries.items(), key=lambda item: -item[1].get('score', 1)):
+            detail = "by hand" if entry.get('manual') else \
+                f"score {entry['score']:.2f}, failed {entry['failures']} of {entry['runs']} runs"
+            print(f"  {search} ({detail}, since {entry['since']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
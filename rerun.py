@@ -0,0 +1,210 @@
+"""Rerun only the failed test cases of an earlier run.
+
+`python auto_test.py --platform pro --rerun-failed results_<ts>.csv` picks
+the F rows of the results file (plus the P* rows with --include-warnings),
+runs them in an engine process of their own and merges the new outcomes
+into a new results file.  The rows that weren't rerun are copied as they
+were, rerun rows get their new Result and Attempts and keep the old result
+in a Previous column.
+
+Results of a --platform all run have a Platform column; their failures are
+rerun per platform in parallel, like fanout.py does, and --platform/--site
+are ignored.  The link from the new results file back to the original is
+kept in reruns.json for the results page.
+"""
+import argparse
+import glob
+import json
+import os
+from datetime import datetime
+
+import progress
+import quarantine
+from checkpoint import CHECKPOINT_DIR
+from fanout import PlatformRun, build_command, read_results, target_label
+from results_writer import ResultsWriter, new_results_file
+from test_loader import iter_test_cases, write_test_set
+
+RERUNS_FILE = "reruns.json"
+
+
+def needs_rerun(row, include_warnings=False):
+    """Whether a results row is a failure (or a warning, if asked for)"""
+    result = str(row.get('Result', ''))
+    return not result.startswith('P') or (include_warnings and result.startswith('P*'))
+
+
+def load_reruns():
+    """New results file -> {'original', 'rerun', 'fixed', 'time'} for every rerun so far"""
+    try:
+        with open(RERUNS_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def record_rerun(results_file, original, rerun, fixed):
+    reruns = load_reruns()
+    reruns[results_file] = {'original': original, 'rerun': rerun, 'fixed': fixed,
+                            'time': datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+    try:
+        with open(RERUNS_FILE, 'w') as f:
+            json.dump(reruns, f, indent=2)
+    except OSError as e:
+        print(f"Could not record the rerun in {RERUNS_FILE}: {str(e)}")
+
+
+def original_test_set(results_file, fallback):
+    """The test set an earlier run used, from its checkpoint if we still have it"""
+    wanted = os.path.basename(results_file)
+    for path in glob.glob(os.path.join(CHECKPOINT_DIR, "*.jsonl")):
+        test_set = None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    record = json.loads(line)
+                    if record.get('type') == 'run':
+                        test_set = record.get('test_set')
+                    elif record.get('type') == 'done' and os.path.basename(str(record.get('results_file'))) == wanted:
+                        return test_set or fallback
+        except (OSError, ValueError):
+            continue
+    return fallback
+
+
+def expected_results(test_set):
+    """(search, expected) -> ExpectedResult, which the results file doesn't keep"""
+    lookup = {}
+    try:
+        for _, test_case in iter_test_cases(test_set):
+            lookup.setdefault((test_case.search, test_case.expected), test_case.expected_result)
+    except Exception as e:
+        print(f"Could not read {test_set} for expected results ({str(e)}) - assuming PRESENT")
+    return lookup
+
+
+def default_target(args):
+    """(platform type, site) to rerun a single-platform results file on"""
+    if args.platform == "custom":
+        return ("custom", "custom")
+    if args.site:
+        return (args.platform, args.site)
+    with open(f"config4{args.platform}.json", 'r') as f:
+        return (args.platform, json.load(f)["platforms"][0]["name"])
+
+
+def run_failed(args):
+    """Rerun the failures in args.rerun_failed and merge the outcomes; returns the exit code"""
+    original = args.rerun_failed
+    if not os.path.exists(original):
+        print(f"Results file not found: {original}")
+        return 1
+    rows = read_results(original)
+    picked = [position for position, row in enumerate(rows) if needs_rerun(row, args.include_warnings)]
+    kind = "failed or warning" if args.include_warnings else "failed"
+    if not picked:
+        print(f"No {kind} test cases in {original} - nothing to rerun")
+        return 0
+
+    # Group the rows by the platform they ran on
+    groups = {}
+    fanout_results = 'Platform' in rows[0]
+    try:
+        single_target = None if fanout_results else default_target(args)
+    except (OSError, ValueError, KeyError, IndexError) as e:
+        print(f"Could not read config4{args.platform}.json: {str(e)}")
+        return 1
+    for position in picked:
+        if fanout_results:
+            platform_type, _, site = rows[position]['Platform'].partition('/')
+            target = (platform_type, site)
+        else:
+            target = single_target
+        if target[0] == "custom" and not args.url:
+            print(f"Skipping {rows[position]['Search']} on the custom site - rerun with --url")
+            continue
+        groups.setdefault(target, []).append(position)
+    if not groups:
+        return 1
+
+    test_set = original_test_set(original, args.test_set)
+    expected = expected_results(test_set)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    runs = []
+    offset = 0
+    for target, positions in groups.items():
+        base = f"rerun_{timestamp}_{target[0]}_{target[1]}"
+        cases = [(rows[p]['Search'], rows[p]['Expected'], expected.get((rows[p]['Search'], rows[p]['Expected']), "PRESENT"))
+                 for p in positions]
+        write_test_set(base + "_cases.csv", cases)
+        target_args = argparse.Namespace(**dict(vars(args), test_set=base + "_cases.csv"))
+        run = PlatformRun(target, build_command(target_args, target, base + ".csv"), base + ".csv", offset)
+        run.positions = positions
+        runs.append(run)
+        offset += len(positions)
+
+    print(f"Rerunning {len(picked)} {kind} test cases from {original} on "
+          f"{', '.join(target_label(target) for target in groups)}")
+    results_path = args.results_file or new_results_file()
+    if not args.dry_run:
+        progress.run_started(offset, original, "rerun", args.case_timeout, results_file=results_path)
+        progress.start_heartbeat()
+
+    for run in runs:
+        run.start()
+    failed_runs = [run.label for run in runs if run.wait() != 0]
+    if failed_runs:
+        print(f"Rerun processes that exited with an error: {', '.join(failed_runs)}")
+    if args.dry_run:
+        return 1 if failed_runs else 0
+
+    writer, fixed = merge_rerun(rows, runs, results_path)
+    rerun_count = sum(len(run.positions) for run in runs)
+    record_rerun(results_path, original, rerun_count, fixed)
+    print(f"\nRerun complete! {fixed} of {rerun_count} rerun test cases went from failing to passing. "
+          f"Results merged into {results_path} (rerun of {original})")
+    progress.run_done(results_path, writer.total, writer.passed, writer.failed)
+    writer.print_summary()
+    return 1 if failed_runs else 0
+
+
+def rerun_key(row):
+    """What a rerun row is matched to its original row by"""
+    return quarantine.search_key(row.get('Search', '')), str(row.get('Expected', '')).strip().lower()
+
+
+def merge_rerun(rows, runs, results_path):
+    """Write the original rows with the rerun outcomes swapped in; returns the writer and how many now pass"""
+    updates = {}
+    for run in runs:
+        # The engine doesn't write rows in test set order (quarantined cases
+        # run last), so rows are matched by search and expected value; a case
+        # that is in the test set twice takes its rows in turn
+        waiting = {}
+        for position in run.positions:
+            waiting.setdefault(rerun_key(rows[position]), []).append(position)
+        for new_row in read_results(run.results_file):
+            positions = waiting.get(rerun_key(new_row))
+            if positions:
+                updates[positions.pop(0)] = new_row
+            else:
+                print(f"Rerun result for {new_row.get('Search')} in {run.results_file} matches no rerun case")
+
+    columns = list(rows[0].keys())
+    if 'Attempts' not in columns:
+        columns.append('Attempts')
+    if 'Previous' not in columns:
+        columns.append('Previous')
+    writer = ResultsWriter(results_path, columns=columns)
+    fixed = 0
+    for position, row in enumerate(rows):
+        new_row = updates.get(position)
+        if new_row is None:
+            writer.write(row)
+            continue
+        merged = dict(row, Result=new_row['Result'], Attempts=new_row.get('Attempts', 1), Previous=row['Result'])
+        if str(new_row['Result']).startswith('P') and not str(row['Result']).startswith('P'):
+            fixed += 1
+        writer.write(merged)
+    writer.close()
+    return writer, fixed
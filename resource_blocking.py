@@ -0,0 +1,148 @@
+"""Resource blocking profiles for faster page loads under test.
+
+The pages we test load images, fonts, video, ads and analytics that the
+assertions never look at.  A platform entry can turn on a blocking profile:
+
+    "blocking": "light"
+    "blocking": {"profile": "light", "url_patterns": ["*hotjar.com*"],
+                 "mime_types": ["font/*", "video/*"], "page_load_strategy": "eager"}
+
+Profiles:
+    light       ad, analytics and tracking hosts, web fonts, video and audio
+    aggressive  light plus every image
+
+url_patterns are Chrome URL wildcards ("*" matches anything) blocked through
+the DevTools Network.setBlockedURLs command.  mime_types are blocked by the
+file extensions they are served with ("family/*" for all of a family);
+"image/*" uses Chrome's image content setting instead, which also covers
+images without an extension.  page_load_strategy "eager" lets driver.get()
+return once the DOM is ready instead of waiting for every subresource;
+"none" returns at once and is only safe for flows that wait for their own
+elements.
+
+Image blocking is not the default because some search buttons are
+input[type=image] elements that can lose their size without the image.
+Nothing is blocked in visual mode (--visual, or --save-all-screenshots),
+so screenshots show the page as users see it.
+"""
+
+# Hosts of ads, analytics and tracking scripts
+TRACKER_PATTERNS = [
+    "*google-analytics.com*", "*googletagmanager.com*", "*googleadservices.com*",
+    "*doubleclick.net*", "*googlesyndication.com*", "*facebook.net*", "*facebook.com/tr*",
+    "*hotjar.com*", "*newrelic.com*", "*nr-data.net*", "*quantserve.com*", "*scorecardresearch.com*",
+]
+
+# File extensions resources of each MIME type are served with
+MIME_EXTENSIONS = {
+    "image/png": ["png"],
+    "image/jpeg": ["jpg", "jpeg"],
+    "image/gif": ["gif"],
+    "image/webp": ["webp"],
+    "image/svg+xml": ["svg"],
+    "image/x-icon": ["ico"],
+    "font/woff": ["woff"],
+    "font/woff2": ["woff2"],
+    "font/ttf": ["ttf"],
+    "font/otf": ["otf"],
+    "application/vnd.ms-fontobject": ["eot"],
+    "video/mp4": ["mp4"],
+    "video/webm": ["webm"],
+    "audio/mpeg": ["mp3"],
+    "audio/ogg": ["ogg"],
+}
+
+PROFILES = {
+    "light": {"url_patterns": TRACKER_PATTERNS, "mime_types": ["font/*", "video/*", "audio/*"]},
+    "aggressive": {"url_patterns": TRACKER_PATTERNS, "mime_types": ["font/*", "video/*", "audio/*", "image/*"]},
+}
+DEFAULT_PROFILE = "light"
+PAGE_LOAD_STRATEGIES = ("normal", "eager", "none")
+
+
+def _expand_mime(mime_type):
+    """MIME types matching an exact type or a "family/*" wildcard"""
+    if mime_type.endswith("/*"):
+        family = mime_type[:-1]
+        return [known for known in MIME_EXTENSIONS if known.startswith(family)]
+    return [mime_type] if mime_type in MIME_EXTENSIONS else []
+
+
+def check_blocking_config(platform):
+    """Return a list of problems with a platform's blocking block (empty if it has none)"""
+    blocking = platform.get("blocking")
+    if blocking is None or blocking is True or blocking is False:
+        return []
+    name = platform.get("name")
+    if isinstance(blocking, str):
+        blocking = {"profile": blocking}
+    if not isinstance(blocking, dict):
+        return [f"platform '{name}': 'blocking' must be a profile name or an object"]
+    problems = []
+    profile = blocking.get("profile", DEFAULT_PROFILE)
+    if profile not in PROFILES:
+        problems.append(f"platform '{name}': unknown blocking profile '{profile}' (expected one of {', '.join(PROFILES)})")
+    for key in ("url_patterns", "mime_types"):
+        value = blocking.get(key, [])
+        if not isinstance(value, list) or not all(isinstance(item, str) and item for item in value):
+            problems.append(f"platform '{name}': blocking '{key}' must be a list of strings")
+    mime_types = blocking.get("mime_types", [])
+    if isinstance(mime_types, list):
+        for mime_type in mime_types:
+            if isinstance(mime_type, str) and mime_type and not _expand_mime(mime_type):
+                problems.append(f"platform '{name}': blocking can't block MIME type '{mime_type}'")
+    strategy = blocking.get("page_load_strategy", "normal")
+    if strategy not in PAGE_LOAD_STRATEGIES:
+        problems.append(f"platform '{name}': 'page_load_strategy' must be one of {', '.join(PAGE_LOAD_STRATEGIES)}")
+    return problems
+
+
+def resolve_profile(platform):
+    """The blocking settings for a platform, or None if it doesn't block anything"""
+    blocking = platform.get("blocking")
+    if not blocking:
+        return None
+    if blocking is True:
+        blocking = {}
+    elif isinstance(blocking, str):
+        blocking = {"profile": blocking}
+    base = PROFILES[blocking.get("profile", DEFAULT_PROFILE)]
+
+    mime_types = list(base["mime_types"]) + list(blocking.get("mime_types", []))
+    patterns = list(base["url_patterns"]) + list(blocking.get("url_patterns", []))
+    block_images = "image/*" in mime_types
+    for mime_type in mime_types:
+        if block_images and mime_type.startswith("image/"):
+            continue
+        for known in _expand_mime(mime_type):
+            patterns.extend(f"*.{extension}*" for extension in MIME_EXTENSIONS[known])
+    return {
+        "profile": blocking.get("profile", DEFAULT_PROFILE),
+        "url_patterns": list(dict.fromkeys(patterns)),
+        "block_images": block_images,
+        "page_load_strategy": blocking.get("page_load_strategy", "normal"),
+    }
+
+
+def configure_options(options, profile):
+    """Chrome options part of a profile (must be set before the browser starts)"""
+    if profile["block_images"]:
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    options.page_load_strategy = profile["page_load_strategy"]
+
+
+def apply_to_driver(driver, profile):
+    """DevTools part of a profile (for every new browser session)"""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": profile["url_patterns"]})
+    except Exception as e:
+        print(f"Could not block resources in this browser session: {str(e)}")
+
+
+def describe(profile):
+    parts = [f"{len(profile['url_patterns'])} URL patterns"]
+    if profile["block_images"]:
+        parts.append("images")
+    parts.append(f"page load strategy {profile['page_load_strategy']}")
+    return f"Blocking resources ({profile['profile']} profile): {', '.join(parts)}"
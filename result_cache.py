@@ -0,0 +1,144 @@
+"""Cache of passed test cases, keyed by the case and a fingerprint of the site.
+
+Nightly runs repeat the same searches against a catalog that mostly hasn't
+changed.  A platform entry with a "cache" block turns the cache on:
+
+    "cache": {"fingerprint_url": "https://example.com/catalog/version", "ttl_hours": 24}
+    "cache": {"fingerprint_selector": "#year_dropdown, #model_dropdown"}
+
+At the start of a run the site is fingerprinted by hashing the page at
+fingerprint_url, or the text of the elements matching fingerprint_selector
+on the platform's start page (default "select", i.e. the dropdown options).
+A test case whose normalized search, expected values and site fingerprint
+match a pass younger than ttl_hours is not run again: it is reported as a
+cached pass ("P - Cached: ...") with 0 attempts.  Only plain passes are
+cached, never P* or failures.  --no-cache runs everything.
+
+Entries are kept per platform in result_cache.json.  A save merges this
+run's entries case by case into what other runs of the platform saved
+meanwhile (see shared_json.py).
+"""
+import hashlib
+import time
+from datetime import datetime
+
+import shared_json
+
+CACHE_FILE = "result_cache.json"
+DEFAULT_TTL_HOURS = 24
+DEFAULT_FINGERPRINT_SELECTOR = "select"
+# Start of the Result of a case served from the cache
+CACHED_PREFIX = "P - Cached:"
+
+# Text of every element matching a CSS selector
+SNAPSHOT_SCRIPT = """
+var parts = [], elements = document.querySelectorAll(arguments[0]);
+for (var i = 0; i < elements.length; i++) {
+    parts.push(elements[i].textContent.replace(/\\s+/g, ' ').trim());
+}
+return parts.join('\\n');
+"""
+
+
+def check_cache_config(platform):
+    """Return a list of problems with a platform's cache block (empty if it has none)"""
+    cache = platform.get("cache")
+    if cache is None:
+        return []
+    name = platform.get("name")
+    if not isinstance(cache, dict):
+        return [f"platform '{name}': 'cache' must be an object"]
+    problems = []
+    ttl = cache.get("ttl_hours", DEFAULT_TTL_HOURS)
+    if not isinstance(ttl, (int, float)) or ttl <= 0:
+        problems.append(f"platform '{name}': cache 'ttl_hours' must be a positive number")
+    for key in ("fingerprint_url", "fingerprint_selector"):
+        if key in cache and not (isinstance(cache[key], str) and cache[key]):
+            problems.append(f"platform '{name}': cache '{key}' must be a non-empty string")
+    return problems
+
+
+def case_key(test_case):
+    """Normalized identity of a test case: case and spacing don't matter"""
+    search = "|".join(" ".join(part.split()) for part in test_case.search.lower().split("|"))
+    return "\x1f".join([search, " ".join(test_case.expected.lower().split()), test_case.expected_result.upper()])
+
+
+def site_fingerprint(driver, platform):
+    """Hash of what the site currently serves, per the platform's cache block"""
+    cache = platform["cache"]
+    if cache.get("fingerprint_url"):
+        driver.get(cache["fingerprint_url"])
+        snapshot = driver.page_source
+    else:
+        driver.get(platform["url"])
+        snapshot = driver.execute_script(SNAPSHOT_SCRIPT, cache.get("fingerprint_selector", DEFAULT_FINGERPRINT_SELECTOR))
+    if not snapshot:
+        raise ValueError("the fingerprint page or selector gave nothing to hash")
+    return hashlib.sha256(snapshot.encode("utf-8")).hexdigest()[:16]
+
+
+class ResultCache:
+    """Passed test cases of one platform, valid while the site fingerprint matches"""
+
+    def __init__(self, site, ttl_hours=DEFAULT_TTL_HOURS, path=CACHE_FILE):
+        self.site = site
+        self.ttl = ttl_hours * 3600
+        self.path = path
+        self.fingerprint = None
+        self.hits = 0
+        self.entries = shared_json.load(self.path).get(site, {})
+        # Cases this run stored or dropped - the only ones a save changes
+        self.changed = set()
+
+    def lookup(self, test_case):
+        """The cached pass for a test case, or None if it has to run"""
+        if self.fingerprint is None:
+            return None
+        entry = self.entries.get(case_key(test_case))
+        if entry is None or entry['fingerprint'] != self.fingerprint:
+            return None
+        if time.time() - entry['time'] > self.ttl:
+            return None
+        self.hits += 1
+        return entry
+
+    def store(self, test_case, result):
+        """Remember a plain pass against the current fingerprint"""
+        if self.fingerprint is None:
+            return
+        outcome = str(result.get('Result', ''))
+        key = case_key(test_case)
+        self.changed.add(key)
+        if outcome.startswith('P') and not outcome.startswith('P*'):
+            self.entries[key] = {'fingerprint': self.fingerprint, 'result': outcome, 'time': time.time()}
+        else:
+            # A case that no longer passes must not be served from an older entry
+            self.entries.pop(key, None)
+
+    def cached_result(self, entry):
+        """Result text for a case served from the cache"""
+        when = datetime.fromtimestamp(entry['time']).strftime("%Y-%m-%d %H:%M")
+        return f"{CACHED_PREFIX} {entry['result']} ({when})"
+
+    def save(self):
+        if self.fingerprint is None:
+            return
+        def merge(saved):
+            entries = saved.get(self.site, {})
+            for key in self.changed:
+                if key in self.entries:
+                    entries[key] = self.entries[key]
+                else:
+                    entries.pop(key, None)
+            # Drop entries that have expired or belong to an older version of the site
+            now = time.time()
+            saved[self.site] = {key: entry for key, entry in entries.items()
+                                if entry['fingerprint'] == self.fingerprint and now - entry['time'] <= self.ttl}
+            self.entries = saved[self.site]
+
+        try:
+            shared_json.update(self.path, merge)
+            self.changed = set()
+        except OSError as e:
+            print(f"Could not save the result cache to {self.path}: {str(e)}")
@@ -0,0 +1,67 @@
+"""Incremental results file for the test scripts.
+
+Results used to be collected in a list and written with pandas once the
+whole run was over, so nothing was visible until the end and memory grew
+with the size of the test set.  ResultsWriter appends each result to the
+CSV as soon as the case finishes and keeps the summary statistics as
+running counters instead.
+"""
+import csv
+from datetime import datetime
+
+# Columns of a results file, in order
+RESULT_COLUMNS = ['Search', 'Expected', 'Result', 'Attempts', 'Quarantined']
+
+# Merged results of a run against several platforms (fanout.py)
+FANOUT_COLUMNS = ['Search', 'Expected', 'Platform', 'Result', 'Attempts', 'Quarantined']
+
+
+def new_results_file():
+    """Timestamped name for a new results file"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"results_{timestamp}.csv"
+
+
+class ResultsWriter:
+    """Append test results to a CSV file one case at a time"""
+
+    def __init__(self, path=None, columns=RESULT_COLUMNS):
+        self.path = path or new_results_file()
+        self.total = 0
+        self.passed = 0
+        self.warnings = 0
+        self.failed = 0
+        self._file = open(self.path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=columns, extrasaction="ignore")
+        self._writer.writeheader()
+        self._file.flush()
+        print(f"Writing results to {self.path}")
+
+    def write(self, result):
+        """Append one result row and update the counters"""
+        self._writer.writerow(result)
+        self._file.flush()
+
+        self.total += 1
+        outcome = str(result.get('Result', ''))
+        if outcome.startswith('P'):
+            self.passed += 1
+            if outcome.startswith('P*'):
+                self.warnings += 1
+        else:
+            self.failed += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def print_summary(self):
+        """Print the end-of-run summary from the running counters"""
+        print(f"\nTest Summary:")
+        print(f"  Total Tests: {self.total}")
+        if self.total == 0:
+            return
+        print(f"  Passed Tests: {self.passed} ({self.passed/self.total*100:.1f}%)")
+        if self.warnings > 0:
+            print(f"  Passed with Warnings: {self.warnings} ({self.warnings/self.total*100:.1f}%)")
+        print(f"  Failed Tests: {self.failed} ({self.failed/self.total*100:.1f}%)")
@@ -0,0 +1,258 @@
+"""Retention policy for screenshots, results files and uploads.
+
+Saved artifacts, results_*.csv, dropdown_issues_*.txt, checkpoints, runner
+agent work files and uploaded test sets would otherwise pile up forever.  The web app runs collect() on a
+background thread (see app.py) with the policy in retention.json, if there
+is one:
+
+    {"keep_days": 30, "keep_runs": 20, "keep_failures_days": 90,
+     "max_size_mb": 2000, "interval_minutes": 60, "delete_uploads": false}
+
+A run's artifacts are kept while it is one of the newest keep_runs runs or
+younger than keep_days.  After that only the artifacts of its failed and
+retried cases (as the engine flagged them in the run manifest) are kept,
+until keep_failures_days.  If the artifact store is still bigger than
+max_size_mb, whole runs are removed oldest first, failures included, but
+never the newest run.  Results files, dropdown issue reports, checkpoints
+(once they are in results.db) and runner agent work files older than
+keep_days go too, except the newest keep_runs results files and files a
+scheduled test still needs.  Uploaded test sets are only deleted with
+"delete_uploads": true - they are inputs, not output, and may be the only
+copy.
+
+Runs are pruned from their manifests, one run at a time with a pause in
+between, so a pass never holds up the app.  Runs still in progress are left
+alone.
+"""
+import glob
+import json
+import os
+import time
+
+import artifact_store
+import warehouse
+from checkpoint import CHECKPOINT_DIR
+from runner_agent import WORK_DIR
+
+RETENTION_FILE = "retention.json"
+DEFAULT_POLICY = {
+    "keep_days": 30,
+    "keep_runs": 20,
+    "keep_failures_days": 90,
+    "max_size_mb": 2000,
+    "interval_minutes": 60,
+    "delete_uploads": False,
+}
+# Results and reports in the working directory that retention may delete
+RESULT_PATTERNS = ("results_*.csv", "matrix_*.csv", "rerun_*.csv", "dropdown_issues_*.txt",
+                   os.path.join(CHECKPOINT_DIR, "*.jsonl"), os.path.join(WORK_DIR, "*"))
+UPLOAD_FOLDER = "uploads"
+# Pause between runs so the GC thread stays in the background
+PAUSE_SECONDS = 0.2
+# How often the whole blob store is swept for blobs nothing refers to
+SWEEP_SECONDS = 24 * 3600
+
+_last_sweep = 0
+
+
+def load_policy():
+    """The retention policy: retention.json over the defaults"""
+    policy = dict(DEFAULT_POLICY)
+    try:
+        with open(RETENTION_FILE, 'r') as f:
+            saved = json.load(f)
+    except OSError:
+        return policy
+    except ValueError as e:
+        print(f"Could not read {RETENTION_FILE}, using the default retention policy: {str(e)}")
+        return policy
+    for key, value in saved.items():
+        if key not in DEFAULT_POLICY:
+            print(f"Ignoring unknown retention setting '{key}'")
+        elif isinstance(DEFAULT_POLICY[key], bool):
+            if isinstance(value, bool):
+                policy[key] = value
+            else:
+                print(f"Ignoring retention setting '{key}': must be true or false")
+        elif isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+            print(f"Ignoring retention setting '{key}': must be a number of at least 0")
+        else:
+            policy[key] = value
+    return policy
+
+
+def is_failure(name):
+    """Whether an artifact's name says it was saved for a failure (artifacts outside a flagged case)"""
+    step = artifact_store.describe(name)['step']
+    return step.endswith("error") or step.startswith(("retry_", "assert_failed"))
+
+
+def failure_artifacts(manifest):
+    """Names of a run's artifacts that belong to failed or retried cases"""
+    info = manifest.get('case_info', {})
+    names = set()
+    for case, steps in manifest.get('cases', {}).items():
+        flags = info.get(case, {})
+        for files in steps.values():
+            for record in files:
+                if 'failed' in flags:
+                    failed = flags['failed'] or flags.get('retried', False)
+                else:
+                    # Runs from before the engine flagged cases, and artifacts outside a case
+                    failed = is_failure(record['name'])
+                if failed:
+                    names.add(record['name'])
+    return names
+
+
+def run_finished(manifest, now):
+    return not artifact_store.run_in_progress(manifest, now)
+
+
+def too_old(name, saved, policy, now):
+    """Whether an artifact saved outside a run is past its keep_days (or keep_failures_days)"""
+    days = policy['keep_failures_days'] if is_failure(name) else policy['keep_days']
+    return saved < now - days * 86400
+
+
+def expired_artifacts(manifest, position, policy, now):
+    """Names of the artifacts of a run that the age rules let go"""
+    if position < policy['keep_runs']:
+        return []
+    age = now - manifest.get('started', now)
+    if age <= policy['keep_days'] * 86400:
+        return []
+    kept = failure_artifacts(manifest) if age <= policy['keep_failures_days'] * 86400 else set()
+    return [name for name in artifact_store.manifest_records(manifest) if name not in kept]
+
+
+def prune_runs(policy, now, pause=PAUSE_SECONDS):
+    """Apply the age and size rules to the run artifacts; returns (artifacts removed, runs touched, bytes freed)"""
+    manifests = []
+    for run_id in artifact_store.list_runs():
+        manifest = artifact_store.load_manifest(run_id)
+        if manifest is not None:
+            manifests.append(manifest)
+    manifests.sort(key=lambda m: m.get('started', 0), reverse=True)
+
+    # How many artifacts use each blob, so we know what deleting a run frees
+    index = artifact_store.load_index()
+    users = {}
+    for record in index.values():
+        users[record['blob']] = users.get(record['blob'], 0) + 1
+    sizes = artifact_store.blob_sizes(users)
+    total_size = sum(sizes.values())
+
+    removed = touched = freed = 0
+
+    def remove(names):
+        nonlocal total_size
+        for name in names:
+            blob = index[name]['blob']
+            users[blob] -= 1
+            if users[blob] == 0:
+                total_size -= sizes[blob]
+        return artifact_store.delete(names, index=index)
+
+    for position, manifest in enumerate(manifests):
+        if not run_finished(manifest, now):
+            continue
+        names = expired_artifacts(manifest, position, policy, now)
+        if names:
+            before = total_size
+            removed += remove(names)
+            freed += before - total_size
+            touched += 1
+            time.sleep(pause)
+
+    # Artifacts saved outside a run only go by age
+    names = [name for name, record in index.items() if "/" not in name and too_old(name, record['time'], policy, now)]
+    if names:
+        before = total_size
+        removed += remove(names)
+        freed += before - total_size
+
+    # Size cap: whole runs, oldest first, never the newest one
+    cap = policy['max_size_mb'] * 1e6
+    for manifest in reversed(manifests[1:]):
+        if total_size <= cap:
+            break
+        if not run_finished(manifest, now):
+            continue
+        names = [name for name in artifact_store.manifest_records(manifest) if name in index]
+        if names:
+            before = total_size
+            removed += remove(names)
+            freed += before - total_size
+            touched += 1
+            time.sleep(pause)
+    return removed, touched, freed
+
+
+def prune_files(policy, now, protected=()):
+    """Delete old results files, reports, loose screenshots and (if the policy says so) uploads; returns how many"""
+    cutoff = now - policy['keep_days'] * 86400
+    protected = {os.path.abspath(path) for path in protected}
+    deleted = 0
+
+    try:
+        # A checkpoint is only deleted once its run is in results.db
+        warehouse.ingest_all()
+        patterns = RESULT_PATTERNS
+    except Exception as e:
+        print(f"Retention could not update {warehouse.DB_FILE}, keeping the checkpoints: {str(e)}")
+        patterns = [pattern for pattern in RESULT_PATTERNS if not pattern.startswith(CHECKPOINT_DIR)]
+    results = sorted((path for pattern in patterns for path in glob.glob(pattern)),
+                     key=os.path.getmtime, reverse=True)
+    newest = set([path for path in results if path.startswith("results_")][:int(policy['keep_runs'])])
+    candidates = [path for path in results if path not in newest]
+    if policy['delete_uploads'] and os.path.isdir(UPLOAD_FOLDER):
+        candidates.extend(os.path.join(UPLOAD_FOLDER, f) for f in os.listdir(UPLOAD_FOLDER))
+
+    for path in candidates:
+        try:
+            if os.path.abspath(path) in protected or not os.path.isfile(path) or os.path.getmtime(path) > cutoff:
+                continue
+            os.remove(path)
+            deleted += 1
+        except OSError as e:
+            print(f"Retention could not delete {path}: {str(e)}")
+
+    # Screenshots saved straight into screenshots/ before the artifact store
+    loose = [a['name'] for a in artifact_store.list_artifacts(index={}) if too_old(a['name'], a['time'], policy, now)]
+    if loose:
+        deleted += artifact_store.delete(loose, index={})
+    return deleted
+
+
+def collect(policy=None, protected=(), pause=PAUSE_SECONDS):
+    """One retention pass over artifacts and files"""
+    global _last_sweep
+    if policy is None:
+        policy = load_policy()
+    now = time.time()
+    removed, touched, freed = prune_runs(policy, now, pause)
+    deleted_files = prune_files(policy, now, protected)
+    swept = 0
+    if now - _last_sweep > SWEEP_SECONDS:
+        # Blobs released while still fresh, or left by a crash between blob and index
+        swept = artifact_store.collect_garbage()
+        _last_sweep = now
+    # The gallery shows this instead of stat-ing every blob itself
+    artifact_store.record_usage()
+    if removed or deleted_files or swept:
+        print(f"Retention: removed {removed} artifacts from {touched} runs ({freed / 1e6:.1f} MB), "
+              f"{deleted_files} old files, {swept} unused blobs")
+    return removed, deleted_files
+
+
+def gc_thread(get_protected=None):
+    """Background loop for the web app: a retention pass every interval_minutes"""
+    print("Retention thread started")
+    while True:
+        policy = load_policy()
+        try:
+            collect(policy, protected=get_protected() if get_protected else ())
+        except Exception as e:
+            print(f"Retention pass failed: {str(e)}")
+        time.sleep(max(policy['interval_minutes'], 1) * 60)
@@ -0,0 +1,175 @@
+"""Runner agent for distributed test runs (see coordinator.py).
+
+Pulls chunks of test cases from the coordinator, runs each chunk with the
+engine (auto_test.py) in a subprocess and streams every result back as soon
+as the engine reports it on its progress channel.  A heartbeat is sent while
+a chunk is running.  If the coordinator says the rest of a chunk was handed
+to another agent, the engine is stopped and the agent asks for more work.
+
+    COORDINATOR_TOKEN=<token> python runner_agent.py --coordinator http://coordinator-host:8765 [--name runner-1]
+
+The token is the one the coordinator printed (or was started with).
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import progress
+from coordinator import TOKEN_ENV, TOKEN_HEADER
+from test_loader import write_test_set
+
+# Where chunk test sets and their results are written
+WORK_DIR = "agent_work"
+# Seconds between heartbeats while a chunk is running
+HEARTBEAT_INTERVAL = 15
+# Seconds to wait for a coordinator that isn't answering
+RETRY_WAIT = 5
+# How many times in a row the coordinator may fail to answer before giving up
+MAX_RETRIES = 12
+
+# Shared secret of the run, from COORDINATOR_TOKEN
+token = None
+
+
+def build_parser():
+    """Command line arguments"""
+    parser = argparse.ArgumentParser(description="Runner agent for distributed test runs")
+    parser.add_argument("--coordinator", required=True, help="Coordinator URL, e.g. http://host:8765")
+    parser.add_argument("--name", default=f"{socket.gethostname()}-{os.getpid()}",
+                        help="Agent name reported to the coordinator (default: host-pid)")
+    parser.add_argument("--headless", action="store_true", help="Force headless mode on this runner")
+    return parser
+
+
+def call(coordinator, path, payload=None):
+    """GET (no payload) or POST JSON to the coordinator and return the JSON answer"""
+    data = None if payload is None else json.dumps(payload).encode("utf-8")
+    request = urllib.request.Request(coordinator.rstrip("/") + path, data=data,
+                                     headers={"Content-Type": "application/json", TOKEN_HEADER: token or ""})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+def call_with_retry(coordinator, path, payload=None):
+    """Call the coordinator, waiting out short outages"""
+    for attempt in range(MAX_RETRIES):
+        try:
+            return call(coordinator, path, payload)
+        except urllib.error.HTTPError as e:
+            if e.code == 401:
+                raise ConnectionError(f"Coordinator {coordinator} refused the token - set {TOKEN_ENV} to the token it printed")
+            print(f"Coordinator answered {e.code}, retrying in {RETRY_WAIT}s...")
+            time.sleep(RETRY_WAIT)
+        except OSError as e:
+            print(f"Coordinator not answering ({str(e)}), retrying in {RETRY_WAIT}s...")
+            time.sleep(RETRY_WAIT)
+    raise ConnectionError(f"Gave up on coordinator {coordinator} after {MAX_RETRIES} attempts")
+
+
+def write_chunk(chunk, path):
+    """Write a chunk's test cases as a test set CSV for the engine"""
+    write_test_set(path, [(case['search'], case['expected'], case['expected_result']) for case in chunk['cases']])
+
+
+def engine_command(job, test_set, results_file, force_headless=False):
+    """auto_test.py command line for one chunk"""
+    cmd = [sys.executable, "auto_test.py", "--platform", job['platform'], "--test-set", test_set,
+           "--results-file", results_file,
+           "--wait-time", str(job['wait_time']), "--case-timeout", str(job['case_timeout']),
+           "--retry-budget", str(job.get('retry_budget', 10))]
+    for option in ("site", "url", "username", "password"):
+        if job.get(option):
+            cmd += ["--" + option, job[option]]
+    if job.get('headless') or force_headless:
+        cmd.append("--headless")
+    if job.get('save_all_screenshots'):
+        cmd.append("--save-all-screenshots")
+    if job.get('visual'):
+        cmd.append("--visual")
+    if job.get('fixed_wait'):
+        cmd.append("--fixed-wait")
+    if job.get('no_cache'):
+        cmd.append("--no-cache")
+    return cmd
+
+
+def run_chunk(args, job, chunk):
+    """Run one chunk with the engine, streaming results to the coordinator"""
+    chunk_id = chunk['chunk']
+    os.makedirs(WORK_DIR, exist_ok=True)
+    base = os.path.join(WORK_DIR, f"{args.name}_chunk{chunk_id}")
+    write_chunk(chunk, base + ".csv")
+    cmd = engine_command(job, base + ".csv", base + "_results.csv", args.headless)
+    print(f"Running chunk {chunk_id} ({len(chunk['cases'])} cases)")
+
+    read_fd, write_fd = os.pipe()
+    env = dict(os.environ)
+    env[progress.PROGRESS_FD_ENV] = str(write_fd)
+    try:
+        process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, pass_fds=(write_fd,), env=env)
+    finally:
+        os.close(write_fd)
+
+    stop_heartbeat = threading.Event()
+
+    def heartbeat_func():
+        while not stop_heartbeat.wait(HEARTBEAT_INTERVAL):
+            try:
+                call(args.coordinator, "/heartbeat", {'agent': args.name, 'chunk': chunk_id})
+            except OSError as e:
+                print(f"Heartbeat failed: {str(e)}")
+
+    threading.Thread(target=heartbeat_func, daemon=True).start()
+
+    def on_event(event):
+        # Results still buffered on the pipe after the engine exited count too
+        if event['event'] != 'case_result':
+            return
+        # The engine numbers cases within the chunk file
+        case = chunk['cases'][event['case']]
+        answer = call_with_retry(args.coordinator, "/result", {
+            'agent': args.name, 'chunk': chunk_id, 'index': case['index'], 'result': event['result'],
+            'attempts': event.get('attempts', 1)})
+        if answer.get('chunk_done') and event['case'] < len(chunk['cases']) - 1:
+            # Whatever is left of this chunk was handed to another agent
+            if process.poll() is None:
+                print(f"Chunk {chunk_id} complete - stopping the engine")
+                process.terminate()
+
+    try:
+        progress.read_events(read_fd, on_event)
+        process.wait()
+    finally:
+        stop_heartbeat.set()
+
+
+def main(argv=None):
+    """Pull and run chunks until the coordinator says the run is done"""
+    global token
+    args = build_parser().parse_args(argv)
+    token = os.environ.get(TOKEN_ENV)
+    if not token:
+        print(f"{TOKEN_ENV} is not set - the coordinator will refuse this agent")
+    job = call_with_retry(args.coordinator, "/job")
+    print(f"Agent {args.name} joined {args.coordinator}: {job['platform']} tests from {job['test_set']}")
+
+    while True:
+        answer = call_with_retry(args.coordinator, "/work", {'agent': args.name})
+        if answer.get('done'):
+            print("Coordinator reports the run is complete")
+            return 0
+        if 'wait' in answer:
+            time.sleep(answer['wait'])
+            continue
+        run_chunk(args, job, answer)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
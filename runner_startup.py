@@ -0,0 +1,79 @@
+"""Startup helpers shared by the test scripts.
+
+The scripts import selenium lazily and only launch Chrome once the config
+and test set have been checked.  `--dry-run` stops after those checks, so a
+bad test file or config is reported in well under a second without a
+browser.  Cold start (process start to a live WebDriver session) is timed
+and printed so regressions in startup cost are visible in the console log.
+"""
+import os
+import time
+
+from test_loader import load_test_cases, TestCaseError
+from step_plan import check_plan
+from result_cache import check_cache_config
+from resource_blocking import check_blocking_config
+
+# Taken when the first test script module imports this one
+PROCESS_START = time.perf_counter()
+
+
+def check_config(config, config_file):
+    """Return a list of problems with a platform config file"""
+    problems = []
+    platforms = config.get("platforms")
+    if not platforms:
+        problems.append(f"{config_file}: no platforms defined")
+    else:
+        for i, platform in enumerate(platforms):
+            for key in ("name", "url"):
+                if not platform.get(key):
+                    problems.append(f"{config_file}: platform {i + 1} has no '{key}'")
+            problems.extend(f"{config_file}: {problem}" for problem in check_plan(platform))
+            problems.extend(f"{config_file}: {problem}" for problem in check_cache_config(platform))
+            problems.extend(f"{config_file}: {problem}" for problem in check_blocking_config(platform))
+    options = config.get("webdriver_options", [])
+    if not isinstance(options, list):
+        problems.append(f"{config_file}: 'webdriver_options' must be a list")
+    return problems
+
+
+def dry_run(test_set, config=None, config_file=None, vehicle_search=True):
+    """Validate the config and test set without launching a browser.
+
+    Returns the process exit code (0 if everything is usable)."""
+    started = time.perf_counter()
+    problems = []
+
+    if config is not None:
+        problems.extend(check_config(config, config_file))
+
+    test_cases = []
+    if not os.path.exists(test_set):
+        problems.append(f"Test set not found: {test_set}")
+    else:
+        try:
+            test_cases = load_test_cases(test_set, vehicle_search=vehicle_search)
+        except TestCaseError as e:
+            problems.append(str(e))
+
+    elapsed = time.perf_counter() - started
+    if problems:
+        print("Dry run failed:")
+        for problem in problems:
+            print("  - " + problem.replace("\n", "\n    "))
+        return 1
+
+    if config is not None:
+        names = ", ".join(p["name"] for p in config["platforms"])
+        print(f"Config {config_file} OK ({names})")
+    print(f"Test set {test_set} OK: {len(test_cases)} test cases validated in {elapsed*1000:.0f} ms")
+    print("Dry run complete - no browser was launched")
+    return 0
+
+
+def report_cold_start(import_seconds, launch_seconds):
+    """Print how long it took from process start to a live WebDriver session"""
+    total = time.perf_counter() - PROCESS_START
+    print(f"Cold start: {total:.2f}s to first WebDriver session "
+          f"(selenium import {import_seconds:.2f}s, browser launch {launch_seconds:.2f}s)")
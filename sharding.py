@@ -0,0 +1,131 @@
+"""Duration-aware sharding of a test set.
+
+Splitting a test set into runs of equally many rows leaves wall-clock time
+to whichever shard drew the slow cases (pro interchange searches take many
+times longer than a plain part lookup).  The warehouse (results.db) has the
+duration of every case of every run, so each case gets an estimate - its
+average over the last HISTORY_DAYS days on the platform, or the median of
+the known cases if it never ran there - and the cases are packed
+longest-processing-time first: sorted by estimate, longest first, each one
+goes to the shard with the least estimated time so far.  No shard then
+runs longer than the average by more than one case.
+
+The same estimates give the web app a predicted duration for scheduled
+tests and the engine a predicted finish time for its progress channel.
+The coordinator cuts its chunks this way.  For hosts that each run a part
+of a test set on their own, the shard files are written up front:
+
+    python sharding.py test_cases.csv --shards 4 [--platform cp31prod_mobileWEB]
+
+writes test_cases_shard1of4.csv ... test_cases_shard4of4.csv.
+"""
+import argparse
+import heapq
+import json
+import os
+import statistics
+import sys
+
+import quarantine
+import warehouse
+from test_loader import iter_test_cases, write_test_set
+
+# Days of per-case durations that estimates are taken from
+HISTORY_DAYS = 30
+# Estimate for every case when nothing on the platform has a duration yet
+DEFAULT_CASE_SECONDS = 30.0
+
+
+def case_durations(platform_name=None, days=HISTORY_DAYS):
+    """{normalized search: average seconds} of the cases run in the window"""
+    try:
+        warehouse.ingest_all()
+        connection = warehouse.connect()
+    except Exception as e:
+        print(f"Could not read case durations from {warehouse.DB_FILE}: {str(e)}")
+        return {}
+    try:
+        return {quarantine.search_key(row['search']): row['average']
+                for row in warehouse.slowest_cases(connection, days, platform_name, limit=-1)}
+    finally:
+        connection.close()
+
+
+def estimate(searches, durations):
+    """Estimated seconds for each search, unknown ones at the median of the known"""
+    default = statistics.median(durations.values()) if durations else DEFAULT_CASE_SECONDS
+    return [durations.get(quarantine.search_key(search), default) for search in searches]
+
+
+def lpt_shards(estimates, count):
+    """Positions of `estimates` packed longest first into `count` shards of even total time
+
+    Returns [(total seconds, [positions in ascending order])], longest shard
+    first; shards that got nothing are left out.
+    """
+    count = max(1, min(count, len(estimates)))
+    # (load, shard number) - the number breaks ties so shards fill in turn
+    loads = [(0.0, shard) for shard in range(count)]
+    members = [[] for _ in range(count)]
+    for position in sorted(range(len(estimates)), key=lambda p: estimates[p], reverse=True):
+        load, shard = heapq.heappop(loads)
+        members[shard].append(position)
+        heapq.heappush(loads, (load + estimates[position], shard))
+    totals = {shard: load for load, shard in loads}
+    shards = [(totals[shard], sorted(members[shard])) for shard in range(count) if members[shard]]
+    shards.sort(key=lambda entry: entry[0], reverse=True)
+    return shards
+
+
+def platform_name(platform_type, site=None):
+    """Name of the platform entry a run of a platform type tests (the first one unless a site is given)"""
+    if site:
+        return site
+    try:
+        with open(f"config4{platform_type}.json", 'r') as f:
+            return json.load(f)["platforms"][0]["name"]
+    except (OSError, ValueError, KeyError, IndexError):
+        return None
+
+
+def estimate_run(test_set, platform_type, site=None):
+    """Estimated seconds for a whole test set, or None without any recorded durations"""
+    durations = case_durations(platform_name(platform_type, site))
+    if not durations:
+        return None
+    return sum(estimate([test_case.search for _, test_case in iter_test_cases(test_set)], durations))
+
+
+def write_shards(test_set, count, platform_name=None):
+    """Split a test set file into `count` shard files of even estimated time; returns their paths"""
+    test_cases = [test_case for _, test_case in iter_test_cases(test_set)]
+    durations = case_durations(platform_name)
+    shards = lpt_shards(estimate([test_case.search for test_case in test_cases], durations), count)
+    base = os.path.splitext(test_set)[0]
+    paths = []
+    for number, (total, positions) in enumerate(shards, 1):
+        path = f"{base}_shard{number}of{len(shards)}.csv"
+        write_test_set(path, [(test_cases[p].search, test_cases[p].expected, test_cases[p].expected_result)
+                              for p in positions])
+        print(f"{path}: {len(positions)} cases, about {total / 60:.1f} minutes")
+        paths.append(path)
+    known = sum(1 for test_case in test_cases if quarantine.search_key(test_case.search) in durations)
+    print(f"{known} of {len(test_cases)} cases have a recorded duration"
+          + (f" on {platform_name}" if platform_name else ""))
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Split a test set into shards of even estimated run time")
+    parser.add_argument("test_set", help="Path to test cases CSV file")
+    parser.add_argument("--shards", type=int, required=True, help="Number of shards")
+    parser.add_argument("--platform", help="Platform name whose case durations to use (default: all platforms)")
+    args = parser.parse_args(argv)
+    if args.shards < 1:
+        parser.error("--shards must be at least 1")
+    write_shards(args.test_set, args.shards, args.platform)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
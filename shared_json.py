@@ -0,0 +1,65 @@
+"""JSON files that several test processes update at once.
+
+pacing.json and result_cache.json hold one entry per platform, and the
+platform runs of a fan-out (or the engines of several runner agents) save
+theirs at the same time.  update() takes a lock file next to the JSON file,
+re-reads it, lets the caller merge its own keys into what is there and
+writes the result to a temporary file that is renamed over the old one, so
+no save is lost and no reader ever sees half a file.
+"""
+import json
+import os
+import threading
+import time
+
+# A lock file older than this was left by a process that died holding it
+STALE_LOCK_SECONDS = 30
+LOCK_TIMEOUT = 10
+
+_lock = threading.Lock()
+
+
+def load(path):
+    """The contents of a JSON file, or {} if it is missing or unreadable"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _acquire(lock_path):
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while True:
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > STALE_LOCK_SECONDS:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{lock_path} has been held for more than {LOCK_TIMEOUT}s")
+            time.sleep(0.05)
+
+
+def update(path, merge, **dump_options):
+    """Apply merge(data) to the JSON file at path under a lock and write it back atomically"""
+    lock_path = path + ".lock"
+    with _lock:
+        _acquire(lock_path)
+        try:
+            data = load(path)
+            merge(data)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(data, f, **dump_options)
+            os.replace(temp_path, path)
+        finally:
+            try:
+                os.remove(lock_path)
+            except OSError:
+                pass
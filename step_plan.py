@@ -0,0 +1,380 @@
+"""Declarative step plans for platforms described in the config file.
+
+A platform entry with a "steps" list is run by this interpreter instead of
+a hand-written strategy, so a new site only needs a config entry:
+
+    "steps": [
+        {"action": "select", "selector": ["#year_dropdown", "#year"], "value": "{year}"},
+        {"action": "select", "selector": "#model", "value": "{make_model}", "match": "contains"},
+        {"action": "type", "selector": "input[name='userZip']", "value": "41094", "optional": true},
+        {"action": "click", "selector": "@search_button"},
+        {"action": "wait_for", "selector": "body"},
+        {"action": "assert_text", "text": "{year}"}
+    ]
+
+Actions: open, select, click, type, wait_for, assert_text.  A selector is a
+CSS selector, an XPath (starting with "/" or "("), "@name" for an entry of
+the platform's "selectors" block, or a list of those tried as fallbacks.
+Values are templates filled from the test case: {search}, {year},
+{make_model}, {make}, {model}, {group}, {part}, {part_main}, {qualifier}
+and {expected}, plus anything in the platform's "vars".
+
+The plan is compiled once per run: every step is checked, its locators
+resolved and its value template parsed, and the result is a list of plain
+callables.  Adjacent "type" steps with CSS selectors are merged into one
+JavaScript call that fills all the fields in a single round trip.
+"""
+import string
+import time
+
+# Selenium locator strategies (the values of By.CSS_SELECTOR and By.XPATH),
+# so plans can be compiled without importing selenium
+CSS = "css selector"
+XPATH = "xpath"
+
+ACTIONS = ("open", "select", "click", "type", "wait_for", "assert_text")
+
+# Fields of a TestCase available to value templates
+TEMPLATE_FIELDS = ("search", "year", "make_model", "make", "model", "group",
+                   "part", "part_main", "qualifier", "expected")
+
+# Fill several input fields at once and report the ones that weren't found
+BATCH_TYPE_SCRIPT = """
+var fields = arguments[0], missing = [];
+for (var i = 0; i < fields.length; i++) {
+    var field = fields[i], element = null;
+    for (var j = 0; j < field.selectors.length && !element; j++) {
+        element = document.querySelector(field.selectors[j]);
+    }
+    if (!element) {
+        if (!field.optional) missing.push(field.label);
+        continue;
+    }
+    element.focus();
+    element.value = field.value;
+    element.dispatchEvent(new Event('input', {bubbles: true}));
+    element.dispatchEvent(new Event('change', {bubbles: true}));
+}
+return missing;
+"""
+
+
+class PlanError(ValueError):
+    """Raised when a step plan in a config file is invalid"""
+
+
+def import_selenium():
+    """Import selenium on first use - compiling a plan doesn't need it"""
+    global Select, WebDriverWait, Keys, NoSuchElementException, TimeoutException
+    from selenium.webdriver.support.ui import Select, WebDriverWait
+    from selenium.webdriver.common.keys import Keys
+    from selenium.common.exceptions import NoSuchElementException, TimeoutException
+
+
+def test_case_values(test_case, variables=None):
+    """Template values for one test case"""
+    values = dict(variables or {})
+    for field in TEMPLATE_FIELDS:
+        values[field] = getattr(test_case, field)
+    return values
+
+
+def _locators(step, selectors, label):
+    """Resolve a step's selector (or list of fallbacks) to (by, value) locators"""
+    raw = step.get("selector")
+    if raw is None:
+        return []
+    if isinstance(raw, str):
+        raw = [raw]
+    if not raw or not all(isinstance(s, str) and s for s in raw):
+        raise PlanError(f"{label}: 'selector' must be a string or a list of strings")
+
+    locators = []
+    for selector in raw:
+        if selector.startswith("@"):
+            name = selector[1:]
+            if name not in selectors:
+                raise PlanError(f"{label}: no selector named '{name}' in the platform's 'selectors'")
+            selector = selectors[name]
+        by = XPATH if selector.startswith(("/", "(")) else CSS
+        locators.append((by, selector))
+    return locators
+
+
+def _number(step, key, default, label):
+    """A step's number of seconds, checked up front"""
+    value = step.get(key, default)
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        raise PlanError(f"{label}: '{key}' must be a number of seconds, not {value!r}")
+    if seconds < 0:
+        raise PlanError(f"{label}: '{key}' must be at least 0")
+    return seconds
+
+
+def _template(value, variables, label, key="value"):
+    """Parse a value template once; returns a function of the template values"""
+    if value is None:
+        raise PlanError(f"{label}: missing '{key}'")
+    value = str(value)
+    try:
+        fields = [name for _, name, _, _ in string.Formatter().parse(value) if name is not None]
+    except ValueError as e:
+        raise PlanError(f"{label}: bad template '{value}': {str(e)}")
+    if not fields:
+        return lambda values: value
+    for name in fields:
+        if name not in TEMPLATE_FIELDS and name not in variables:
+            raise PlanError(f"{label}: unknown placeholder '{{{name}}}' in '{value}'")
+    return lambda values: value.format_map(values)
+
+
+def _describe(locators):
+    return " or ".join(selector for _, selector in locators)
+
+
+def _waiter(step, action, wait_time, pacer, label):
+    """How a step waits for its element: its own "timeout", or paced by the pacer"""
+    timeout = _number(step, "timeout", wait_time, label)
+    if pacer is None or "timeout" in step:
+        return lambda driver, condition: WebDriverWait(driver, timeout).until(condition)
+    optional = bool(step.get("optional", False))
+    return lambda driver, condition: pacer.wait(driver, f"plan_{action}", condition, optional=optional)
+
+
+def _find(driver, locators, wait, label):
+    """Wait until any of the locators matches a displayed element"""
+    def first_match(d):
+        for by, selector in locators:
+            for element in d.find_elements(by, selector):
+                if element.is_displayed():
+                    return element
+        return False
+
+    try:
+        return wait(driver, first_match)
+    except TimeoutException:
+        raise NoSuchElementException(f"{label}: no element matched {_describe(locators)}")
+
+
+def _click(driver, element):
+    """Standard click with a JavaScript fallback"""
+    try:
+        driver.execute_script("arguments[0].scrollIntoView(true);", element)
+        element.click()
+    except Exception:
+        driver.execute_script("arguments[0].click();", element)
+
+
+def _compile_open(step, ctx):
+    url = _template(step.get("url", "{url}"), ctx["variables"], ctx["label"])
+
+    def run(driver, values):
+        driver.get(url(values))
+    return run
+
+
+def _compile_select(step, ctx):
+    label, locators, wait = ctx["label"], ctx["locators"], ctx["wait"]
+    value = _template(step.get("value"), ctx["variables"], label)
+    match = step.get("match", "exact")
+    if match not in ("exact", "contains"):
+        raise PlanError(f"{label}: 'match' must be 'exact' or 'contains'")
+
+    def run(driver, values):
+        wanted = value(values)
+        select = Select(_find(driver, locators, wait, label))
+        try:
+            select.select_by_visible_text(wanted)
+            return
+        except NoSuchElementException:
+            if match == "exact":
+                raise NoSuchElementException(f"{label}: no option '{wanted}'")
+        # Closest match for "contains": first option containing the value
+        for option in select.options:
+            if wanted.lower() in option.text.lower():
+                select.select_by_visible_text(option.text)
+                print(f"{label}: selected '{option.text}' for '{wanted}'")
+                return
+        raise NoSuchElementException(f"{label}: no option containing '{wanted}'")
+    return run
+
+
+def _compile_click(step, ctx):
+    label, locators, wait = ctx["label"], ctx["locators"], ctx["wait"]
+
+    def run(driver, values):
+        _click(driver, _find(driver, locators, wait, label))
+    return run
+
+
+def _compile_type(step, ctx):
+    label, locators, wait = ctx["label"], ctx["locators"], ctx["wait"]
+    value = _template(step.get("value"), ctx["variables"], label)
+    submit = bool(step.get("submit", False))
+
+    def run(driver, values):
+        element = _find(driver, locators, wait, label)
+        element.clear()
+        element.send_keys(value(values))
+        if submit:
+            element.send_keys(Keys.RETURN)
+    run.batch_value = value
+    return run
+
+
+def _compile_wait_for(step, ctx):
+    label, locators, wait = ctx["label"], ctx["locators"], ctx["wait"]
+    seconds = step.get("seconds")
+    if not locators and seconds is None:
+        raise PlanError(f"{label}: 'wait_for' needs a 'selector' or 'seconds'")
+    if seconds is not None:
+        seconds = _number(step, "seconds", None, label)
+
+    def run(driver, values):
+        if locators:
+            _find(driver, locators, wait, label)
+        else:
+            time.sleep(seconds)
+    return run
+
+
+def _compile_assert_text(step, ctx):
+    label, locators = ctx["label"], ctx["locators"] or [(CSS, "body")]
+    text = _template(step.get("text"), ctx["variables"], label, key="text")
+    absent = bool(step.get("absent", False))
+
+    def run(driver, values):
+        wanted = text(values)
+        page_text = _find(driver, locators, ctx["wait"], label).text
+        found = wanted.lower() in page_text.lower()
+        if found and absent:
+            return f"'{wanted}' is on the page but should be absent"
+        if not found and not absent:
+            return f"'{wanted}' not found on the page"
+        return None
+    return run
+
+
+COMPILERS = {
+    "open": _compile_open,
+    "select": _compile_select,
+    "click": _compile_click,
+    "type": _compile_type,
+    "wait_for": _compile_wait_for,
+    "assert_text": _compile_assert_text,
+}
+
+# Actions that need a selector
+NEEDS_SELECTOR = ("select", "click", "type")
+
+
+class CompiledStep:
+    """A step of a plan, ready to run"""
+
+    def __init__(self, number, step, run, locators):
+        self.number = number
+        self.action = step["action"]
+        self.name = step.get("name") or f"{self.action}_{number}"
+        self.label = f"Step {number} ({step.get('name') or self.action})"
+        self.optional = bool(step.get("optional", False))
+        self.pause = _number(step, "pause", 0, self.label)
+        self.batch = bool(step.get("batch", True))
+        self.submit = bool(step.get("submit", False))
+        self.locators = locators
+        self.run = run
+
+
+class BatchedTypeStep:
+    """Several adjacent "type" steps filled in one JavaScript call"""
+
+    action = "type"
+    optional = False
+    pause = 0
+
+    def __init__(self, steps):
+        self.steps = steps
+        self.number = steps[0].number
+        self.name = "+".join(step.name for step in steps)
+        self.label = f"Steps {steps[0].number}-{steps[-1].number} (type)"
+        self.pause = steps[-1].pause
+
+    def run(self, driver, values):
+        fields = [{
+            "label": step.label,
+            "selectors": [selector for _, selector in step.locators],
+            "value": step.run.batch_value(values),
+            "optional": step.optional,
+        } for step in self.steps]
+        missing = driver.execute_script(BATCH_TYPE_SCRIPT, fields)
+        if missing:
+            raise NoSuchElementException(f"No input field found for {', '.join(missing)}")
+
+
+def _batchable(step):
+    return (step.action == "type" and step.batch and not step.submit and not step.pause
+            and all(by == CSS for by, _ in step.locators))
+
+
+def _batch(compiled):
+    """Merge runs of adjacent batchable "type" steps"""
+    plan = []
+    run = []
+    for step in compiled + [None]:
+        if step is not None and _batchable(step):
+            run.append(step)
+            continue
+        if len(run) > 1:
+            plan.append(BatchedTypeStep(run))
+        else:
+            plan.extend(run)
+        run = []
+        if step is not None:
+            plan.append(step)
+    return plan
+
+
+def compile_plan(steps, selectors=None, variables=None, wait_time=2.0, pacer=None):
+    """Check a step plan and turn it into a list of runnable steps.
+
+    With a pacer (see pacing.py), steps without a "timeout" of their own wait
+    for their element as long as that action has been measured to take.
+
+    Raises PlanError describing the first invalid step."""
+    if not isinstance(steps, list) or not steps:
+        raise PlanError("'steps' must be a non-empty list")
+    selectors = selectors or {}
+    variables = dict(variables or {}, url="")
+
+    compiled = []
+    for number, step in enumerate(steps, 1):
+        if not isinstance(step, dict):
+            raise PlanError(f"Step {number}: must be an object")
+        action = step.get("action")
+        if action not in COMPILERS:
+            raise PlanError(f"Step {number}: unknown action '{action}' (expected one of {', '.join(ACTIONS)})")
+        label = f"Step {number} ({step.get('name') or action})"
+        locators = _locators(step, selectors, label)
+        if action in NEEDS_SELECTOR and not locators:
+            raise PlanError(f"{label}: '{action}' needs a 'selector'")
+        ctx = {
+            "label": label,
+            "locators": locators,
+            "variables": variables,
+            "wait": _waiter(step, action, wait_time, pacer, label),
+        }
+        run = COMPILERS[action](step, ctx)
+        compiled.append(CompiledStep(number, step, run, locators))
+    return _batch(compiled)
+
+
+def check_plan(platform):
+    """Return a list of problems with a platform's step plan (empty if it has none)"""
+    if "steps" not in platform:
+        return []
+    try:
+        compile_plan(platform["steps"], platform.get("selectors"), platform.get("vars"))
+    except PlanError as e:
+        return [f"platform '{platform.get('name')}': {str(e)}"]
+    return []
@@ -0,0 +1,112 @@
+"""Lightweight test case loader for the test scripts.
+
+Reads a test set CSV row by row with the csv module instead of pandas, so
+loading thousands of cases takes milliseconds and the scripts start without
+importing pandas.  The 'Search Year|Make Model|Group|Part' field is split
+once into a compact TestCase record, and every row is validated before the
+run starts so a bad line fails fast instead of hundreds of cases in.
+"""
+import csv
+
+# Column names used in the test set CSV files
+SEARCH_COLUMN = 'Search Year|Make Model|Group|Part'
+EXPECTED_COLUMN = 'Expected'
+EXPECTED_RESULT_COLUMN = 'ExpectedResult'
+
+
+class TestCaseError(ValueError):
+    """Raised when a test set file is missing columns or has invalid rows"""
+
+
+class TestCase:
+    """One row of a test set, with the search field already split into its parts"""
+
+    __slots__ = ('index', 'search', 'expected', 'expected_result', 'year', 'make_model',
+                 'make', 'model', 'group', 'part', 'part_main', 'qualifier')
+
+    def __init__(self, index, search, expected="", expected_result="PRESENT"):
+        self.index = index
+        self.search = search
+        self.expected = expected
+        self.expected_result = expected_result
+
+        parts = [p.strip() for p in search.split('|')]
+        self.year = parts[0]
+        self.make_model = parts[1] if len(parts) > 1 else ""
+        self.group = parts[2] if len(parts) > 2 else ""
+        self.part = parts[3] if len(parts) > 3 else ""
+
+        # First word is the make, the rest is the model
+        make_model_parts = self.make_model.split(' ', 1)
+        self.make = make_model_parts[0]
+        self.model = make_model_parts[1] if len(make_model_parts) > 1 else ""
+
+        # "Wheel (display w/ image)" -> main part "Wheel", qualifier "display w/ image"
+        self.part_main = self.part
+        self.qualifier = ""
+        if '(' in self.part:
+            self.part_main = self.part.split('(')[0].strip()
+            self.qualifier = self.part.split('(')[1].split(')')[0].strip()
+
+    def __repr__(self):
+        return f"TestCase({self.index}, {self.search!r})"
+
+
+def _validate(test_case, line, vehicle_search):
+    """Return a description of what's wrong with a test case, or None if it's usable"""
+    if not test_case.search:
+        return f"line {line}: empty '{SEARCH_COLUMN}' value"
+    if test_case.search.count('|') < 1 or not test_case.make_model:
+        return f"line {line}: '{test_case.search}' needs at least two '|' separated fields"
+    if vehicle_search and not (test_case.year.isdigit() and len(test_case.year) == 4):
+        return f"line {line}: '{test_case.year}' is not a valid year in '{test_case.search}'"
+    return None
+
+
+def iter_test_cases(path):
+    """Stream TestCase records from a test set CSV file without validating them"""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        if reader.fieldnames is None or SEARCH_COLUMN not in reader.fieldnames:
+            raise TestCaseError(f"{path} is missing the '{SEARCH_COLUMN}' column")
+
+        index = 0
+        for row in reader:
+            search = (row.get(SEARCH_COLUMN) or "").strip()
+            # Skip blank lines the same way the old pandas loader did
+            if not search and not any((value or "").strip() for value in row.values() if isinstance(value, str)):
+                continue
+            test_case = TestCase(index, search,
+                                 (row.get(EXPECTED_COLUMN) or "").strip(),
+                                 (row.get(EXPECTED_RESULT_COLUMN) or "").strip() or "PRESENT")
+            yield reader.line_num, test_case
+            index += 1
+
+
+def write_test_set(path, cases):
+    """Write (search, expected, expected_result) tuples as a test set CSV file"""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([SEARCH_COLUMN, EXPECTED_COLUMN, EXPECTED_RESULT_COLUMN])
+        writer.writerows(cases)
+
+
+def load_test_cases(path, vehicle_search=True):
+    """Load and validate every test case in a test set CSV file.
+
+    Set vehicle_search=False for test sets that don't start with a year
+    (e.g. custom sites).  Raises TestCaseError listing every invalid row."""
+    test_cases = []
+    errors = []
+    for line, test_case in iter_test_cases(path):
+        error = _validate(test_case, line, vehicle_search)
+        if error:
+            errors.append(error)
+        else:
+            test_cases.append(test_case)
+
+    if errors:
+        shown = "\n  ".join(errors[:20])
+        more = f"\n  ... and {len(errors) - 20} more" if len(errors) > 20 else ""
+        raise TestCaseError(f"{len(errors)} invalid test case(s) in {path}:\n  {shown}{more}")
+    return test_cases
@@ -0,0 +1,85 @@
+"""Run manifests of the artifact store"""
+import os
+
+import artifact_store
+
+
+def test_journal_is_read_with_the_manifest_and_folded_in_at_finish(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manifest = artifact_store.RunManifest("run1", "web", "results.csv")
+    manifest.case = 0
+    artifact_store.save("search_case_1_20240101_120000.png", b"page", manifest=manifest)
+
+    loaded = artifact_store.load_manifest("run1")
+    assert list(artifact_store.manifest_records(loaded)) == ["run1/search_case_1_20240101_120000.png"]
+    assert loaded['cases']["1"]["search"][0]['blob'].endswith(".png")
+
+    manifest.finish()
+    assert not os.path.exists(artifact_store.journal_path("run1"))
+    assert list(artifact_store.manifest_records(artifact_store.load_manifest("run1"))) == \
+        ["run1/search_case_1_20240101_120000.png"]
+
+
+def test_artifacts_of_a_run_in_progress_are_not_deleted(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manifest = artifact_store.RunManifest("run1", "web", "results.csv")
+    name = "run1/search_case_1_20240101_120000.png"
+    artifact_store.save("search_case_1_20240101_120000.png", b"page", manifest=manifest)
+
+    assert artifact_store.delete([name]) == 0
+    assert artifact_store.read(name) == b"page"
+
+    manifest.finish()
+    assert artifact_store.delete([name]) == 1
+    assert artifact_store.read(name) is None
+
+
+def test_artifacts_are_listed_run_by_run_newest_first(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for run_id in ("20240101_120000_web", "20240102_120000_web"):
+        manifest = artifact_store.RunManifest(run_id, "web")
+        artifact_store.save("search_case_1_20240101_120000.png", run_id.encode(), manifest=manifest)
+        manifest.finish()
+    artifact_store.save("manual_20240101_120000.png", b"outside")
+    artifact_store.record_usage()
+
+    artifacts = artifact_store.iter_artifacts(".png")
+    assert next(artifacts)['run'] == "20240102_120000_web"
+    assert [a['name'] for a in artifacts] == ["20240101_120000_web/search_case_1_20240101_120000.png",
+                                             "manual_20240101_120000.png"]
+    usage = artifact_store.load_usage()
+    assert usage['logical'] == len(b"20240101_120000_web") * 2 + len(b"outside")
+    assert all(a['name'] != "usage.json" for a in artifact_store.list_artifacts())
+
+
+def test_files_of_the_store_are_not_artifacts(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    artifact_store.save("manual_20240101_120000.png", b"page")
+    artifact_store.record_usage()
+    with open(artifact_store.DOM_SUMMARY_FILE, 'w') as f:
+        f.write("{}")
+
+    assert [a['name'] for a in artifact_store.list_artifacts()] == ["manual_20240101_120000.png"]
+    assert artifact_store.read("dom_summaries.json") is None
+    assert artifact_store.delete(["dom_summaries.json", "usage.json", "index.jsonl"]) == 0
+    assert os.path.exists(artifact_store.DOM_SUMMARY_FILE)
+
+
+def test_steps_of_two_runs_are_paired_by_search(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    steps = {}
+    for run_id, searches in (("run1", ["2020|Ford F-150|Brakes|Pads", "2021|Honda Civic|Filters|Oil"]),
+                             ("run2", ["2021|Honda Civic|Filters|Oil"])):
+        manifest = artifact_store.RunManifest(run_id, "web")
+        for index, search in enumerate(searches):
+            manifest.start_case(index, search)
+            artifact_store.save(f"search_case_{index + 1}_20240101_120000.png", search.encode(), manifest=manifest)
+        manifest.start_case(None)
+        steps[run_id] = artifact_store.step_artifacts(artifact_store.load_manifest(run_id), ".png")
+
+    shared = set(steps["run1"]) & set(steps["run2"])
+    assert len(shared) == 1
+    key = shared.pop()
+    assert steps["run1"][key]['case'] == "2"
+    assert steps["run2"][key]['case'] == "1"
+    assert steps["run1"][key]['blob'] == steps["run2"][key]['blob']
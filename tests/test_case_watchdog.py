@@ -0,0 +1,48 @@
+"""Stopping a stuck browser session"""
+import subprocess
+import sys
+import time
+
+import pytest
+
+from case_watchdog import kill_browser
+
+
+class Service:
+    def __init__(self, process):
+        self.process = process
+
+
+class Driver:
+    def __init__(self, process):
+        self.service = Service(process)
+
+
+def alive(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # A killed child that wasn't reaped yet is a zombie
+            return f.read().split()[2] != "Z"
+    except OSError:
+        return False
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc")
+def test_the_browser_under_chromedriver_is_killed_too():
+    # Stands in for chromedriver, with a "browser" and a "renderer" below it
+    driver_process = subprocess.Popen(
+        [sys.executable, "-c", "import subprocess, sys, time; "
+         "subprocess.Popen([sys.executable, '-c', 'import subprocess, sys, time; "
+         "print(subprocess.Popen([sys.executable, \"-c\", \"import time; time.sleep(60)\"]).pid, flush=True); "
+         "time.sleep(60)'], stdout=sys.stdout); time.sleep(60)"],
+        stdout=subprocess.PIPE, text=True)
+    renderer = int(driver_process.stdout.readline())
+    assert alive(renderer)
+
+    kill_browser(Driver(driver_process))
+    driver_process.wait(timeout=10)
+    for _ in range(50):
+        if not alive(renderer):
+            break
+        time.sleep(0.1)
+    assert not alive(renderer)
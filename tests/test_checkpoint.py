@@ -0,0 +1,27 @@
+"""Per-case checkpoints and resuming a run"""
+import json
+import os
+from unittest import mock
+
+import checkpoint
+from checkpoint import Checkpoint
+
+
+def test_runs_started_in_the_same_second_get_their_own_checkpoint(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    started = checkpoint.datetime(2024, 1, 1, 12, 0, 0)
+    with mock.patch.object(checkpoint, "datetime") as clock:
+        clock.now.return_value = started
+        first = Checkpoint("cases.csv", "web")
+        second = Checkpoint("cases.csv", "web")
+    assert first.run_id != second.run_id
+    assert first.run_id.startswith("20240101_120000_web_")
+    first.record(0, {'Search': "a", 'Result': "P - ok"})
+    second.record(0, {'Search': "a", 'Result': "F - Timeout"})
+    first.finish("results_1.csv")
+    second.finish("results_2.csv")
+
+    with open(first.path) as f:
+        records = [json.loads(line) for line in f]
+    assert [record['type'] for record in records] == ["run", "case", "done"]
+    assert len(os.listdir(checkpoint.CHECKPOINT_DIR)) == 2
@@ -0,0 +1,44 @@
+"""Work handout of the distributed run coordinator"""
+import pytest
+
+import coordinator
+
+
+@pytest.fixture(autouse=True)
+def fresh_run():
+    for state in (coordinator.cases, coordinator.results, coordinator.chunks, coordinator.agents,
+                  coordinator.requeues):
+        state.clear()
+    coordinator.pending.clear()
+    coordinator.done_event.clear()
+    coordinator.next_chunk_id = 0
+    for index in range(3):
+        coordinator.cases[index] = {'search': f"2020|Make Model|Group|Part {index}", 'expected': "",
+                                    'expected_result': "PRESENT"}
+    coordinator.new_chunk([0, 1, 2])
+
+
+def test_unreported_case_is_requeued_when_agent_asks_for_work():
+    chunk = coordinator.assign_work("A")
+    coordinator.record_result("A", chunk['chunk'], 0, "P - ok")
+    coordinator.record_result("A", chunk['chunk'], 1, "P - ok")
+    # The engine died before reporting case 2
+    assert coordinator.assign_work("B") == {'wait': coordinator.IDLE_WAIT}
+
+    again = coordinator.assign_work("A")
+    assert [case['index'] for case in again['cases']] == [2]
+    coordinator.record_result("A", again['chunk'], 2, "F - Element Not Found")
+    assert coordinator.done_event.is_set()
+    assert coordinator.assign_work("B") == {'done': True}
+
+
+def test_case_that_never_reports_is_failed_after_max_requeues():
+    chunk = coordinator.assign_work("A")
+    coordinator.record_result("A", chunk['chunk'], 0, "P - ok")
+    coordinator.record_result("A", chunk['chunk'], 1, "P - ok")
+    for _ in range(coordinator.MAX_REQUEUES):
+        answer = coordinator.assign_work("A")
+        assert [case['index'] for case in answer['cases']] == [2]
+
+    assert coordinator.assign_work("A") == {'done': True}
+    assert coordinator.results[2]['Result'].startswith("F - Agent Error")
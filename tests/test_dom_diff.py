@@ -0,0 +1,22 @@
+"""Page structure summaries of the DOM diff"""
+from dom_diff import StructureParser, diff_summaries
+
+
+def summarize(html):
+    parser = StructureParser()
+    parser.feed(html)
+    parser.close()
+    return parser.summary()
+
+
+def test_options_without_end_tags_are_recorded():
+    summary = summarize("<select name=year><option>2020<option>2021</select>"
+                        "<select id=make><optgroup label=US><option>Ford<option>GMC</optgroup>"
+                        "<optgroup label=JP><option>Honda</select>")
+    assert summary['selects'] == {'year': ["2020", "2021"], 'make': ["Ford", "GMC", "Honda"]}
+
+
+def test_a_dropdown_that_lost_options_is_reported():
+    old = summarize("<select name=year><option>2020<option>2021<option>2022</select>")
+    new = summarize("<select name=year><option>2020<option>2022</select>")
+    assert diff_summaries(old, new)['options'] == {'year': {'added': [], 'removed': ["2021"]}}
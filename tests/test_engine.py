@@ -0,0 +1,113 @@
+"""Command line and run loop of the engine"""
+import csv
+import json
+
+import pytest
+
+import engine
+import test_loader
+from checkpoint import Checkpoint
+
+SEARCHES = ["2020|Ford F-150|Brakes|Pads", "2018|Honda Civic|Engine|Filters", "2015|Toyota Camry|Lighting|Bulbs"]
+
+
+class Stub:
+    """Stands in for the browser, pacer and watchdog of a run"""
+    fired = False
+    vehicle_search = True
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class RecordingStrategy(Stub):
+    def __init__(self):
+        self.ran = []
+
+    def run_case(self, test_case, index):
+        self.ran.append(index)
+        return engine.case_result(test_case, "P - Found")
+
+
+def start_engine(monkeypatch, tmp_path, argv, strategy):
+    """Set up the engine globals main() would, without a browser"""
+    monkeypatch.chdir(tmp_path)
+    test_loader.write_test_set("test_cases.csv", [(search, "", "PRESENT") for search in SEARCHES])
+    monkeypatch.setattr(engine, "args", engine.build_parser().parse_args(
+        ["--test-set", "test_cases.csv", "--results-file", "results.csv", "--headless"] + argv), raising=False)
+    monkeypatch.setattr(engine, "platform", {"name": "web"})
+    monkeypatch.setattr(engine, "strategy", strategy)
+    for name in ("driver", "pacer", "case_watchdog"):
+        monkeypatch.setattr(engine, name, Stub())
+    monkeypatch.setattr(engine, "save_debug_info", lambda *args, **kwargs: None)
+
+
+def results(path="results.csv"):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def test_platform_types_with_a_step_plan_are_accepted(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with open("config4shop.json", 'w') as f:
+        json.dump({"platforms": [{"name": "shop", "url": "https://shop.example",
+                                  "steps": [{"action": "open"}]}]}, f)
+    with open("config4plain.json", 'w') as f:
+        json.dump({"platforms": [{"name": "plain", "url": "https://plain.example"}]}, f)
+    parser = engine.build_parser()
+
+    assert parser.parse_args(["--platform", "shop"]).platform == "shop"
+    assert parser.parse_args(["--platform", "pro"]).platform == "pro"
+    for rejected in ("plain", "nothing"):
+        with pytest.raises(SystemExit):
+            parser.parse_args(["--platform", rejected])
+
+
+def test_run_ending_in_a_fatal_error_reports_failure(tmp_path, monkeypatch):
+    def missing_test_set(*args, **kwargs):
+        raise FileNotFoundError("test_cases.csv")
+
+    start_engine(monkeypatch, tmp_path, [], RecordingStrategy())
+    monkeypatch.setattr(engine, "load_test_cases", missing_test_set)
+
+    assert engine.run_tests() is False
+
+
+def test_resume_skips_the_cases_that_finished(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    interrupted = Checkpoint("test_cases.csv", "web")
+    interrupted.record(0, {'Search': SEARCHES[0], 'Expected': "", 'Result': "P - Found"})
+    interrupted.record(2, {'Search': SEARCHES[2], 'Expected': "", 'Result': "F - Timeout: no results"})
+    interrupted._file.close()
+    strategy = RecordingStrategy()
+    start_engine(monkeypatch, tmp_path, ["--resume", interrupted.run_id], strategy)
+
+    assert engine.run_tests() is True
+
+    assert strategy.ran == [1]
+    # The earlier results are carried over into the new results file
+    assert [(row['Search'], row['Result']) for row in results()] == [
+        (SEARCHES[0], "P - Found"), (SEARCHES[2], "F - Timeout: no results"), (SEARCHES[1], "P - Found")]
+
+
+def test_retries_stop_when_the_run_budget_is_used_up(tmp_path, monkeypatch):
+    class FlakyStrategy(RecordingStrategy):
+        def run_case(self, test_case, index):
+            self.ran.append(index)
+            raise RuntimeError("element went stale")
+
+    strategy = FlakyStrategy()
+    start_engine(monkeypatch, tmp_path, ["--retry-budget", "1"], strategy)
+    # Page Changed is retried up to twice per case
+    monkeypatch.setattr(engine, "classify_error", lambda e: "Page Changed")
+    monkeypatch.setattr(engine, "retries_left", 1)
+    [first, second] = [test_loader.TestCase(index, search) for index, search in enumerate(SEARCHES[:2])]
+
+    result, error = engine.run_case_with_retries(first, 0)
+    assert (result['Attempts'], engine.retries_left) == (2, 0)
+    assert result['Result'] == "F - Page Changed: element went stale"
+    assert isinstance(error, RuntimeError)
+
+    result, error = engine.run_case_with_retries(second, 1)
+    assert result['Attempts'] == 1
+    assert strategy.ran == [0, 0, 1]
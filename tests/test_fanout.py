@@ -0,0 +1,48 @@
+"""Merging the results of a fan-out run"""
+import csv
+
+import fanout
+from results_writer import ResultsWriter
+
+
+def platform_results(path, rows):
+    writer = ResultsWriter(str(path))
+    for search, result in rows:
+        writer.write({'Search': search, 'Expected': "", 'Result': result, 'Attempts': 1})
+    writer.close()
+    return str(path)
+
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))
+
+
+def test_matrix_has_a_row_per_case_and_a_column_per_platform(tmp_path):
+    web = fanout.PlatformRun(("web", "shop"), [], platform_results(tmp_path / "web.csv", [
+        ("2020|Ford F-150|Brakes|Pads", "P - Found"),
+        ("2018|Honda Civic|Engine|Filters", "F - Timeout: no results"),
+        ("2020|Ford F-150|Brakes|Pads", "P - Found"),
+    ]), 0)
+    # Died after two cases
+    pro = fanout.PlatformRun(("pro", "shop pro"), [], platform_results(tmp_path / "pro.csv", [
+        ("2020|Ford F-150|Brakes|Pads", "F - Element Not Found: search box"),
+        ("2018|Honda Civic|Engine|Filters", "P - Found"),
+    ]), 3)
+    results_path = str(tmp_path / "results.csv")
+    matrix_path = str(tmp_path / "matrix.csv")
+
+    writer, rates = fanout.merge_results([web, pro], results_path, matrix_path)
+
+    assert read_rows(matrix_path) == [
+        ["Search", "Expected", "web/shop", "pro/shop pro"],
+        ["2020|Ford F-150|Brakes|Pads", "", "P - Found", "F - Element Not Found: search box"],
+        ["2018|Honda Civic|Engine|Filters", "", "F - Timeout: no results", "P - Found"],
+        # A repeated row of the test set keeps its own line
+        ["2020|Ford F-150|Brakes|Pads", "", "P - Found", ""],
+    ]
+    merged = read_rows(results_path)
+    assert merged[0] == fanout.FANOUT_COLUMNS
+    assert [row[2] for row in merged[1:]] == ["web/shop"] * 3 + ["pro/shop pro"] * 2
+    assert rates == {"web/shop": (3, 2), "pro/shop pro": (2, 1)}
+    assert writer.total == 5
@@ -0,0 +1,56 @@
+"""Saving learned pacing"""
+import json
+
+import pacing
+from pacing import Pacer, SETTLE, WAIT
+
+
+class QuietPage:
+    """A driver whose page has been quiet for a second"""
+    def execute_script(self, script, *args):
+        return 1000
+
+
+def test_saves_merge_per_platform_and_step(tmp_path):
+    path = str(tmp_path / "pacing.json")
+    other_site = Pacer("pro", 2, path=path)
+    other_site.record(WAIT, "search", 1.0)
+    other_site.save()
+
+    first = Pacer("web", 2, path=path)
+    second = Pacer("web", 2, path=path)
+    first.record(SETTLE, "page_load", 0.5)
+    second.record(WAIT, "dropdown", 0.2)
+    first.save()
+    second.save()
+
+    with open(path) as f:
+        saved = json.load(f)
+    assert saved == {'pro': {'wait:search': [1.0]}, 'web': {'settle:page_load': [0.5], 'wait:dropdown': [0.2]}}
+    assert not (tmp_path / "pacing.json.lock").exists()
+
+
+def test_settling_and_waiting_are_paced_apart(tmp_path):
+    pacer = Pacer("web", 2, path=str(tmp_path / "pacing.json"))
+    for _ in range(pacing.MIN_SAMPLES):
+        pacer.record(WAIT, "search", 3.0)
+        pacer.record(SETTLE, "search", 0.1)
+    pacer.settle(QuietPage(), "search")
+
+    assert [len(pacer.samples[key]) for key in ("settle:search", "wait:search")] == [pacing.MIN_SAMPLES + 1, pacing.MIN_SAMPLES]
+    # A quick settle doesn't shorten the wait for the results, nor the other way round
+    assert pacer.timeout("search") == 3.0 * pacing.HEADROOM
+    assert pacer.settle_time("search") == pacing.MIN_TIMEOUT
+
+
+def test_samples_saved_by_step_alone_are_measured_again(tmp_path):
+    path = str(tmp_path / "pacing.json")
+    with open(path, 'w') as f:
+        json.dump({'web': {'search': [3.0] * 10, 'settle:search': [0.5] * 10}}, f)
+
+    pacer = Pacer("web", 2, path=path)
+    assert list(pacer.samples) == ["settle:search"]
+    pacer.record(WAIT, "search", 1.0)
+    pacer.save()
+    with open(path) as f:
+        assert sorted(json.load(f)['web']) == ["settle:search", "wait:search"]
@@ -0,0 +1,16 @@
+"""Folding progress events into the state app.py watches"""
+import progress
+
+
+def test_browser_work_between_cases_is_held_to_the_deadline():
+    state = progress.new_progress_state()
+    for event in ({'event': 'case_started', 'case': 0, 'total': 2, 'search': "a", 'time': 10},
+                  {'event': 'case_result', 'case': 0, 'search': "a", 'result': "F - Timeout", 'time': 20},
+                  {'event': 'upkeep_started', 'case': 0, 'step': "recovery", 'time': 21}):
+        progress.apply_event(state, event)
+    assert state['case_started_at'] == 21
+    assert state['upkeep'] == "recovery"
+
+    progress.apply_event(state, {'event': 'upkeep_done', 'case': 0, 'time': 30})
+    assert state['case_started_at'] is None
+    assert state['upkeep'] is None
@@ -0,0 +1,100 @@
+"""Flakiness scoring and the quarantine list"""
+import json
+import os
+from datetime import datetime, timedelta
+
+import quarantine
+import warehouse
+from checkpoint import CHECKPOINT_DIR
+
+HISTORIES = {
+    "2020|Ford F-150|Brakes|Pads": "PFPFPF",
+    "2018|Honda Civic|Engine|Filters": "PPPFFF",
+    "2015|Toyota Camry|Lighting|Bulbs": "PPPPPP",
+}
+
+
+def write_runs(histories, platform="web"):
+    """One checkpoint per run, a day apart, with each case's outcome for that run (C for a cached pass)"""
+    os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+    runs = len(next(iter(histories.values())))
+    for run in range(runs):
+        started = (datetime.now() - timedelta(days=runs - run)).strftime("%Y-%m-%d %H:%M:%S")
+        with open(os.path.join(CHECKPOINT_DIR, f"run{run}.jsonl"), 'w') as f:
+            f.write(json.dumps({'type': 'run', 'test_set': "test_cases.csv", 'platform': platform,
+                                'started': started}) + "\n")
+            for index, (search, outcomes) in enumerate(histories.items()):
+                result = {"P": "P - Found", "C": "P - Cached: P - Found (2024-01-01 02:00)"}.get(
+                    outcomes[run], "F - Timeout: no results")
+                f.write(json.dumps({'type': 'case', 'index': index, 'time': started,
+                                    'result': {'Search': search, 'Result': result}}) + "\n")
+
+
+def test_flip_rate_is_the_share_of_consecutive_runs_that_changed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_runs(HISTORIES)
+    warehouse.ingest_all()
+    connection = warehouse.connect()
+    try:
+        scores = {row['search']: row for row in warehouse.flakiness_scores(connection)}
+    finally:
+        connection.close()
+
+    alternating = scores["2020|Ford F-150|Brakes|Pads"]
+    assert (alternating['runs'], alternating['failures'], alternating['flips'], alternating['score']) == (6, 3, 5, 1.0)
+    # Broke once and stayed broken
+    broken = scores["2018|Honda Civic|Engine|Filters"]
+    assert (broken['failures'], broken['flips'], broken['score']) == (3, 1, 0.2)
+    assert scores["2015|Toyota Camry|Lighting|Bulbs"]['score'] == 0.0
+
+
+def test_update_quarantines_only_cases_over_the_threshold(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_runs(HISTORIES)
+    quarantine.add("web", "2015|Toyota Camry|Lighting|Bulbs")
+
+    added, released = quarantine.update()
+
+    assert added == [("web", "2020|Ford F-150|Brakes|Pads")]
+    assert released == []
+    # Cases quarantined by hand stay whatever their score
+    assert set(quarantine.load()["web"]) == {"2020|Ford F-150|Brakes|Pads", "2015|Toyota Camry|Lighting|Bulbs"}
+
+
+def test_cached_passes_are_not_scored_or_counted(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_runs({"2020|Ford F-150|Brakes|Pads": "FFCFFF", "2015|Toyota Camry|Lighting|Bulbs": "PPCCPP"})
+    warehouse.ingest_all()
+    connection = warehouse.connect()
+    try:
+        scores = {row['search']: row for row in warehouse.flakiness_scores(connection)}
+        counts = [(row['total'], row['passed']) for row in warehouse.pass_rate_trend(connection)]
+    finally:
+        connection.close()
+
+    assert (scores["2020|Ford F-150|Brakes|Pads"]['runs'], scores["2020|Ford F-150|Brakes|Pads"]['flips']) == (5, 0)
+    assert scores["2015|Toyota Camry|Lighting|Bulbs"]['runs'] == 4
+    # The third run only served cached passes and drops out of the trend
+    assert counts == [(2, 1), (2, 1), (1, 0), (2, 1), (2, 1)]
+
+
+def test_cached_passes_ingested_as_plain_passes_are_marked(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_runs({"2020|Ford F-150|Brakes|Pads": "FC"})
+    warehouse.ingest_all()
+    # What an older version of the warehouse stored
+    connection = warehouse.connect()
+    with connection:
+        connection.execute("UPDATE cases SET outcome = 'P' WHERE outcome = ?", (warehouse.CACHED,))
+        connection.execute("UPDATE runs SET total = 1, passed = 1, failed = 0 WHERE failed = 0")
+        connection.execute("PRAGMA user_version = 0")
+    connection.close()
+
+    connection = warehouse.connect()
+    try:
+        outcomes = [row['outcome'] for row in connection.execute("SELECT outcome FROM cases ORDER BY time")]
+        runs = [tuple(row) for row in connection.execute("SELECT total, passed, failed FROM runs ORDER BY started")]
+    finally:
+        connection.close()
+    assert outcomes == ["F", warehouse.CACHED]
+    assert runs == [(1, 0, 1), (0, 0, 0)]
@@ -0,0 +1,55 @@
+"""Merging rerun outcomes back into the original results"""
+import csv
+
+import rerun
+from fanout import read_results
+
+
+def write_rows(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+class Run:
+    def __init__(self, results_file, positions):
+        self.results_file = results_file
+        self.positions = positions
+
+
+def test_rows_are_matched_by_search_not_by_order(tmp_path):
+    rows = [
+        {'Search': "2020|Ford F-150|Brakes|Pads", 'Expected': "", 'Result': "F - Element Not Found"},
+        {'Search': "2020|Ford F-150|Brakes|Rotors", 'Expected': "", 'Result': "P - ok"},
+        {'Search': "2021|Honda Civic|Filters|Oil", 'Expected': "", 'Result': "F - Timeout"},
+    ]
+    # The first failure is quarantined, so the engine ran and wrote it last
+    rerun_file = str(tmp_path / "rerun.csv")
+    write_rows(rerun_file, [
+        {'Search': rows[2]['Search'], 'Expected': "", 'Result': "P - ok", 'Attempts': "1"},
+        {'Search': rows[0]['Search'], 'Expected': "", 'Result': "P - ok", 'Attempts': "2"},
+    ])
+
+    writer, fixed = rerun.merge_rerun(rows, [Run(rerun_file, [0, 2])], str(tmp_path / "merged.csv"))
+
+    assert fixed == 2
+    merged = read_results(str(tmp_path / "merged.csv"))
+    assert [row['Result'] for row in merged] == ["P - ok", "P - ok", "P - ok"]
+    assert merged[0]['Previous'] == "F - Element Not Found"
+    assert merged[0]['Attempts'] == "2"
+    assert merged[2]['Previous'] == "F - Timeout"
+
+
+def test_repeated_case_takes_its_rows_in_turn(tmp_path):
+    search = "2020|Ford F-150|Brakes|Pads"
+    rows = [{'Search': search, 'Expected': "", 'Result': "F - Timeout"},
+            {'Search': search, 'Expected': "", 'Result': "F - Timeout"}]
+    rerun_file = str(tmp_path / "rerun.csv")
+    write_rows(rerun_file, [{'Search': search, 'Expected': "", 'Result': "P - ok"},
+                            {'Search': search, 'Expected': "", 'Result': "F - Timeout"}])
+
+    writer, fixed = rerun.merge_rerun(rows, [Run(rerun_file, [0, 1])], str(tmp_path / "merged.csv"))
+
+    assert fixed == 1
+    assert [row['Result'] for row in read_results(str(tmp_path / "merged.csv"))] == ["P - ok", "F - Timeout"]
@@ -0,0 +1,35 @@
+"""Saving the result cache"""
+import json
+
+from result_cache import ResultCache
+import test_loader
+
+
+def test_saves_merge_case_by_case(tmp_path):
+    path = str(tmp_path / "result_cache.json")
+    pads = test_loader.TestCase(0, "2020|Ford F-150|Brakes|Pads")
+    rotors = test_loader.TestCase(1, "2020|Ford F-150|Brakes|Rotors")
+    oil = test_loader.TestCase(2, "2021|Honda Civic|Filters|Oil")
+    earlier = ResultCache("web", path=path)
+    earlier.fingerprint = "v1"
+    earlier.store(oil, {'Result': "P - ok"})
+    earlier.save()
+
+    first = ResultCache("web", path=path)
+    second = ResultCache("web", path=path)
+    first.fingerprint = second.fingerprint = "v1"
+    first.store(pads, {'Result': "P - ok"})
+    second.store(rotors, {'Result': "P - ok"})
+    second.store(oil, {'Result': "F - Timeout"})
+    first.save()
+    second.save()
+
+    with open(path) as f:
+        saved = json.load(f)['web']
+    assert len(saved) == 2
+    assert ResultCache("web", path=path).entries == saved
+    fresh = ResultCache("web", path=path)
+    fresh.fingerprint = "v1"
+    assert fresh.lookup(pads) is not None
+    assert fresh.lookup(rotors) is not None
+    assert fresh.lookup(oil) is None
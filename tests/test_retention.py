@@ -0,0 +1,68 @@
+"""Retention of results files and uploads"""
+import os
+import time
+
+import retention
+
+
+def old_file(path, days):
+    with open(path, 'w') as f:
+        f.write("x")
+    stamp = time.time() - days * 86400
+    os.utime(path, (stamp, stamp))
+
+
+def test_uploads_are_only_deleted_when_the_policy_says_so(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(retention.UPLOAD_FOLDER)
+    upload = os.path.join(retention.UPLOAD_FOLDER, "test_cases.csv")
+    old_file(upload, 100)
+    policy = dict(retention.DEFAULT_POLICY)
+
+    retention.prune_files(policy, time.time())
+    assert os.path.exists(upload)
+
+    policy['delete_uploads'] = True
+    assert retention.prune_files(policy, time.time()) == 1
+    assert not os.path.exists(upload)
+
+
+def test_delete_uploads_must_be_true_or_false(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with open(retention.RETENTION_FILE, 'w') as f:
+        f.write('{"delete_uploads": 1, "keep_days": true}')
+    policy = retention.load_policy()
+    assert policy['delete_uploads'] is False
+    assert policy['keep_days'] == retention.DEFAULT_POLICY['keep_days']
+
+
+def test_artifacts_of_failed_and_retried_cases_are_kept_longer(tmp_path, monkeypatch):
+    import artifact_store
+    monkeypatch.chdir(tmp_path)
+    manifest = artifact_store.RunManifest("run1", "web")
+    for index, (name, failed, retried) in enumerate([("search", True, False),         # F without an exception
+                                                     ("retry_Timeout", False, True),   # passed on a retry
+                                                     ("search", False, False)]):
+        manifest.start_case(index, f"2020|Ford F-150|Brakes|Part {index}")
+        artifact_store.save(f"{name}_case_{index + 1}_20240101_120000.png", b"%d" % index, manifest=manifest)
+        manifest.set_case_info(failed=failed, retried=retried)
+    manifest.start_case(None)
+    artifact_store.save("login_error_20240101_120000.png", b"login", manifest=manifest)
+    manifest.finish()
+
+    policy = dict(retention.DEFAULT_POLICY, keep_runs=0, keep_days=1)
+    loaded = dict(artifact_store.load_manifest("run1"), started=time.time() - 10 * 86400)
+    assert retention.expired_artifacts(loaded, 0, policy, time.time()) == ["run1/search_case_3_20240101_120000.png"]
+
+
+def test_checkpoints_and_agent_work_files_expire(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for folder in ("checkpoints", "agent_work"):
+        os.makedirs(folder)
+    old_file(os.path.join("checkpoints", "20240101_120000_web_abcdef.jsonl"), 100)
+    old_file(os.path.join("agent_work", "host1_chunk3.csv"), 100)
+    old_file(os.path.join("agent_work", "host1_chunk4.csv"), 1)
+
+    assert retention.prune_files(dict(retention.DEFAULT_POLICY), time.time()) == 2
+    assert os.listdir("checkpoints") == []
+    assert os.listdir("agent_work") == ["host1_chunk4.csv"]
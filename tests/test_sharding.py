@@ -0,0 +1,20 @@
+"""Packing test cases into shards of even estimated time"""
+from sharding import lpt_shards
+
+
+def test_shards_have_even_totals():
+    # Slow cases bunched at the front, as a split by row count would keep them
+    estimates = [60, 30, 30, 10, 10, 10, 10, 10, 10, 10]
+    shards = lpt_shards(estimates, 3)
+
+    assert [total for total, _ in shards] == [70, 60, 60]
+    assert sorted(p for _, positions in shards for p in positions) == list(range(len(estimates)))
+    for total, positions in shards:
+        assert total == sum(estimates[p] for p in positions)
+        assert positions == sorted(positions)
+    # No shard runs longer than another by more than one case
+    assert shards[0][0] - shards[-1][0] <= max(estimates)
+
+
+def test_more_shards_than_cases_leaves_none_empty():
+    assert lpt_shards([5, 20], 4) == [(20, [1]), (5, [0])]
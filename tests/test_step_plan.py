@@ -0,0 +1,23 @@
+"""Checking step plans up front"""
+import step_plan
+
+
+def problems(steps):
+    return step_plan.check_plan({'name': "custom", 'steps': steps})
+
+
+def test_bad_numbers_are_plan_errors_with_the_step_number():
+    assert problems([{'action': "open"}, {'action': "click", 'selector': "#go", 'pause': "soon"}]) == \
+        ["platform 'custom': Step 2 (click): 'pause' must be a number of seconds, not 'soon'"]
+    assert problems([{'action': "click", 'selector': "#go", 'timeout': "10s"}]) == \
+        ["platform 'custom': Step 1 (click): 'timeout' must be a number of seconds, not '10s'"]
+    assert problems([{'action': "wait_for", 'seconds': -1}]) == \
+        ["platform 'custom': Step 1 (wait_for): 'seconds' must be at least 0"]
+
+
+def test_assert_text_names_the_missing_key():
+    assert problems([{'action': "assert_text"}]) == ["platform 'custom': Step 1 (assert_text): missing 'text'"]
+
+
+def test_numbers_given_as_strings_are_fine():
+    assert problems([{'action': "click", 'selector': "#go", 'pause': "0.5", 'timeout': "5"}]) == []
@@ -0,0 +1,42 @@
+"""Loading and validating test set files"""
+import pytest
+
+import test_loader
+
+
+def write(path, text):
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_malformed_rows_are_rejected_with_their_line(tmp_path):
+    path = write(tmp_path / "test_cases.csv",
+                 f"{test_loader.SEARCH_COLUMN},Expected\n"
+                 "2020|Ford F-150|Brakes|Pads,Pads\n"
+                 "\n"
+                 "20x0|Ford F-150|Brakes|Rotors,Rotors\n"
+                 "Ford F-150,\n")
+
+    with pytest.raises(test_loader.TestCaseError) as error:
+        test_loader.load_test_cases(path)
+
+    message = str(error.value)
+    assert message.startswith(f"2 invalid test case(s) in {path}")
+    assert "line 4: '20x0' is not a valid year" in message
+    assert "line 5: 'Ford F-150' needs at least two '|' separated fields" in message
+
+
+def test_file_without_the_search_column_is_rejected(tmp_path):
+    path = write(tmp_path / "test_cases.csv", "Search,Expected\n2020|Ford F-150|Brakes|Pads,Pads\n")
+    with pytest.raises(test_loader.TestCaseError):
+        test_loader.load_test_cases(path)
+
+
+def test_valid_rows_are_split_into_their_parts(tmp_path):
+    path = write(tmp_path / "test_cases.csv",
+                 f"{test_loader.SEARCH_COLUMN},Expected,ExpectedResult\n"
+                 "2020|Ford F-150|Wheels|Wheel (display w/ image),,ABSENT\n")
+    [test_case] = test_loader.load_test_cases(path)
+    assert (test_case.make, test_case.model, test_case.part_main, test_case.qualifier) == \
+        ("Ford", "F-150", "Wheel", "display w/ image")
+    assert test_case.expected_result == "ABSENT"
@@ -0,0 +1,191 @@
+"""Visual regression check of step screenshots between two runs.
+
+Every screenshot of a run is lined up with the same step of the case with
+the same search in the previous finished run on the same platform (see the
+run manifests in artifact_store.py), then:
+
+  1. identical blobs are unchanged - the store already hashed the bytes
+  2. a difference hash (dHash) of each image filters out pages that only
+     differ in invisible ways (a re-encoded PNG, a blinking cursor)
+  3. pages whose hashes differ get a NumPy pixel diff: the score is the
+     share of pixels where a colour channel moved by more than
+     PIXEL_THRESHOLD, and the changed pixels are painted red over a faded
+     copy of the new screenshot
+
+Comparisons run in a process pool.  Diff images are added to the new run's
+manifest as "visual_diff_..." artifacts and the scores are written to
+screenshots/runs/<run_id>/visual_diff.json, which the results page reads.
+
+    python visual_diff.py 20240101_120000_web_3f9a1c            (against the previous run)
+    python visual_diff.py 20240101_120000_web_3f9a1c --previous 20231231_120000_web_b27e40
+
+or run the engine with --compare-screenshots.  Needs numpy and Pillow.
+"""
+import argparse
+import importlib.util
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import artifact_store
+
+# Side of the dHash grid (HASH_SIZE x HASH_SIZE bits)
+HASH_SIZE = 8
+# Hash bits that may differ before pixels are compared
+HASH_TOLERANCE = 0
+# How far a colour channel has to move for a pixel to count as changed
+PIXEL_THRESHOLD = 32
+# Share of changed pixels that makes a step a regression
+REGRESSION_SCORE = 0.01
+REPORT_NAME = "visual_diff.json"
+
+
+def report_path(run_id):
+    return os.path.join(os.path.dirname(artifact_store.manifest_path(run_id)), REPORT_NAME)
+
+
+def load_report(run_id):
+    """The visual diff report of a run, or None if it wasn't compared"""
+    try:
+        with open(report_path(os.path.basename(run_id)), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def dhash(image):
+    """Difference hash: one bit per neighbouring pixel pair of a tiny grayscale copy"""
+    from PIL import Image
+    small = image.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS)
+    pixels = list(small.getdata())
+    bits = 0
+    for row in range(HASH_SIZE):
+        for col in range(HASH_SIZE):
+            left = pixels[row * (HASH_SIZE + 1) + col]
+            bits = (bits << 1) | (left > pixels[row * (HASH_SIZE + 1) + col + 1])
+    return bits
+
+
+def compare_pair(old_blob, new_blob):
+    """Compare two screenshot blobs; runs in a worker process"""
+    import numpy as np
+    from PIL import Image
+
+    old_image = Image.open(io.BytesIO(artifact_store.read_blob(old_blob))).convert("RGB")
+    new_image = Image.open(io.BytesIO(artifact_store.read_blob(new_blob))).convert("RGB")
+    distance = bin(dhash(old_image) ^ dhash(new_image)).count("1")
+    if distance <= HASH_TOLERANCE and old_image.size == new_image.size:
+        return {'hash_distance': distance, 'score': 0.0, 'diff': None}
+
+    old_pixels = np.asarray(old_image, dtype=np.int16)
+    new_pixels = np.asarray(new_image, dtype=np.int16)
+    # Pages of different heights: the missing part counts as changed
+    height = max(old_pixels.shape[0], new_pixels.shape[0])
+    width = max(old_pixels.shape[1], new_pixels.shape[1])
+    padded_old = np.zeros((height, width, 3), dtype=np.int16)
+    padded_new = np.zeros((height, width, 3), dtype=np.int16)
+    padded_old[:old_pixels.shape[0], :old_pixels.shape[1]] = old_pixels
+    padded_new[:new_pixels.shape[0], :new_pixels.shape[1]] = new_pixels
+    changed = (np.abs(padded_new - padded_old) > PIXEL_THRESHOLD).any(axis=2)
+    score = float(changed.mean())
+    if not changed.any():
+        return {'hash_distance': distance, 'score': 0.0, 'diff': None}
+
+    overlay = (padded_new * 0.3 + 178).astype(np.uint8)
+    overlay[changed] = (255, 0, 0)
+    buffer = io.BytesIO()
+    Image.fromarray(overlay).save(buffer, "PNG", optimize=True)
+    return {'hash_distance': distance, 'score': round(score, 5), 'diff': buffer.getvalue()}
+
+
+def compare_runs(run_id, previous=None, workers=None):
+    """Compare the screenshots of a run with the previous run's; returns the report or None"""
+    if importlib.util.find_spec("numpy") is None or importlib.util.find_spec("PIL") is None:
+        print("Screenshot comparison needs numpy and Pillow (pip install numpy Pillow)")
+        return None
+    manifest = artifact_store.load_manifest(run_id)
+    if manifest is None:
+        print(f"No screenshots saved for run {run_id}")
+        return None
+    previous = previous or artifact_store.previous_run(run_id)
+    previous_manifest = artifact_store.load_manifest(previous) if previous else None
+    if previous_manifest is None:
+        print(f"No earlier run of {manifest.get('platform')} to compare run {run_id} with")
+        return None
+
+    started = time.perf_counter()
+    new_steps = artifact_store.step_artifacts(manifest, ".png")
+    old_steps = artifact_store.step_artifacts(previous_manifest, ".png")
+    pairs = {key: (old_steps[key], record) for key, record in new_steps.items() if key in old_steps}
+    steps = []
+    unchanged = {key for key, (old, new) in pairs.items() if old['blob'] == new['blob']}
+    for key in unchanged:
+        _, step, occurrence = key
+        new = pairs[key][1]
+        steps.append({'case': new['case'], 'step': step, 'occurrence': occurrence, 'score': 0.0,
+                      'name': new['name'], 'diff': None})
+    to_compare = [key for key in pairs if key not in unchanged]
+
+    run_manifest = artifact_store.RunManifest(run_id)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {key: pool.submit(compare_pair, pairs[key][0]['blob'], pairs[key][1]['blob']) for key in to_compare}
+        for key, future in futures.items():
+            _, step, occurrence = key
+            # The case number in this run - the key pairs cases by their search
+            case = pairs[key][1]['case']
+            entry = {'case': case, 'step': step, 'occurrence': occurrence, 'name': pairs[key][1]['name']}
+            try:
+                outcome = future.result()
+            except Exception as e:
+                print(f"Could not compare case {case} {step}: {str(e)}")
+                entry.update(score=None, diff=None, error=str(e))
+                steps.append(entry)
+                continue
+            entry.update(score=outcome['score'], hash_distance=outcome['hash_distance'], diff=None)
+            if outcome['diff'] is not None:
+                # Filed under the case, like the screenshot it belongs to
+                run_manifest.case = None if case == artifact_store.RUN_LEVEL else int(case) - 1
+                case_part = "" if case == artifact_store.RUN_LEVEL else f"_case_{case}"
+                diff_name = run_manifest.unique_base(f"visual_diff_{step}{case_part}_{timestamp}", (".png",)) + ".png"
+                artifact_store.save(diff_name, outcome['diff'], manifest=run_manifest)
+                entry['diff'] = f"{run_id}/{diff_name}"
+            steps.append(entry)
+
+    steps.sort(key=lambda entry: -(entry['score'] or 0))
+    report = {
+        'run': run_id,
+        'previous': previous,
+        'compared': len(pairs),
+        'unchanged': len(unchanged),
+        'regressions': sum(1 for entry in steps if (entry['score'] or 0) >= REGRESSION_SCORE),
+        'threshold': REGRESSION_SCORE,
+        'time': time.time(),
+        'steps': steps,
+    }
+    with open(report_path(run_id), 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Compared {len(pairs)} screenshots of run {run_id} with run {previous} in "
+          f"{time.perf_counter() - started:.1f}s: {len(unchanged)} identical, "
+          f"{report['regressions']} changed by {REGRESSION_SCORE:.0%} or more")
+    for entry in steps[:10]:
+        if (entry['score'] or 0) >= REGRESSION_SCORE:
+            print(f"  case {entry['case']} {entry['step']}: {entry['score']:.1%} changed ({entry['diff']})")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the screenshots of a run with an earlier run")
+    parser.add_argument("run", help="Run ID (see screenshots/runs/)")
+    parser.add_argument("--previous", help="Run ID to compare with (default: the previous run on the same platform)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+    return 0 if compare_runs(args.run, args.previous, args.workers) is not None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
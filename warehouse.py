@@ -0,0 +1,246 @@
+"""SQLite warehouse of every test run, for trends across runs.
+
+Each results_<ts>.csv only knows its own run.  The engine's checkpoint
+(checkpoints/<run_id>.jsonl) has everything about a run - platform, test
+set, start time, and per case the result, attempts and duration - so runs
+are ingested from there into results.db:
+
+    runs   one row per run: platform, test set, start, results file, counts
+    cases  one row per test case of a run: search, expected, outcome
+           (P, P*, F, or "P (cached)" for a pass served from the result
+           cache), failure category, attempts, duration, time
+
+The engine ingests its run when it finishes; ingest_all() picks up any
+checkpoint that is new or has grown since (crashed, resumed or older runs)
+and is what the dashboard calls first.  Cases are indexed by platform and
+time and by search, so the dashboard queries only read the window they
+show, however many nightly runs are stored.
+
+A cached pass was not run, so it tells nothing about the site or the test:
+it is kept with its run but left out of the run's pass counts and of the
+flakiness scores.
+"""
+import glob
+import json
+import os
+import re
+import sqlite3
+from datetime import datetime, timedelta
+
+from checkpoint import CHECKPOINT_DIR
+from result_cache import CACHED_PREFIX
+
+DB_FILE = "results.db"
+# Outcome of a case served from the result cache instead of being run
+CACHED = "P (cached)"
+# PRAGMA user_version of the current layout of results.db
+DB_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    platform TEXT,
+    test_set TEXT,
+    started TEXT,
+    finished INTEGER,
+    results_file TEXT,
+    total INTEGER,
+    passed INTEGER,
+    failed INTEGER
+);
+CREATE TABLE IF NOT EXISTS cases (
+    run_id TEXT,
+    platform TEXT,
+    test_set TEXT,
+    case_index INTEGER,
+    search TEXT,
+    expected TEXT,
+    outcome TEXT,
+    category TEXT,
+    result TEXT,
+    attempts INTEGER,
+    duration REAL,
+    time TEXT
+);
+CREATE TABLE IF NOT EXISTS ingested (
+    path TEXT PRIMARY KEY,
+    size INTEGER
+);
+CREATE INDEX IF NOT EXISTS cases_run ON cases (run_id);
+CREATE INDEX IF NOT EXISTS cases_time ON cases (time);
+CREATE INDEX IF NOT EXISTS cases_platform_time ON cases (platform, time);
+CREATE INDEX IF NOT EXISTS cases_search ON cases (search, platform);
+CREATE INDEX IF NOT EXISTS runs_started ON runs (started);
+"""
+
+# "F - Timeout: ..." -> "Timeout"
+CATEGORY_PATTERN = re.compile(r"^F\s*-\s*([A-Za-z][A-Za-z ]{0,39}?)\s*(:|$)")
+
+
+def connect(path=DB_FILE):
+    connection = sqlite3.connect(path, timeout=30)
+    connection.row_factory = sqlite3.Row
+    connection.executescript(SCHEMA)
+    if connection.execute("PRAGMA user_version").fetchone()[0] < DB_VERSION:
+        _mark_cached_passes(connection)
+    return connection
+
+
+def _mark_cached_passes(connection):
+    """Give cached passes ingested as plain passes their own outcome and recount their runs"""
+    with connection:
+        connection.execute("UPDATE cases SET outcome = ? WHERE outcome = 'P' AND result LIKE ?",
+                           (CACHED, CACHED_PREFIX + "%"))
+        connection.execute("""UPDATE runs SET
+            total = (SELECT COUNT(*) FROM cases WHERE cases.run_id = runs.run_id AND outcome != ?),
+            passed = (SELECT COUNT(*) FROM cases WHERE cases.run_id = runs.run_id AND outcome IN ('P', 'P*')),
+            failed = (SELECT COUNT(*) FROM cases WHERE cases.run_id = runs.run_id AND outcome = 'F')""", (CACHED,))
+        connection.execute(f"PRAGMA user_version = {DB_VERSION}")
+
+
+def outcome_of(result):
+    """(outcome, failure category) of a Result value"""
+    result = str(result)
+    if result.startswith(CACHED_PREFIX):
+        return CACHED, None
+    if result.startswith("P*"):
+        return "P*", None
+    if result.startswith("P"):
+        return "P", None
+    match = CATEGORY_PATTERN.match(result)
+    return "F", match.group(1) if match else "Assertion"
+
+
+def ingest_checkpoint(path, connection=None):
+    """Load one run from its checkpoint, replacing what an earlier ingest stored; returns the cases loaded"""
+    own_connection = connection is None
+    if own_connection:
+        connection = connect()
+    run_id = os.path.splitext(os.path.basename(path))[0]
+    run = {'platform': None, 'test_set': None, 'started': None}
+    results_file = None
+    rows = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get('type') == 'run':
+                run.update({key: record.get(key) for key in run})
+            elif record.get('type') == 'done':
+                results_file = record.get('results_file')
+            elif record.get('type') == 'case':
+                result = record['result']
+                outcome, category = outcome_of(result.get('Result'))
+                attempts = result.get('Attempts', 1)
+                rows.append((run_id, run['platform'], run['test_set'], record['index'], result.get('Search'),
+                             result.get('Expected'), outcome, category, str(result.get('Result')),
+                             int(attempts) if str(attempts).isdigit() else 1, record.get('duration'),
+                             record.get('time') or run['started']))
+    passed = sum(1 for row in rows if row[6] in ("P", "P*"))
+    failed = sum(1 for row in rows if row[6] == "F")
+    with connection:
+        connection.execute("DELETE FROM cases WHERE run_id = ?", (run_id,))
+        connection.executemany("INSERT INTO cases VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        connection.execute("INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                           (run_id, run['platform'], run['test_set'], run['started'], int(results_file is not None),
+                            results_file, passed + failed, passed, failed))
+        connection.execute("INSERT OR REPLACE INTO ingested VALUES (?, ?)", (path, os.path.getsize(path)))
+    if own_connection:
+        connection.close()
+    return len(rows)
+
+
+def ingest_all():
+    """Ingest every checkpoint that is new or has grown since it was last ingested; returns how many runs"""
+    connection = connect()
+    try:
+        seen = {row['path']: row['size'] for row in connection.execute("SELECT path, size FROM ingested")}
+        count = 0
+        for path in glob.glob(os.path.join(CHECKPOINT_DIR, "*.jsonl")):
+            try:
+                if seen.get(path) == os.path.getsize(path):
+                    continue
+                ingest_checkpoint(path, connection)
+                count += 1
+            except (OSError, sqlite3.Error) as e:
+                print(f"Could not ingest {path}: {str(e)}")
+        return count
+    finally:
+        connection.close()
+
+
+def pass_rate_trend(connection, days=90, platform=None):
+    """[{run_id, platform, started, total, passed, rate}] of the finished runs in the window, oldest first"""
+    since = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+    query = "SELECT * FROM runs WHERE started >= ? AND total > 0"
+    params = [since]
+    if platform:
+        query += " AND platform = ?"
+        params.append(platform)
+    rows = connection.execute(query + " ORDER BY started", params).fetchall()
+    return [dict(row, rate=round(100.0 * row['passed'] / row['total'], 1)) for row in rows]
+
+
+def slowest_cases(connection, days=30, platform=None, limit=20):
+    """The test cases with the longest average duration in the window"""
+    since = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+    query = """SELECT search, platform, COUNT(*) AS runs, AVG(duration) AS average, MAX(duration) AS longest
+               FROM cases WHERE time >= ? AND duration IS NOT NULL"""
+    params = [since]
+    if platform:
+        query += " AND platform = ?"
+        params.append(platform)
+    query += " GROUP BY search, platform ORDER BY average DESC LIMIT ?"
+    return [dict(row) for row in connection.execute(query, params + [limit])]
+
+
+def flakiness_scores(connection, days=30, platform=None):
+    """[{search, platform, runs, failures, flips, score}] of every test case run in the window
+
+    The score is the share of consecutive runs whose outcomes differ (pass
+    vs fail), so a case that alternates scores near 1, while one that broke
+    with a site change and stayed broken flipped once and scores low.
+    """
+    since = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+    query = """SELECT search, platform, outcome,
+                      LAG(outcome) OVER (PARTITION BY search, platform ORDER BY time) AS previous
+               FROM cases WHERE time >= ? AND outcome != ?"""
+    params = [since, CACHED]
+    if platform:
+        query += " AND platform = ?"
+        params.append(platform)
+    query = f"""SELECT search, platform, COUNT(*) AS runs,
+                       SUM(outcome = 'F') AS failures,
+                       SUM(previous IS NOT NULL AND (previous = 'F') != (outcome = 'F')) AS flips
+                FROM ({query}) GROUP BY search, platform"""
+    scores = []
+    for row in connection.execute(query, params):
+        row = dict(row)
+        row['score'] = round(row['flips'] / (row['runs'] - 1), 3) if row['runs'] > 1 else 0.0
+        scores.append(row)
+    return scores
+
+
+def flaky_cases(connection, days=30, platform=None, limit=20):
+    """Test cases that both passed and failed in the window, most outcome flips first"""
+    flaky = [row for row in flakiness_scores(connection, days, platform) if 0 < row['failures'] < row['runs']]
+    flaky.sort(key=lambda row: (row['flips'], row['failures']), reverse=True)
+    return flaky[:limit]
+
+
+def failure_categories(connection, days=30, platform=None):
+    """Failure category -> count in the window"""
+    since = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+    query = "SELECT category, COUNT(*) AS count FROM cases WHERE time >= ? AND outcome = 'F'"
+    params = [since]
+    if platform:
+        query += " AND platform = ?"
+        params.append(platform)
+    return [dict(row) for row in connection.execute(query + " GROUP BY category ORDER BY count DESC", params)]
+
+
+def platforms(connection):
+    return [row['platform'] for row in connection.execute("SELECT DISTINCT platform FROM runs ORDER BY platform")
+            if row['platform']]